@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Streaming change-point and outlier detection over every live signal in the SQLite store (store.py).
+- A signal is one "<source>:<metric>" series; each keeps a constant-size state
+  [n, level, EWMA mean, EWMA variance, CUSUM+, CUSUM-, last observed_at, held outlier] of its
+  increments (x_t - x_{t-1}), so trending levels (CO2, prices) do not read as permanent shifts.
+- Each new observation costs one O(1) update with z = (dx - mean) / sd:
+  outlier      |z| > Z_OUTLIER; the point is held out of the level and the estimates,
+  level_shift  the next point is out the same way (the jump persisted), so the level moves to it,
+  drift_up/_down  the two-sided CUSUM of z (slack K, clipped at Z_OUTLIER) passes H: the trend changed,
+               the mean restarts at the new increment and the signal warms up again.
+  Repeats of the last or held value (a daily fetch of a monthly series) are not new observations.
+- run() reads only readings fetched since its watermark (indexed per source), never the whole history.
+Writes: data/anomaly/state.json, data/alerts.json (last MAX_ALERTS alerts); updater.py puts summary() in status.json.
+Usage: python anomaly.py [--reset]
+"""
+import calendar, json, math, os, sys, time
+import store
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(ROOT, "data", "anomaly", "state.json")
+ALERTS_PATH = os.path.join(ROOT, "data", "alerts.json")
+SPAN = 20          # EWMA span of the increment mean (observations)
+VAR_SPAN = 60      # slower span for the variance, so a few quiet days do not make noise look like outliers
+WARMUP = 20        # observations before a signal may alert
+Z_OUTLIER = 4.0
+K, H = 0.5, 5.0    # CUSUM slack and threshold, in standard deviations
+MAX_ALERTS = 200
+ACTIVE_DAYS = 7    # alerts observed this recently are reported in status.json
+
+ALPHA, BETA = 2.0 / (SPAN + 1), 2.0 / (VAR_SPAN + 1)
+N, LAST, MEAN, VAR, HI, LO, AT, HOLD = range(8)
+
+def read_json(p, default=None):
+    try:
+        with open(p) as f: return json.load(f)
+    except Exception:
+        return default
+
+def update(s, x, at):
+    """Fold one observation into state s (a list, updated in place); returns (kind, z) or None."""
+    if s[N] == 0:
+        s[N], s[LAST], s[AT] = 1, x, at
+        return None
+    s[AT] = at
+    dx = x - s[LAST]
+    n = s[N] = s[N] + 1
+    sd = math.sqrt(s[VAR])
+    z = (dx - s[MEAN]) / sd if sd > 1e-12 else 0.0
+    held, s[HOLD] = s[HOLD], None
+    if n > WARMUP and sd > 1e-12:
+        if abs(z) > Z_OUTLIER:
+            if held is not None and (held > s[LAST]) == (z > 0):  # still out after the held point
+                s[LAST], s[HI], s[LO] = x, 0.0, 0.0
+                if abs(x - held - s[MEAN]) <= Z_OUTLIER * sd:  # ...and in line with it: the level moved
+                    return ("level_shift", z)
+                s[N], s[MEAN] = 2, x - held                     # ...and still climbing away: the trend changed
+                return ("drift_up" if z > 0 else "drift_down", z)
+            s[HOLD] = x  # keep the previous level until the next point confirms or drops it
+            return ("outlier", z)
+        zc = max(-Z_OUTLIER, min(Z_OUTLIER, z))
+        s[HI] = max(0.0, s[HI] + zc - K)
+        s[LO] = max(0.0, s[LO] - zc - K)
+        if s[HI] > H or s[LO] > H:
+            kind = "drift_up" if s[HI] > H else "drift_down"
+            s[HI] = s[LO] = 0.0
+            s[N], s[MEAN], s[LAST] = 2, dx, x   # new regime: restart the mean there and warm up again (variance kept)
+            return (kind, z)
+    s[LAST] = x
+    a, b = max(ALPHA, 1.0 / (n - 1)), max(BETA, 1.0 / (n - 1))   # plain running mean/variance while warming up
+    d = dx - s[MEAN]
+    s[MEAN] += a * d
+    s[VAR] = (1 - b) * (s[VAR] + b * d * d)
+    return None
+
+def _epoch(iso):
+    try:
+        return calendar.timegm(time.strptime(iso[:10], "%Y-%m-%d"))
+    except Exception:
+        return 0
+
+def summary(alerts, signals, updated):
+    """status.json block: alerts observed within ACTIVE_DAYS of now, newest first."""
+    cutoff = time.time() - ACTIVE_DAYS * 86400
+    active = [a for a in reversed(alerts) if _epoch(a["observed_at"]) >= cutoff]
+    return {"updated_iso": updated, "signals": signals, "active": active[:20],
+            "method": f"increments: EWMA(span={SPAN}/{VAR_SPAN}) |z| > {Z_OUTLIER} outliers/level shifts, CUSUM(k={K}, h={H}) drifts"}
+
+def run(path=None, state_path=STATE_PATH, alerts_path=ALERTS_PATH):
+    """Feed readings fetched since the last run through the detectors; returns summary()."""
+    t0 = time.perf_counter()
+    state = read_json(state_path, {}) or {}
+    signals, marks = state.setdefault("signals", {}), state.setdefault("watermarks", {})
+    alerts = read_json(alerts_path, []) or []
+    conn, fresh, seen = store.connect(path), [], 0
+    for source in store.sources(path):
+        rows = conn.execute("""SELECT metric, observed_at, fetched_at, value FROM readings
+                               WHERE source = ? AND fetched_at >= ? AND value IS NOT NULL
+                               ORDER BY observed_at, fetched_at""", (source, marks.get(source, ""))).fetchall()
+        for metric, at, fetched, x in rows:
+            key = f"{source}:{metric}"
+            s = signals.get(key)
+            if s is None:
+                s = signals[key] = [0, 0.0, 0.0, 0.0, 0.0, 0.0, "", None]
+            if at <= s[AT] or (s[N] and x in (s[LAST], s[HOLD])): continue  # revision of a seen point / repeat
+            seen += 1
+            hit = update(s, x, at)
+            if hit:
+                fresh.append({"signal": key, "kind": hit[0], "z": round(hit[1], 2), "value": x,
+                              "observed_at": at, "fetched_at": fetched})
+        if rows: marks[source] = max(r[2] for r in rows)
+    alerts = (alerts + fresh)[-MAX_ALERTS:]
+    state["updated_iso"] = store.now_iso()
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    for p, blob in ((state_path, state), (alerts_path, alerts)):
+        with open(p + ".tmp", "w") as f: json.dump(blob, f, separators=(",", ":"))
+        os.replace(p + ".tmp", p)
+    dt = time.perf_counter() - t0
+    print(f"anomaly: {seen} observation(s) over {len(signals)} signal(s), {len(fresh)} new alert(s) in {dt:.3f}s")
+    return summary(alerts, len(signals), state["updated_iso"])
+
+if __name__ == "__main__":
+    if "--reset" in sys.argv:
+        for p in (STATE_PATH, ALERTS_PATH):
+            if os.path.exists(p): os.remove(p)
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Mixed-frequency as-of join engine for a sub-annual GTI.
+- Every input keeps its native timestamps in data/series/<name>.csv (t,value), written by the
+  fetchers via record(); annual category scores from gti.json are ingested the same way.
+- compute() as-of joins each series onto a daily ("D") or monthly ("M") calendar with a
+  per-indicator staleness limit (np.searchsorted: a vectorized sort-merge), maps raw values
+  through the normalize.json curves, averages components per category and categories into a GTI.
+- Incremental: record() marks the earliest changed timestamp; compute() keeps output rows
+  before that point and realigns only from there to today.
+Writes: data/series/*.csv, data/series/_state.json, data/gti_daily.json, data/gti_monthly.json
+"""
+import json, os, sys, threading, time
+import numpy as np
+import scoring, store
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SERIES_DIR = os.path.join(DATA_DIR, "series")
+STATE_PATH = os.path.join(SERIES_DIR, "_state.json")
+OUTPUTS = {"D": os.path.join(DATA_DIR, "gti_daily.json"), "M": os.path.join(DATA_DIR, "gti_monthly.json")}
+START = "2015-01-01"
+ANNUAL = "_annual"   # state key: stamp of the gti.json the annual:* series were last ingested from
+
+ORDER = ["Planetary Health","Economic Wellbeing","Global Peace & Conflict","Public Health","Civic Freedom & Rights","Technological Progress","Sentiment & Culture","Entropy Index"]
+
+# series name -> (category, normalize.json curve or None if already a 0..100 score, max staleness in days)
+INDICATORS = {
+    "co2_ppm":          ("Planetary Health",        "co2_ppm",           70),    # NOAA monthly
+    "acwi_z":           ("Economic Wellbeing",      "market_z",          7),     # stooq daily
+    "food_price_index": ("Economic Wellbeing",      "food_price_index",  70),    # FAO monthly
+    "unemployment":     ("Economic Wellbeing",      "unemployment",      800),   # OWID/WB annual
+    "conflict_vol":     ("Global Peace & Conflict", "gdelt_conflict_vol", 7),    # GDELT daily
+    "undernourished":   ("Public Health",           "undernourishment",  800),   # OWID annual
+    "gdelt_tone":       ("Sentiment & Culture",     "gdelt_tone",        7),     # GDELT daily
+    "vix":              ("Entropy Index",           "vix",               7),     # stooq daily
+}
+for _cat in ORDER:  # annual backfill scores as slow-moving anchors for every category
+    INDICATORS[f"annual:{_cat}"] = (_cat, None, 1100)
+
+_lock = threading.Lock()  # fetchers may record from background threads (lkg.refresh)
+
+def _path(name):
+    return os.path.join(SERIES_DIR, name.replace(":", "__").replace(" ", "_").replace("&", "and") + ".csv")
+
+def _read_state():
+    try:
+        with open(STATE_PATH) as f: return json.load(f)
+    except Exception: return {}
+
+def _write_state(state):
+    os.makedirs(SERIES_DIR, exist_ok=True)
+    with open(STATE_PATH, "w") as f: json.dump(state, f, indent=2, sort_keys=True)
+
+def load(name):
+    """(t: datetime64[D] sorted, v: float64) for a recorded series; empty arrays if none."""
+    try:
+        raw = np.loadtxt(_path(name), delimiter=",", skiprows=1, dtype=str, ndmin=2)
+    except Exception:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype="float64")
+    if raw.size == 0:
+        return np.array([], dtype="datetime64[D]"), np.array([], dtype="float64")
+    return raw[:, 0].astype("datetime64[D]"), raw[:, 1].astype("float64")
+
+def day(t):
+    """'YYYY-MM-DD' from 'YYYY-MM-DD…', 'YYYYMMDD…' (GDELT) or a date/datetime/Timestamp."""
+    s = str(t)
+    if len(s) >= 8 and s[:8].isdigit():
+        return f"{s[:4]}-{s[4:6]}-{s[6:8]}"
+    return s[:10]
+
+def record(name, rows):
+    """Merge (date, value) observations into the series; returns the earliest changed date or None.
+    Several rows for one date keep the last of them (rows come in time order)."""
+    rows = list(dict((day(t), float(v)) for t, v in rows if v is not None and v == v).items())
+    if not rows: return None
+    with _lock:
+        return _merge(name, rows)
+
+def _merge(name, rows):
+    t_new = np.array([r[0] for r in rows], dtype="datetime64[D]")
+    v_new = np.array([r[1] for r in rows], dtype="float64")
+    t_old, v_old = load(name)
+    # changed = new timestamps, or existing timestamps whose value was revised
+    same = np.zeros(len(t_new), bool)
+    if len(t_old):
+        pos = np.minimum(np.searchsorted(t_old, t_new), len(t_old) - 1)
+        same = (t_old[pos] == t_new) & np.isclose(v_old[pos], v_new, rtol=0, atol=1e-9)
+    if same.all(): return None
+    dirty = t_new[~same].min()
+    try:  # new/revised observations also go to the SQLite store, one transaction per batch
+        store.write("series", [(name, t, v) for t, v in zip(t_new[~same].astype(str), v_new[~same].tolist())])
+    except Exception as e:
+        print(f"[warn] store: {e}", file=sys.stderr)
+    # new values win on duplicate timestamps
+    t_all = np.concatenate([t_new, t_old]); v_all = np.concatenate([v_new, v_old])
+    t_u, first = np.unique(t_all, return_index=True)
+    v_u = v_all[first]
+    os.makedirs(SERIES_DIR, exist_ok=True)
+    if len(t_old) and dirty > t_old[-1]:
+        with open(_path(name), "a") as f:  # pure append: new observations after the last one
+            tail = t_u > t_old[-1]
+            f.writelines(f"{t},{v!r}\n" for t, v in zip(t_u[tail].astype(str), v_u[tail].tolist()))
+    else:
+        tmp = _path(name) + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("t,value\n")
+            f.writelines(f"{t},{v!r}\n" for t, v in zip(t_u.astype(str), v_u.tolist()))
+        os.replace(tmp, _path(name))
+    state = _read_state()
+    prev = state.get(name, {}).get("dirty_from")
+    state[name] = {"last_t": str(t_u[-1]), "n": int(len(t_u)), "rev": state.get(name, {}).get("rev", 0) + 1,
+                   "dirty_from": str(min(np.datetime64(prev, "D"), dirty)) if prev else str(dirty)}
+    _write_state(state)
+    return str(dirty)
+
+def record_annual(by_category, updated=None):
+    """Ingest gti.json-style {category: {year: score}} as year-end observations; `updated` is the
+    gti.json stamp they came from, kept so the updater can tell when the ingest is behind."""
+    for cat, years in (by_category or {}).items():
+        if cat in ORDER:
+            record(f"annual:{cat}", [(f"{int(y)}-12-31", v) for y, v in years.items()])
+    if updated:
+        with _lock:
+            state = _read_state()
+            state[ANNUAL] = {"updated": updated}
+            _write_state(state)
+
+def annual_updated():
+    """gti.json stamp of the last annual ingest (None if never recorded)."""
+    return (_read_state().get(ANNUAL) or {}).get("updated")
+
+def calendar(freq, start=START, end=None):
+    end = np.datetime64(end or time.strftime("%Y-%m-%d", time.gmtime()), "D")
+    if freq == "M":  # month-end stamps (as of the last day of each month)
+        months = np.arange(np.datetime64(start, "M"), np.datetime64(end, "M") + 1)
+        return np.minimum((months + 1).astype("datetime64[D]") - 1, end)
+    return np.arange(np.datetime64(start, "D"), end + 1)
+
+def asof(cal, t, v, max_age_days):
+    """Last observation at or before each calendar date, NaN when none or older than max_age_days."""
+    out = np.full(len(cal), np.nan)
+    if not len(t): return out
+    idx = np.searchsorted(t, cal, side="right") - 1
+    ok = idx >= 0
+    ok[ok] &= (cal[ok] - t[idx[ok]]).astype("int64") <= max_age_days
+    out[ok] = v[idx[ok]]
+    return out
+
+def align(cal):
+    """(category scores [dates × categories], component counts) for a calendar slice."""
+    num = np.zeros((len(cal), len(ORDER))); den = np.zeros((len(cal), len(ORDER)))
+    for name, (cat, curve, max_age) in INDICATORS.items():
+        t, v = load(name)
+        x = asof(cal, t, v, max_age)
+        s = scoring.apply(curve, x) if curve else x
+        ok = ~np.isnan(s); j = ORDER.index(cat)
+        num[ok, j] += s[ok]; den[ok, j] += 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return num / den, den
+
+def compute(freq="D", start=START, full=False, state=None):
+    """Realign from the earliest dirty timestamp (or from scratch) and write the sub-annual GTI.
+    `state`: the dirty marks to honour (default: as on disk now)."""
+    path = OUTPUTS[freq]
+    state = _read_state() if state is None else state
+    prev = None
+    if not full:
+        try:
+            with open(path) as f: prev = json.load(f)
+        except Exception: prev = None
+    cal = calendar(freq, start)
+    keep = 0
+    if prev and prev.get("start") == start and prev.get("dates"):
+        marks = [np.datetime64(s["dirty_from"], "D") for k, s in state.items() if s.get("dirty_from") and k in INDICATORS]
+        since = min(marks) if marks else np.datetime64(prev["dates"][-1], "D") + 1
+        old = np.array(prev["dates"], dtype="datetime64[D]")
+        keep = int(np.searchsorted(old, since, side="left"))
+        keep = min(keep, len(old) - 1 if freq == "M" else len(old))  # a month-end row may be partial
+    C, den = align(cal[keep:])
+    w = np.where(np.isnan(C), 0.0, 1.0 / len(ORDER))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        gti = np.nansum(np.nan_to_num(C) * w, axis=1) / w.sum(axis=1)
+    r = lambda a: [None if not np.isfinite(x) else round(float(x), 3) for x in a]
+    new = {"dates": [str(d) for d in cal[keep:]], "gti": r(gti),
+           "by_category": {k: r(C[:, j]) for j, k in enumerate(ORDER)}}
+    if keep and prev:
+        new["dates"] = prev["dates"][:keep] + new["dates"]
+        new["gti"] = prev["gti"][:keep] + new["gti"]
+        new["by_category"] = {k: prev["by_category"].get(k, [None] * keep)[:keep] + v for k, v in new["by_category"].items()}
+    out = {"updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "freq": freq, "start": start,
+           "staleness_days": {k: v[2] for k, v in INDICATORS.items()}, **new,
+           "note": "As-of joined mixed-frequency inputs; category = mean of fresh components, GTI = mean of available categories."}
+    with open(path, "w") as f:
+        json.dump(out, f, separators=(",", ":"))
+    print(f"{os.path.basename(path)}: {len(cal)} {freq} rows ({len(cal) - keep} realigned)", file=sys.stderr)
+    return out
+
+def clear_dirty(consumed):
+    """Drop the dirty marks a compute has used: {name: rev} as snapshotted before it. A series recorded
+    again meanwhile (rev moved on, e.g. by an lkg.refresh thread) keeps its mark for the next run."""
+    with _lock:
+        state = _read_state()
+        for name, rev in consumed.items():
+            s = state.get(name)
+            if s and s.get("rev") == rev: s.pop("dirty_from", None)
+        _write_state(state)
+
+def compute_all(full=False):
+    with _lock:
+        state = _read_state()
+    consumed = {k: s.get("rev") for k, s in state.items() if isinstance(s, dict) and s.get("dirty_from")}
+    for freq in OUTPUTS:
+        compute(freq, full=full, state=state)
+    clear_dirty(consumed)
+
+if __name__ == "__main__":
+    compute_all(full="--full" in sys.argv[1:])
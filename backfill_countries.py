@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# backfill_countries.py — per-country GTI from the same OWID series as backfill_historical.
+# Builds an entity × year × indicator array (ISO3 countries only; OWID_* aggregates dropped),
+# normalizes each indicator against pooled frozen bounds (baseline keys "country:<col>"),
+# composes categories with backfill_historical.compose_categories and writes one shard per country.
+# Writes: data/countries/<ISO3>.json, data/countries/index.json, data/cube/ (float32 cube via cube.py),
+#         data/columnar/annual/ (Parquet/Arrow via columnar.py), data/rollups/ (population-weighted groups via rollups.py),
+#         data/vintages/ (downloaded sources + outputs via vintage.py)
+import json, os, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import baseline, columnar, rollups, shards, vintage
+from cube import write as write_cube
+from backfill_historical import CANDIDATES, ORDER, DATA, RAW, compose_categories, fetch_bytes, read_table, is_country_code
+
+OUT = DATA / "countries"
+FIRST_YEAR = 1900
+
+# CANDIDATES key -> (indicator column, value-column hint, global-only series broadcast to every country)
+SERIES = {
+    "co2":       ("co2_mt",           "co2",     False),
+    "temp":      ("temp_anom",        "anomaly", True),
+    "gdp_pc":    ("gdp_pc",           None,      False),
+    "lifeexp":   ("life_exp",         None,      False),
+    "vdem":      ("vdem",             None,      False),
+    "internet":  ("internet_share",   None,      False),
+    "energyint": ("energy_intensity", None,      False),
+    "battle":    ("battle_deaths",    None,      False),
+}
+
+def fetch_bytes_any(urls):
+    """First candidate that downloads: (raw, url) or (None, None)."""
+    for url in urls:
+        try:
+            return fetch_bytes(url), url
+        except Exception:
+            continue
+    return None, None
+
+def _value_column(df, hint):
+    skip = ("entity", "code", "year")
+    cand = [c for c in df.columns if hint and hint in c and c not in skip]
+    if not cand:
+        cand = [c for c in df.columns if c not in skip and df[c].dtype != "O"]
+    return cand[-1] if cand else None
+
+def shape_panel(args):
+    """Process-pool worker: raw CSV -> (key, codes, names, values[entity, year]) on the FIRST_YEAR..last_year axis."""
+    key, raw, hint, is_global, last_year = args
+    years = np.arange(FIRST_YEAR, last_year + 1)
+    try:
+        df = read_table(raw)
+    except Exception:
+        return key, [], [], np.empty((0, len(years)))
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    vc = _value_column(df, hint)
+    if vc is None or "year" not in df.columns or "entity" not in df.columns:
+        return key, [], [], np.empty((0, len(years)))
+    if is_global:
+        df = df[df["entity"].astype(str).str.lower() == "world"].assign(code="OWID_WRL")
+    elif "code" in df.columns:
+        df = df[is_country_code(df["code"]).values]
+    else:
+        return key, [], [], np.empty((0, len(years)))
+    df = df[(df["year"] >= FIRST_YEAR) & (df["year"] <= last_year)]
+    vals = pd.to_numeric(df[vc], errors="coerce")
+    wide = pd.DataFrame({"code": df["code"].values, "year": df["year"].astype(int).values, "v": vals.values}) \
+        .pivot_table(index="code", columns="year", values="v", aggfunc="mean") \
+        .reindex(columns=years)
+    names = df.drop_duplicates("code").set_index("code")["entity"].reindex(wide.index).astype(str).tolist()
+    return key, wide.index.tolist(), names, wide.to_numpy(dtype="float64")
+
+def build_cube(panels, last_year):
+    """Stack per-series panels into (codes, names, years, cube[entity, year, indicator])."""
+    years = np.arange(FIRST_YEAR, last_year + 1)
+    names = {}
+    for key, codes, nm, _ in panels:
+        if not SERIES[key][2]:
+            names.update(zip(codes, nm))
+    codes = sorted(names)
+    pos = {c: i for i, c in enumerate(codes)}
+    cols = [SERIES[k][0] for k in SERIES]
+    cube = np.full((len(codes), len(years), len(cols)), np.nan)
+    for key, pc, _, vals in panels:
+        j = cols.index(SERIES[key][0])
+        if not len(pc): continue
+        if SERIES[key][2]:
+            cube[:, :, j] = vals[0][None, :]  # global series: same value for every country
+        else:
+            rows = [pos[c] for c in pc]
+            cube[rows, :, j] = vals
+    return codes, [names[c] for c in codes], years, cols, cube
+
+def normalize(cube, cols, base):
+    """Vectorized per-indicator min-max against frozen pooled bounds. Years before a country's first report of an
+    indicator (all years if it never reports it, e.g. internet_share before ~1990) count as 50, so histories reach
+    back to FIRST_YEAR; gaps after the first report stay missing."""
+    N = np.full(cube.shape, np.nan)
+    for j, col in enumerate(cols):
+        x = cube[:, :, j]
+        lo, hi = baseline.bounds(base, f"country:{col}", x.ravel())
+        if lo is None or not np.isfinite(hi - lo) or hi <= lo:
+            N[:, :, j] = np.where(np.isnan(x), np.nan, 50.0)
+        else:
+            N[:, :, j] = np.clip((x - lo) / (hi - lo), 0.0, 1.0) * 100.0
+    not_yet = ~np.logical_or.accumulate(~np.isnan(cube), axis=1)  # (entity, year, indicator): no report up to that year
+    N[not_yet] = 50.0
+    return N
+
+def _shard(code, name, years, cats_e, gti_e, updated, version):
+    ok = np.isfinite(gti_e)
+    span = (years >= years[ok].min()) & (years <= years[ok].max()) if ok.any() else ok
+    return {
+        "code": code, "entity": name, "updated": updated, "baseline_version": version,
+        "series": [{"year": int(y), "gti": round(float(v), 3)} for y, v in zip(years[ok], gti_e[ok])],
+        "by_category": {k: {int(y): round(float(v), 3) for y, v in zip(years[span], cats_e[span, i]) if np.isfinite(v)}
+                        for i, k in enumerate(ORDER)},
+    }
+
+def world_row(years):
+    """(categories[year, k], gti[year]) for the World from gti.json + category files, on the countries' year axis."""
+    g = shards.load(DATA) or {}
+    pos = {int(y): i for i, y in enumerate(years)}
+    C = np.full((len(years), len(ORDER)), np.nan); gti = np.full(len(years), np.nan)
+    for j, k in enumerate(ORDER):
+        for y, v in ((g.get("by_category") or {}).get(k) or {}).items():
+            if int(y) in pos and v is not None: C[pos[int(y)], j] = v
+    for r in g.get("series") or []:
+        if r.get("year") in pos and r.get("gti") is not None: gti[pos[r["year"]]] = r["gti"]
+    return C, gti
+
+def main(argv=None):
+    t0 = time.perf_counter()
+    last_year = time.gmtime().tm_year
+    keys = list(SERIES) + ["population"]  # population: rollup weights only
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        fetched = dict(zip(keys, ex.map(lambda k: fetch_bytes_any(CANDIDATES[k]), keys)))
+    jobs = [(k, raw, SERIES[k][1], SERIES[k][2], last_year) for k, (raw, _) in fetched.items() if raw and k in SERIES]
+    if not jobs:
+        raise SystemExit("No country-level series could be fetched. Please re-run later.")
+    if fetched["population"][0]:
+        jobs.append(("population", fetched["population"][0], "population", False, last_year))
+    with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as ex:
+        panels = list(ex.map(shape_panel, jobs))
+    pop_panel = next((p for p in panels if p[0] == "population"), None)
+    panels = [p for p in panels if p[0] != "population"]
+    t1 = time.perf_counter()
+
+    codes, names, years, cols, cube = build_cube(panels, last_year)
+    base = baseline.load()
+    N = normalize(cube, cols, base)
+    if base.pop("dirty", False):
+        baseline.save(base)
+    neutral = np.full(N.shape[:2], 50.0)
+    cats = compose_categories({c: N[:, :, j] for j, c in enumerate(cols)}, neutral)
+    C = np.stack([cats[k] for k in ORDER], axis=-1)      # entity × year × category
+    w = np.full(len(ORDER), 1.0 / len(ORDER))            # same equal weights as the World series
+    gti = C @ w
+    t2 = time.perf_counter()
+
+    OUT.mkdir(parents=True, exist_ok=True)
+    updated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    index = []
+    for i, (code, name) in enumerate(zip(codes, names)):
+        shard = _shard(code, name, years, C[i], gti[i], updated, base["version"])
+        if not shard["series"]: continue
+        (OUT / f"{code}.json").write_text(json.dumps(shard, separators=(",", ":")))
+        index.append({"code": code, "entity": name, "file": f"{code}.json",
+                      "first": shard["series"][0]["year"], "last": shard["series"][-1]["year"]})
+    (OUT / "index.json").write_text(json.dumps({"updated": updated, "baseline_version": base["version"],
+        "categories": ORDER, "countries": index}, indent=2))
+    wc, wg = world_row(years)
+    write_cube(codes + ["OWID_WRL"], names + ["World"], years, ORDER + ["GTI"],
+               np.concatenate([np.concatenate([C, gti[:, :, None]], axis=-1), np.concatenate([wc, wg[:, None]], axis=-1)[None]]),
+               baseline_version=base["version"])
+    try:
+        columnar.export(["annual"])
+    except Exception as e:
+        print("[warn] columnar export skipped:", e)
+    try:
+        pop = np.full(gti.shape, np.nan)
+        if pop_panel is not None and len(pop_panel[1]):
+            pos = {c: i for i, c in enumerate(pop_panel[1])}
+            have = [i for i, c in enumerate(codes) if c in pos]
+            pop[have] = pop_panel[3][[pos[codes[i]] for i in have]]
+        gdp_pc = cube[:, :, cols.index("gdp_pc")]
+        rollups.save_weights(codes, years, pop, gdp_pc)
+        rollups.write(codes, years, ORDER + ["GTI"], np.concatenate([C, gti[:, :, None]], axis=-1), pop, gdp_pc,
+                      version=base["version"])
+    except Exception as e:
+        print("[warn] rollups skipped:", e)
+    try:
+        vintage.commit(RAW, label="countries")
+    except Exception as e:
+        print("[warn] vintage skipped:", e)
+    print(f"Wrote {len(index)} country shards to {OUT} "
+          f"(fetch+shape {t1-t0:.1f}s, score {len(codes)}×{len(years)}×{len(cols)} in {t2-t1:.3f}s, write {time.perf_counter()-t2:.1f}s)")
+    print("Sources:", {k: u or "none" for k, (_, u) in fetched.items()})
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 # backfill_historical.py — Build annual GTI from public datasets (OWID/UCDP) with robust fallbacks.
-# Writes: data/gti.json
+# Writes: data/gti.json (lean core; decade/tail/category/summary files in data/gti/ via shards.py,
+#         Parquet/Arrow in data/columnar/ via columnar.py; the downloaded sources + outputs as a vintage in data/vintages/)
+# Flags:  --rebaseline   refresh the frozen normalization bounds in data/baseline.json (bumps its version)
+#         --incremental  keep existing gti.json rows and score only years not yet present
+#         --sensitivity[=N]  add p5/p50/p95 GTI bands from N (default 10000) Dirichlet-sampled weightings
+#                            (without it an incremental run keeps the existing bands)
 import io, json, time, pathlib, sys, math
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError, URLError
 import pandas as pd
 import numpy as np
+import asof, baseline, columnar, economic_live, http_client, sensitivity, shards, vintage
 
 DATA = pathlib.Path("data")
 DATA.mkdir(exist_ok=True)
@@ -56,23 +60,38 @@ CANDIDATES = {
         "https://ourworldindata.org/grapher/battle-deaths-absolute.csv",
         "https://ourworldindata.org/grapher/battle-deaths-absolute.csv?download-format=tab",
     ],
+    "population": [  # rollup weights only (rollups.py via backfill_countries.py), not a GTI indicator
+        "https://ourworldindata.org/grapher/population.csv",
+        "https://ourworldindata.org/grapher/population.csv?download-format=tab",
+    ],
 }
 
+RAW = {}  # url -> bytes of every source downloaded this run, recorded as a vintage (vintage.py)
+
+def fetch_bytes(url, timeout=60):
+    RAW[url] = raw = http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout)
+    return raw
+
+def read_table(raw):
+    # try CSV first, then TSV
+    try:
+        return pd.read_csv(io.BytesIO(raw))
+    except Exception:
+        return pd.read_csv(io.BytesIO(raw), sep="\t")
+
 def fetch_csv_any(keys):
     """Try a list of URLs; return (DataFrame, url_used) or (None, None) if all fail."""
     last_err = None
     for url in keys:
         try:
-            req = Request(url, headers={"User-Agent":"Mozilla/5.0"})
-            with urlopen(req, timeout=60) as r:
-                raw = r.read()
-            # try CSV first, then TSV
-            try:
-                df = pd.read_csv(io.BytesIO(raw))
-            except Exception:
-                df = pd.read_csv(io.BytesIO(raw), sep="\t")
+            # parsed tables are memoized per URL, so fetchers in the same process reuse them; the parse
+            # records the body it read, so a parse-memo hit never downloads the file again just for RAW
+            df = http_client.parsed(url, lambda raw, url=url: read_table(RAW.setdefault(url, raw)), "table",
+                                    headers={"User-Agent": "Mozilla/5.0"}, timeout=60, copy=True)
+            if url not in RAW:  # parsed earlier by another module in this process
+                fetch_bytes(url)
             return df, url
-        except (HTTPError, URLError, TimeoutError) as e:
+        except (http_client.HTTPError, OSError, TimeoutError) as e:
             last_err = e
             continue
         except Exception as e:
@@ -95,9 +114,27 @@ def norm_minmax(s, lo=None, hi=None, invert=False):
     if invert: x = 1 - x
     return (x * 100.0)
 
+def flag_value(argv, name, default=None):
+    """`--name` -> default, `--name=V` -> V, absent -> None."""
+    for a in argv:
+        if a == name: return default
+        if a.startswith(name + "="): return a.split("=", 1)[1]
+    return None
+
+def read_json(p, default=None):
+    try:
+        return json.loads(pathlib.Path(p).read_text())
+    except Exception:
+        return default
+
 def safe_merge(left, right, on="year"):
     return pd.merge(left, right, on=on, how="outer")
 
+def is_country_code(codes):
+    """True for ISO3 country codes; False for OWID_* aggregates, regions without a code, etc."""
+    c = pd.Series(codes).astype(str)
+    return (c.str.len() == 3) & c.str.isalpha() & c.str.isupper()
+
 def shape_world(df, value_hint=None, entity_col="Entity", year_col="Year"):
     """Extract World time series; guess value column if needed."""
     if df is None or df.empty:
@@ -113,9 +150,14 @@ def shape_world(df, value_hint=None, entity_col="Entity", year_col="Year"):
         if not cand_vals:
             cand_vals = [c for c in df.columns if c not in (ent,year,"code") and df[c].dtype != "O"]
         world = df[df[ent].str.lower()=="world"] if ent in df.columns else df
+        if world.empty and "code" in df.columns:
+            # some series store "World" as "OWID_WRL" under Code only
+            world = df[df["code"].astype(str) == "OWID_WRL"]
         if world.empty and ent in df.columns:
-            # some series store "World" as "OWID_WRL" under Code only; fallback to aggregate mean
-            world = df.groupby(year, as_index=False).mean(numeric_only=True)
+            # last resort: unweighted mean over real countries (OWID_* and regional rows would double count);
+            # population/GDP-weighted group scores come from rollups.py
+            rows = df[is_country_code(df["code"]).values] if "code" in df.columns else df
+            world = rows.groupby(year, as_index=False).mean(numeric_only=True)
             world["entity"] = "world"
         if not world.empty and cand_vals:
             col = cand_vals[-1]  # prefer the last numeric column (often the series)
@@ -127,7 +169,33 @@ def shape_world(df, value_hint=None, entity_col="Entity", year_col="Year"):
         return df.rename(columns={vcol:"value"})
     return pd.DataFrame(columns=["year","value"])
 
-def main():
+ORDER = ["Planetary Health","Economic Wellbeing","Global Peace & Conflict","Public Health","Civic Freedom & Rights","Technological Progress","Sentiment & Culture","Entropy Index"]
+
+def compose_categories(n, neutral):
+    """Category scores from normalized indicators `n` ({column: 0..100}); missing ones count as `neutral` (50s).
+    Works elementwise, so Series (World) and entity × year arrays (countries) share it."""
+    g = lambda k: n[k] if k in n else neutral
+    cats = {}
+    # Planetary Health: combine temp anomaly (invert) + CO2 (invert), average, keep 0..100
+    cats["Planetary Health"] = (1 - g("temp_anom")/100.0)*50 + (1 - g("co2_mt")/100.0)*50
+    # Economic Wellbeing: GDP per capita (higher better)
+    cats["Economic Wellbeing"] = g("gdp_pc")
+    # Global Peace & Conflict: battle deaths (higher worse → invert)
+    cats["Global Peace & Conflict"] = (1 - g("battle_deaths")/100.0) * 100.0
+    # Public Health: Life expectancy (higher better)
+    cats["Public Health"] = g("life_exp")
+    # Civic Freedom & Rights: V-Dem index (higher better)
+    cats["Civic Freedom & Rights"] = g("vdem")
+    # Technological Progress: internet users % (higher better)
+    cats["Technological Progress"] = g("internet_share")
+    # Sentiment & Culture: placeholder
+    cats["Sentiment & Culture"] = neutral
+    # Entropy Index: energy intensity (higher intensity = worse → invert)
+    cats["Entropy Index"] = (1 - g("energy_intensity")/100.0) * 100.0
+    return cats
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     # ---- Load each series with fallbacks ----
     used = {}  # track which URL worked (for debugging)
     co2_df, used["co2"]     = fetch_csv_any(CANDIDATES["co2"])
@@ -140,14 +208,17 @@ def main():
     bat_df,  used["battle"] = fetch_csv_any(CANDIDATES["battle"])
 
     # ---- Shape into global-year series ----
-    # CO2: sum by year (Mt)
+    # CO2 (Mt): the World row if present; else sum country rows only (aggregates like "Europe" would double count)
     if co2_df is not None and not co2_df.empty:
         cols = [c.lower() for c in co2_df.columns]
         co2_df.columns = cols
-        if "year" in cols and ("co2" in cols or "co2 (mt)" in "".join(cols)):
-            # country-year: sum numeric columns except year/code/entity
+        has_world = "entity" in cols and (co2_df["entity"].astype(str).str.lower()=="world").any()
+        if has_world:
+            co2g = shape_world(co2_df).rename(columns={"value":"co2_mt"})
+        elif "year" in cols and "code" in cols and ("co2" in cols or "co2 (mt)" in "".join(cols)):
+            # country-year: sum numeric columns except year/code/entity, over real countries
             keep = [c for c in co2_df.columns if c not in ("entity","code","year")]
-            tmp = co2_df[["year"] + keep].copy()
+            tmp = co2_df.loc[is_country_code(co2_df["code"]), ["year"] + keep].copy()
             tmp = tmp.groupby("year", as_index=False).sum(numeric_only=True)
             co2g = tmp.rename(columns={keep[-1]:"co2_mt"}) if keep else pd.DataFrame(columns=["year","co2_mt"])
         else:
@@ -190,9 +261,18 @@ def main():
     else:
         batw = pd.DataFrame(columns=["year","battle_deaths"])
 
+    # World Bank inflation/unemployment/growth blend (1960+), straight from the cached WB histories
+    try:
+        eh = economic_live.score_history()
+    except Exception as e:
+        print(f"[warn] World Bank history unavailable: {e}", file=sys.stderr)
+        eh = {}
+    econwb = pd.DataFrame({"year": list(eh.keys()), "econ_wb": list(eh.values())}) if eh else pd.DataFrame(columns=["year","econ_wb"])
+    used["worldbank"] = "api.worldbank.org (cached)" if eh else None
+
     # ---- Join on year ----
     df = None
-    for piece in [co2g, tempg, gdpw, lifew, vd, netw, eintw, batw]:
+    for piece in [co2g, tempg, gdpw, lifew, vd, netw, eintw, batw, econwb]:
         df = piece if df is None else safe_merge(df, piece, on="year")
     if df is None or df.empty:
         # Nothing fetched — fail gracefully with a clear message (but don't 404 the run)
@@ -201,57 +281,86 @@ def main():
     df = df.sort_values("year")
     df = df[(df["year"]>=1900) & (df["year"]<=time.gmtime().tm_year)]
 
-    # ---- Normalize categories [0..100] with sensible invert where “higher=worse” ----
-    cats = {}
-
-    # Planetary Health: combine temp anomaly (invert) + CO2 (invert)
-    ph1 = norm_minmax(df["temp_anom"]) if "temp_anom" in df else pd.Series([50]*len(df), index=df.index)
-    ph2 = norm_minmax(df["co2_mt"])    if "co2_mt"    in df else pd.Series([50]*len(df), index=df.index)
-    cats["Planetary Health"] = (1 - ph1/100.0)*50 + (1 - ph2/100.0)*50  # invert both, average, keep 0..100
-
-    # Economic Wellbeing: GDP per capita (higher better)
-    cats["Economic Wellbeing"] = norm_minmax(df["gdp_pc"]) if "gdp_pc" in df else pd.Series([50]*len(df), index=df.index)
-
-    # Public Health: Life expectancy (higher better)
-    cats["Public Health"] = norm_minmax(df["life_exp"]) if "life_exp" in df else pd.Series([50]*len(df), index=df.index)
-
-    # Global Peace & Conflict: battle deaths (higher worse → invert)
-    if "battle_deaths" in df:
-        b = norm_minmax(df["battle_deaths"])
-        cats["Global Peace & Conflict"] = (1 - b/100.0) * 100.0
+    # ---- Frozen baseline: bounds come from data/baseline.json, not from this run's data ----
+    indicators = [c for c in ("temp_anom","co2_mt","gdp_pc","life_exp","battle_deaths","vdem","internet_share","energy_intensity") if c in df]
+    if "--rebaseline" in argv:
+        base = baseline.rebaseline({c: df[c] for c in indicators}, df["year"])
+        print(f"Rebaselined: data/baseline.json v{base['version']}")
     else:
-        cats["Global Peace & Conflict"] = pd.Series([50]*len(df), index=df.index)
+        base = baseline.load()
+    bounds = {c: baseline.bounds(base, c, df[c], df["year"]) for c in indicators}
+    if base.pop("dirty", False):
+        baseline.save(base)
+    def norm(col):
+        return norm_minmax(df[col], *bounds[col])
 
-    # Civic Freedom & Rights: V-Dem index (higher better)
-    cats["Civic Freedom & Rights"] = norm_minmax(df["vdem"]) if "vdem" in df else pd.Series([50]*len(df), index=df.index)
-
-    # Technological Progress: internet users % (higher better)
-    cats["Technological Progress"] = norm_minmax(df["internet_share"]) if "internet_share" in df else pd.Series([50]*len(df), index=df.index)
+    # ---- Incremental: with a frozen baseline old years can't move, so only score what's new ----
+    prev = None
+    if "--incremental" in argv:
+        prev = shards.load()
+        if prev and prev.get("baseline_version") == base["version"] and prev.get("series"):
+            have = {int(r["year"]) for r in prev["series"] if r.get("gti") is not None and math.isfinite(r["gti"])}
+            df = df[~df["year"].isin(have)]
+        else:
+            prev = None  # baseline changed (or no prior output): full recompute
 
-    # Sentiment & Culture: placeholder
-    cats["Sentiment & Culture"] = pd.Series([50]*len(df), index=df.index)
+    # ---- Normalize categories [0..100] with sensible invert where “higher=worse” ----
+    normed = {c: norm(c) for c in indicators}
+    cats = compose_categories(normed, pd.Series([50.0]*len(df), index=df.index))
 
-    # Entropy Index: energy intensity (higher intensity = worse → invert)
-    if "energy_intensity" in df:
-        e = norm_minmax(df["energy_intensity"])
-        cats["Entropy Index"] = (1 - e/100.0) * 100.0
-    else:
-        cats["Entropy Index"] = pd.Series([50]*len(df), index=df.index)
+    # Economic Wellbeing: averaged with the World Bank blend where it exists
+    if "econ_wb" in df and df["econ_wb"].notna().any():
+        cats["Economic Wellbeing"] = pd.concat([cats["Economic Wellbeing"], df["econ_wb"].astype("float64")], axis=1).mean(axis=1)
 
     # ---- Compose GTI (equal weights placeholder; swap in your hybrid later) ----
-    order = ["Planetary Health","Economic Wellbeing","Global Peace & Conflict","Public Health","Civic Freedom & Rights","Technological Progress","Sentiment & Culture","Entropy Index"]
+    order = ORDER
     weights = {k: 1.0/len(order) for k in order}
     gti_score = sum(weights[k]*cats[k] for k in order)
 
     # ---- Output ----
+    series = [{"year": int(y), "gti": float(v)} for y,v in zip(df["year"].values.tolist(), gti_score.values.tolist())]
+    by_cat = {k: {int(y): float(v) for y,v in zip(df["year"].values.tolist(), cats[k].values.tolist())} for k in order}
+    if prev:
+        fresh = {r["year"] for r in series}
+        series = sorted([r for r in prev["series"] if int(r["year"]) not in fresh] + series, key=lambda r: r["year"])
+        by_cat = {k: {**{int(y): v for y,v in (prev.get("by_category", {}).get(k) or {}).items()}, **by_cat[k]} for k in order}
+        by_cat = {k: dict(sorted(v.items())) for k,v in by_cat.items()}
+        print(f"Incremental: scored {len(fresh)} new year(s) against baseline v{base['version']}")
     out = {
         "updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-        "series": [{"year": int(y), "gti": float(v)} for y,v in zip(df["year"].values.tolist(), gti_score.values.tolist())],
-        "by_category": {k: {int(y): float(v) for y,v in zip(df["year"].values.tolist(), cats[k].values.tolist())} for k in order},
-        "sources_used": {k: (CANDIDATES[k] and "…"+CANDIDATES[k][0][-40:]) if v is None else v for k,v in used.items()},
-        "note": "Historical backfill from public datasets; robust to missing sources; normalized by 5th–95th percentile ranges."
+        "series": series,
+        "by_category": by_cat,
+        "sources_used": {k: (CANDIDATES.get(k) and "…"+CANDIDATES[k][0][-40:]) if v is None else v for k,v in used.items()},
+        "baseline_version": base["version"],
+        "note": f"Historical backfill from public datasets; robust to missing sources; normalized against frozen 5th–95th percentile baseline v{base['version']} (data/baseline.json)."
     }
-    (DATA / "gti.json").write_text(json.dumps(out, indent=2))
+    # ---- Weight sensitivity: every year × N sampled weightings in one batched product ----
+    n_samples = flag_value(argv, "--sensitivity", 10000)
+    if n_samples:
+        years = [r["year"] for r in series]
+        C = np.array([[by_cat[k].get(y, np.nan) for k in order] for y in years], dtype="float64")
+        t0 = time.perf_counter()
+        b = sensitivity.bands(C, [weights[k] for k in order], n=int(n_samples), jitter=0.05)
+        out["bands"] = [{"year": y, "p5": b["p5"][i], "p50": b["p50"][i], "p95": b["p95"][i]} for i, y in enumerate(years)]
+        out["bands_meta"] = {"samples": int(n_samples), "weights": "Dirichlet(100·w)", "bounds_jitter": 0.05, "seed": 0}
+        print(f"Sensitivity bands: {n_samples} samples × {len(years)} years in {time.perf_counter()-t0:.3f}s")
+    elif prev and prev.get("bands"):  # incremental run without --sensitivity: keep the last bands (new years get none until then)
+        out["bands"] = prev["bands"]
+        if prev.get("bands_meta"): out["bands_meta"] = prev["bands_meta"]
+    (DATA / "gti.json").write_text(json.dumps(shards.core(out), indent=2))  # category history goes to data/gti/categories/
+    shards.write(out)
+    try:  # annual category scores join the sub-annual series (only changed years are realigned)
+        asof.record_annual(by_cat, out["updated"])
+    except Exception as e:
+        print("[warn] sub-annual ingest skipped:", e)
+    try:
+        columnar.export(["annual"])
+    except Exception as e:
+        print("[warn] columnar export skipped:", e)
+    try:  # the sources exactly as downloaded + the outputs they produced, deduplicated against earlier runs
+        vintage.commit(RAW, label="backfill")
+    except Exception as e:
+        print("[warn] vintage skipped:", e)
     print(f"Wrote data/gti.json with {len(out['series'])} years.")
     print("Sources (first working url per series):")
     for k,v in used.items():
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# baseline.py — frozen normalization baseline: versioned 5th/95th percentile bounds per indicator.
+# Bounds are captured once (or on an explicit rebaseline) so new observations never move history.
+# Writes: data/baseline.json
+import json, math, time, pathlib, sys
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parent
+BASELINE = ROOT / "data" / "baseline.json"
+Q_LO, Q_HI = 5, 95
+
+def load(path=BASELINE):
+    try:
+        return json.loads(pathlib.Path(path).read_text())
+    except Exception:
+        return {"version": 0, "created": None, "method": f"p{Q_LO}-p{Q_HI}", "indicators": {}}
+
+def save(base, path=BASELINE):
+    pathlib.Path(path).write_text(json.dumps(base, indent=2))
+
+def _quantiles(values, years=None):
+    v = np.asarray(values, dtype="float64")
+    ok = ~np.isnan(v)
+    if not ok.any(): return None
+    entry = {"lo": float(np.percentile(v[ok], Q_LO)), "hi": float(np.percentile(v[ok], Q_HI)), "n": int(ok.sum())}
+    if years is not None:
+        yy = np.asarray(years)[ok]
+        entry["years"] = [int(yy.min()), int(yy.max())]
+    return entry
+
+def rebaseline(columns, years=None, path=BASELINE):
+    """Recompute bounds for every indicator in `columns` ({name: values}) and bump the version."""
+    base = load(path)
+    inds = {}
+    for name, values in columns.items():
+        q = _quantiles(values, years)
+        if q: inds[name] = q
+    base = {"version": int(base.get("version", 0)) + 1, "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "method": f"p{Q_LO}-p{Q_HI}", "indicators": inds}
+    save(base, path)
+    return base
+
+def bounds(base, name, values=None, years=None):
+    """(lo, hi) for `name`; an indicator seen for the first time is frozen from `values` (version unchanged)."""
+    ent = base["indicators"].get(name)
+    if ent is None and values is not None:
+        ent = _quantiles(values, years)
+        if ent:
+            base["indicators"][name] = ent
+            base["version"] = base.get("version") or 1
+            base["created"] = base.get("created") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            base["dirty"] = True
+    return (ent["lo"], ent["hi"]) if ent else (None, None)
+
+def score_point(base, name, value, invert=False):
+    """O(1) score of one new observation against the frozen bounds (0..100, None if unknown)."""
+    ent = base["indicators"].get(name)
+    if ent is None or value is None: return None
+    lo, hi = ent["lo"], ent["hi"]
+    if not math.isfinite(hi - lo) or hi <= lo: return 50.0
+    x = min(max((float(value) - lo) / (hi - lo), 0.0), 1.0)
+    return (1.0 - x) * 100.0 if invert else x * 100.0
+
+if __name__ == "__main__":
+    b = load()
+    print(f"baseline v{b.get('version')} ({b.get('method')}), created {b.get('created')}", file=sys.stderr)
+    for k, v in sorted(b.get("indicators", {}).items()):
+        print(f"  {k}: lo={v['lo']:.4g} hi={v['hi']:.4g} n={v['n']} {v.get('years','')}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+End-to-end scaling benchmark: the real pipeline (backfills, fetchers, category scorers, updater) run
+against synthetic inputs at 1x/10x/100x production scale (synth.py), offline via GTI_MIRROR.
+- Each scale gets a fresh work dir (code + the seed data/ of this checkout) and its own mirror; every
+  step runs as a subprocess there, exactly as the workflow runs it (same cwd-relative paths).
+- Per step: wall time, peak RSS (step + its worker processes), input rows/bytes it reads (from the
+  synth manifest), rows/s and MB/s, and bytes it added under data/. Per scale: output size per data/
+  subdir and, with node on PATH, the JSON.parse time of the payloads script.js loads.
+- Between consecutive scales a step whose seconds-per-input-row grow by more than CLIFF× is flagged
+  superlinear: that is where the next performance cliff is.
+Writes: <out>/bench.json (+ <out>/x<N>/{mirror,work} unless --clean)
+Usage: python bench.py [--scales=1,10,100] [--out=/tmp/gti-bench] [--only=step,...] [--timeout=S] [--clean]
+"""
+import json, os, shutil, signal, subprocess, sys, time
+import backfill_historical as bh
+import fetch_food, fetch_planetary, headlines, planetary_live, scheduler, synth, worldbank
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PY = sys.executable or "python"
+CLIFF = 2.0          # per-row time growth between scales that counts as superlinear
+TIMEOUT = 3600       # per step, seconds
+SEED = ["index.html", "styles.css", "script.js", "sw.js", "data"]
+
+_CAND = {u for us in bh.CANDIDATES.values() for u in us}
+_WB = lambda u: "/indicator/" in u and "api.worldbank.org" in u
+# step -> (command, which mirrored URLs it reads); fetchers/categories as scheduler.py runs them
+STEPS = [
+    ("backfill",   ["backfill_historical.py", "--sensitivity"],  lambda u: u in _CAND and "population" not in u or _WB(u)),
+    ("countries",  ["backfill_countries.py"],                   lambda u: u in _CAND or u == worldbank.COUNTRIES_API),
+    ("markets",    scheduler.SOURCES["markets"]["cmd"],         lambda u: "stooq.com" in u),
+    ("sentiment",  scheduler.SOURCES["sentiment"]["cmd"],       lambda u: "timelinetone" in u),
+    ("conflict",   scheduler.SOURCES["conflict"]["cmd"],        lambda u: "timelinevol" in u),
+    ("planetary",  scheduler.SOURCES["planetary"]["cmd"],       lambda u: u == fetch_planetary.NOAA_CO2),
+    ("food",       scheduler.SOURCES["food"]["cmd"],            lambda u: u in fetch_food.SOURCES),
+    ("employment", scheduler.SOURCES["employment"]["cmd"],      lambda u: "unemployment-rate" in u),
+    ("foodaccess", scheduler.SOURCES["foodaccess"]["cmd"],      lambda u: "undernourishment" in u),
+    ("categories", scheduler.SOURCES["categories"]["cmd"],      lambda u: u in headlines.FEEDS or u == planetary_live.NOAA_CSV or _WB(u)),
+    ("updater",    scheduler.UPDATER,                           lambda u: False),
+]
+# what index.html/script.js parse: first paint, then the Details tab
+PAYLOADS = ["data/gti.json", "data/gti/tail.json", "data/gti/summary.json", "data/status.json", "data/categories.json",
+            "data/sources.json", "data/events.json", "data/summaries.json", "data/changelog/head.json"]
+PARSE_JS = """
+const fs = require('fs'), path = require('path'), [root, ...files] = process.argv.slice(1);
+const out = {};
+for (const f of files) {
+  const p = path.join(root, f); if (!fs.existsSync(p)) continue;
+  const txt = fs.readFileSync(p, 'utf8'); let best = Infinity;
+  for (let i = 0; i < 5; i++) { const t = process.hrtime.bigint(); JSON.parse(txt); best = Math.min(best, Number(process.hrtime.bigint() - t) / 1e6); }
+  out[f] = {bytes: Buffer.byteLength(txt), parse_ms: +best.toFixed(3)};
+}
+console.log(JSON.stringify(out));
+"""
+
+def du(path):
+    total = 0
+    for d, _, files in os.walk(path):
+        for f in files:
+            try: total += os.lstat(os.path.join(d, f)).st_size
+            except OSError: pass
+    return total
+
+def prepare(work):
+    """Fresh work dir: this checkout's code and seed data."""
+    shutil.rmtree(work, ignore_errors=True)
+    os.makedirs(work)
+    for f in os.listdir(ROOT):
+        if f.endswith(".py"): shutil.copy2(os.path.join(ROOT, f), work)
+    for f in SEED:
+        src = os.path.join(ROOT, f)
+        if os.path.isdir(src): shutil.copytree(src, os.path.join(work, f))
+        elif os.path.exists(src): shutil.copy2(src, work)
+
+# runs one step and reports the peak RSS of it and its children; spawned from this small launcher so the
+# figure is not the benchmark's own (fork+exec carries the parent's high-water mark into ru_maxrss)
+LAUNCH = """
+import resource, subprocess, sys
+rc = subprocess.call([sys.executable] + sys.argv[2:])
+open(sys.argv[1], "w").write(str(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss))
+sys.exit(rc)
+"""
+
+def run_step(cmd, work, env, log, timeout=TIMEOUT):
+    """(returncode, wall seconds, peak RSS MB) of one pipeline step, output appended to `log`."""
+    rss_file = log + ".rss"
+    t0 = time.perf_counter()
+    with open(log, "ab") as out:
+        out.write(f"$ {' '.join(cmd)}\n".encode()); out.flush()
+        proc = subprocess.Popen([PY, "-c", LAUNCH, rss_file] + cmd, cwd=work, env=env, stdout=out, stderr=subprocess.STDOUT,
+                                start_new_session=True)
+        try:
+            rc = proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            rc = proc.wait()
+    wall = time.perf_counter() - t0
+    try:
+        with open(rss_file) as f: rss = int(f.read()) / 1024   # ru_maxrss: KB on Linux
+        os.remove(rss_file)
+    except (OSError, ValueError):
+        rss = float("nan")
+    return rc, wall, rss
+
+def parse_times(work):
+    if not shutil.which("node"):
+        return None
+    try:
+        r = subprocess.run(["node", "-e", PARSE_JS, work] + PAYLOADS, capture_output=True, text=True, timeout=120)
+        return json.loads(r.stdout) if r.returncode == 0 else {"error": r.stderr.strip()[-300:]}
+    except Exception as e:
+        return {"error": str(e)}
+
+def bench_scale(scale, out, only=None, timeout=TIMEOUT):
+    base = os.path.join(out, f"x{scale}")
+    mirror, work = os.path.join(base, "mirror"), os.path.join(base, "work")
+    shutil.rmtree(mirror, ignore_errors=True)
+    t0 = time.perf_counter()
+    manifest = synth.generate(mirror, scale)
+    res = {"scale": scale, "synth_s": round(time.perf_counter() - t0, 2),
+           "input_rows": sum(v["rows"] for v in manifest.values()), "input_bytes": sum(v["bytes"] for v in manifest.values()),
+           "steps": {}}
+    prepare(work)
+    env = dict(os.environ, GTI_MIRROR=mirror, PYTHONDONTWRITEBYTECODE="1")
+    data = os.path.join(work, "data")
+    for name, cmd, reads in STEPS:
+        if only and name not in only:
+            continue
+        rows = sum(v["rows"] for u, v in manifest.items() if reads(u))
+        size = sum(v["bytes"] for u, v in manifest.items() if reads(u))
+        before = du(data)
+        rc, wall, rss = run_step(cmd, work, env, os.path.join(base, "steps.log"), timeout)
+        res["steps"][name] = {"rc": rc, "wall_s": round(wall, 3), "peak_rss_mb": round(rss, 1),
+                              "input_rows": rows, "input_mb": round(size / 1e6, 3),
+                              "rows_per_s": round(rows / wall) if rows else None, "mb_per_s": round(size / 1e6 / wall, 2) if size else None,
+                              "output_delta_mb": round((du(data) - before) / 1e6, 3)}
+        s = res["steps"][name]
+        print(f"  x{scale} {name:<11} rc={rc:<3} {wall:8.2f}s {rss:8.1f} MB  {rows:>11} rows  "
+              f"{s['rows_per_s'] or '-':>10} rows/s  +{s['output_delta_mb']} MB", flush=True)
+    res["outputs_mb"] = {d: round(du(os.path.join(data, d)) / 1e6, 3) if os.path.isdir(os.path.join(data, d))
+                         else round(os.path.getsize(os.path.join(data, d)) / 1e6, 3) for d in sorted(os.listdir(data))}
+    res["frontend_parse"] = parse_times(work)
+    return res
+
+def cliffs(results):
+    """Steps whose seconds per input row grow more than CLIFF× from one scale to the next."""
+    out = []
+    for a, b in zip(results, results[1:]):
+        for name, sb in b["steps"].items():
+            sa = a["steps"].get(name)
+            if not sa or sa["rc"] or sb["rc"]:
+                continue
+            ra, rb = sa["input_rows"] or a["input_rows"], sb["input_rows"] or b["input_rows"]  # updater: whole input
+            growth = (sb["wall_s"] / rb) / (sa["wall_s"] / ra) if sa["wall_s"] > 0 and ra and rb else None
+            if growth is not None and growth > CLIFF and sb["wall_s"] > 1.0:
+                out.append({"step": name, "from": a["scale"], "to": b["scale"], "per_row_growth": round(growth, 2),
+                            "wall_s": [sa["wall_s"], sb["wall_s"]]})
+    return out
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    scales = [int(s) for s in (bh.flag_value(argv, "--scales") or "1,10,100").split(",")]
+    out = bh.flag_value(argv, "--out") or "/tmp/gti-bench"
+    only = set((bh.flag_value(argv, "--only") or "").split(",")) - {""}
+    timeout = float(bh.flag_value(argv, "--timeout") or TIMEOUT)
+    os.makedirs(out, exist_ok=True)
+    results = []
+    for scale in scales:
+        print(f"scale x{scale}", flush=True)
+        results.append(bench_scale(scale, out, only, timeout))
+        if "--clean" in argv:
+            shutil.rmtree(os.path.join(out, f"x{scale}"), ignore_errors=True)
+        report = {"generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "cliff": CLIFF,
+                  "results": results, "superlinear": cliffs(results)}
+        with open(os.path.join(out, "bench.json"), "w") as f:   # rewritten per scale: a killed 100x run keeps 1x/10x
+            json.dump(report, f, indent=2)
+    for c in report["superlinear"]:
+        print(f"[cliff] {c['step']}: x{c['from']} -> x{c['to']} per-row time grew {c['per_row_growth']}× ({c['wall_s'][0]}s -> {c['wall_s'][1]}s)")
+    failed = [(r["scale"], n) for r in results for n, s in r["steps"].items() if s["rc"]]
+    if failed:
+        print("[warn] failed steps:", failed, f"(see {out}/x<N>/steps.log)")
+    print("Wrote", os.path.join(out, "bench.json"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# categories.py — run every *_live category scorer in one process and refresh data/categories.json
+# The scorers run in parallel threads; the BBC/Al Jazeera/NYT feeds that entropy, health, peace and
+# sentiment all read are downloaded and parsed once (http_client single-flight + TTL memo).
+# Categories without a live scorer keep their previous score. Afterwards every headline read is
+# archived with its lexicon hits (headlines.py) for drill-down.
+# Writes: data/categories.json, data/headlines.sqlite
+import datetime, importlib, json, pathlib, time
+from concurrent.futures import ThreadPoolExecutor
+import headlines
+
+OUT = pathlib.Path(__file__).resolve().parent / "data" / "categories.json"
+
+SCORERS = {
+    "Planetary Health":        "planetary_live",
+    "Economic Wellbeing":      "economic_live",
+    "Global Peace & Conflict": "peace_live",
+    "Public Health":           "health_live",
+    "Sentiment & Culture":     "sentiment_live",
+    "Entropy Index":           "entropy_live",
+}
+
+def main():
+    try:
+        prev = json.loads(OUT.read_text())
+    except Exception:
+        prev = {}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(SCORERS)) as ex:
+        futs = {cat: ex.submit(lambda m: importlib.import_module(m).get_score(), mod) for cat, mod in SCORERS.items()}
+    scores = dict(prev.get("scores") or {})
+    for cat, fut in futs.items():
+        try:
+            scores[cat] = fut.result()
+        except Exception as e:
+            print(f"[warn] {cat}: {e} (kept {scores.get(cat)})")
+    out = {"updated": datetime.datetime.utcnow().isoformat() + "Z", "scores": scores}
+    OUT.write_text(json.dumps(out, indent=2))
+    print(f"categories.json in {time.perf_counter() - t0:.1f}s:", scores)
+    try:
+        print(f"{headlines.archive()} new headlines archived")  # same parsed feeds, no refetch
+    except Exception as e:
+        print(f"[warn] headline archive: {e}")
+
+if __name__ == "__main__":
+    main()
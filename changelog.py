@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# changelog.py — bounded change log: append-only month log + small head + immutable month segments.
+# Writes: data/changelog/head.json      (last HEAD_N entries; the only file the page loads first)
+#         data/changelog/log.jsonl      (append-only, current month)
+#         data/changelog/YYYY-MM.json   (compacted past months; identical runs collapsed)
+#         data/changelog/index.json     (segments newest first, for paging backwards)
+import json, sys, time, pathlib
+
+ROOT = pathlib.Path(__file__).resolve().parent
+DIR = ROOT / "data" / "changelog"
+LEGACY = ROOT / "data" / "changelog.json"
+HEAD_N = 20
+
+def read_json(p, default=None):
+    try:
+        return json.loads(pathlib.Path(p).read_text())
+    except Exception:
+        return default
+
+def _month(date):
+    return str(date)[:7]  # "YYYY-MM" from "YYYY-MM-DD[ HH:MM:SS UTC]"
+
+def _read_log():
+    p = DIR / "log.jsonl"
+    if not p.exists(): return []
+    out = []
+    for ln in p.read_text().splitlines():
+        try: out.append(json.loads(ln))
+        except Exception: continue
+    return out
+
+def collapse(entries):
+    """Collapse consecutive entries with identical text into one run with count/date_last."""
+    runs = []
+    for e in entries:
+        last = runs[-1] if runs else None
+        if last and last["change"] == e["change"]:
+            last["count"] += e.get("count", 1)
+            last["date_last"] = e.get("date_last", e["date"])
+        else:
+            runs.append({"date": e["date"], "date_last": e.get("date_last", e["date"]),
+                         "change": e["change"], "count": e.get("count", 1)})
+    return runs
+
+def compact(current=None):
+    """Move every month older than `current` out of log.jsonl into its YYYY-MM.json segment."""
+    current = current or time.strftime("%Y-%m", time.gmtime())
+    entries = _read_log()
+    old = [e for e in entries if _month(e["date"]) < current]
+    if not old: return 0
+    keep = [e for e in entries if _month(e["date"]) >= current]
+    index = read_json(DIR / "index.json", default={}) or {}
+    segs = {s["month"]: s for s in index.get("segments", [])}
+    for m in sorted({_month(e["date"]) for e in old}):
+        seg_path = DIR / f"{m}.json"
+        prior = (read_json(seg_path, default={}) or {}).get("entries", [])  # late arrivals only
+        runs = collapse(prior + [e for e in old if _month(e["date"]) == m])
+        seg_path.write_text(json.dumps({"month": m, "entries": runs}, indent=2, ensure_ascii=False))
+        segs[m] = {"month": m, "file": seg_path.name, "runs": len(runs),
+                   "entries": sum(r["count"] for r in runs), "first": runs[0]["date"], "last": runs[-1]["date_last"]}
+    index = {"updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "head": "head.json",
+             "segments": sorted(segs.values(), key=lambda s: s["month"], reverse=True)}
+    (DIR / "index.json").write_text(json.dumps(index, indent=2))
+    (DIR / "log.jsonl").write_text("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in keep))
+    return len(old)
+
+def _write_head(entries):
+    head = {"updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "index": "index.json",
+            "entries": collapse(entries)[-HEAD_N:]}
+    (DIR / "head.json").write_text(json.dumps(head, indent=2, ensure_ascii=False))
+
+def append(change, date=None):
+    """Append one entry; constant-size work (one log line + head rewrite) except on month rollover."""
+    DIR.mkdir(parents=True, exist_ok=True)
+    date = date or time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+    entry = {"date": date, "change": change}
+    if any(_month(e["date"]) < _month(date) for e in _read_log()[:1]):
+        compact(_month(date))
+    with open(DIR / "log.jsonl", "a") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    head = (read_json(DIR / "head.json", default={}) or {}).get("entries", [])
+    _write_head(head + [entry])
+    if not (DIR / "index.json").exists():
+        (DIR / "index.json").write_text(json.dumps({"updated": None, "head": "head.json", "segments": []}, indent=2))
+    return entry
+
+def migrate():
+    """One-off import of the legacy data/changelog.json; removes it once the new layout is written."""
+    legacy = (read_json(LEGACY, default={}) or {}).get("entries", [])
+    if not legacy: return 0
+    DIR.mkdir(parents=True, exist_ok=True)
+    with open(DIR / "log.jsonl", "a") as f:
+        for e in legacy:
+            f.write(json.dumps({"date": e["date"], "change": e["change"]}, ensure_ascii=False) + "\n")
+    compact()
+    _write_head(legacy)
+    if not (DIR / "index.json").exists():
+        (DIR / "index.json").write_text(json.dumps({"updated": None, "head": "head.json", "segments": []}, indent=2))
+    LEGACY.unlink()
+    return len(legacy)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args[:1] == ["--migrate"]:
+        print(f"Migrated {migrate()} legacy entries into {DIR}")
+    elif args[:1] == ["--compact"]:
+        print(f"Compacted {compact()} entries")
+    elif args:
+        print("Appended:", append(" ".join(args)))
+    else:
+        print("usage: changelog.py <message> | --migrate | --compact", file=sys.stderr)
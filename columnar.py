@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the GTI history and the live readings: Parquet + Arrow IPC, one stable long schema
+  entity: string, period: string, category: string, value: double, source_version: string
+- annual: World rows from gti.json + data/gti/categories (entity OWID_WRL, the 8 categories + "GTI") and every country from
+  the cube (backfill_countries.py); source_version = the frozen baseline version.
+- live: every reading in the SQLite store (store.py) as entity "World", category "<source>:<metric>",
+  period = observation time, source_version = fetch time (all vintages are kept).
+Datasets are hive-partitioned by year, one tree per format so each reads as a dataset:
+data/columnar/parquet/<dataset>/year=YYYY/part.parquet and data/columnar/arrow/<dataset>/year=YYYY/part.arrow
+(IPC file format, memory-mappable). A partition is rewritten only when its rows changed;
+data/columnar/manifest.json lists each partition's rows, content hash and write time, so incremental
+consumers read only what moved. Missing values are dropped, so NaN never reaches the files.
+pyarrow is optional: without it the export is skipped with a note.
+Usage: python columnar.py [annual] [live]
+"""
+import hashlib, json, os, pathlib, shutil, sys
+import numpy as np
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+import cube, shards, store
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR = os.path.join(ROOT, "data", "columnar")
+DATA = pathlib.Path(ROOT) / "data"
+WORLD = "OWID_WRL"
+FIELDS = ("entity", "period", "category", "value", "source_version")
+SCHEMA = pa.schema([("entity", pa.string()), ("period", pa.string()), ("category", pa.string()),
+                    ("value", pa.float64()), ("source_version", pa.string())]) if pa else None
+
+def read_json(p, default=None):
+    try:
+        with open(p) as f: return json.load(f)
+    except Exception:
+        return default
+
+def _columns(entity, period, category, value, version, year):
+    keep = np.isfinite(value)
+    return {"entity": np.asarray(entity, dtype=object)[keep], "period": np.asarray(period, dtype=object)[keep],
+            "category": np.asarray(category, dtype=object)[keep], "value": np.asarray(value, dtype="float64")[keep],
+            "source_version": np.asarray(version, dtype=object)[keep], "year": np.asarray(year, dtype="int64")[keep]}
+
+def annual():
+    """World rows (gti.json + category files) + country rows from the cube, as column arrays (+ a year key)."""
+    g = shards.load(DATA) or {}
+    version = str(g.get("baseline_version", ""))
+    rows = [(int(y), k, v) for k, hist in (g.get("by_category") or {}).items() for y, v in hist.items() if v is not None]
+    rows += [(int(r["year"]), "GTI", r["gti"]) for r in g.get("series") or [] if r.get("gti") is not None]
+    y = np.array([r[0] for r in rows], dtype="int64")
+    parts = [_columns([WORLD] * len(rows), y.astype(str), [r[1] for r in rows], [float(r[2]) for r in rows],
+                      [version] * len(rows), y)]
+    try:
+        h = cube.header()
+    except FileNotFoundError:
+        h = None
+    if h:
+        ents = [e for e in h["entities"] if e != WORLD]
+        periods, v = cube.query(ents)
+        e, p, l = np.nonzero(np.ones(v.shape, dtype=bool))
+        years = np.array([int(str(x)[:4]) for x in periods])
+        parts.append(_columns(np.array(ents, dtype=object)[e], periods.astype(str)[p], np.array(h["layers"], dtype=object)[l],
+                              v.reshape(-1), np.full(e.size, str(h.get("baseline_version", "")), dtype=object), years[p]))
+    return {k: np.concatenate([c[k] for c in parts]) for k in parts[0]}
+
+def live():
+    """Every stored reading (all vintages) as column arrays (+ a year key)."""
+    rows = store.connect().execute("""SELECT source, metric, observed_at, fetched_at, value FROM readings
+                                      WHERE value IS NOT NULL ORDER BY source, metric, observed_at, fetched_at""").fetchall()
+    return _columns(["World"] * len(rows), [r[2] for r in rows], [f"{r[0]}:{r[1]}" for r in rows],
+                    [r[4] for r in rows], [r[3] for r in rows], [int(r[2][:4]) for r in rows])
+
+DATASETS = {"annual": annual, "live": live}
+
+def _replace(path, write):
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def write(dataset, cols, out=OUT_DIR):
+    """Write changed year partitions of one dataset and update the manifest; returns #partitions rewritten."""
+    man_path = os.path.join(out, "manifest.json")
+    manifest = read_json(man_path, {}) or {}
+    old = (manifest.get(dataset) or {}).get("partitions", {})
+    parts, changed, now = {}, 0, store.now_iso()
+    order = np.argsort(cols["year"], kind="stable")
+    years = cols["year"][order]
+    for sl in np.split(order, np.flatnonzero(np.diff(years)) + 1) if order.size else []:
+        year = str(int(cols["year"][sl[0]]))
+        table = pa.table({f: pa.array(cols[f][sl], type=SCHEMA.field(f).type) for f in FIELDS}, schema=SCHEMA)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, SCHEMA) as w:
+            w.write_table(table)
+        buf = sink.getvalue()
+        sha = hashlib.sha1(buf).hexdigest()
+        pq_path, ipc_path = (os.path.join(out, fmt, dataset, f"year={year}", f"part.{fmt}") for fmt in ("parquet", "arrow"))
+        prev = old.get(year) or {}
+        if prev.get("sha1") == sha and os.path.exists(pq_path) and os.path.exists(ipc_path):
+            parts[year] = prev
+            continue
+        def write_arrow(p, buf=buf):
+            with open(p, "wb") as f: f.write(buf.to_pybytes())
+        for path, writer in ((ipc_path, write_arrow), (pq_path, lambda p, t=table: pq.write_table(t, p, compression="zstd"))):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _replace(path, writer)
+        parts[year] = {"rows": table.num_rows, "sha1": sha, "written": now}
+        changed += 1
+    for year in set(old) - set(parts):
+        for fmt in ("parquet", "arrow"):
+            shutil.rmtree(os.path.join(out, fmt, dataset, f"year={year}"), ignore_errors=True)
+    manifest[dataset] = {"updated": now, "rows": int(order.size), "schema": [f"{f.name}:{f.type}" for f in SCHEMA],
+                         "partitions": dict(sorted(parts.items()))}
+    os.makedirs(out, exist_ok=True)
+    def write_manifest(p):
+        with open(p, "w") as f: json.dump(manifest, f, indent=1)
+    _replace(man_path, write_manifest)
+    print(f"columnar {dataset}: {order.size} rows, {changed}/{len(parts)} year partition(s) rewritten in {out}")
+    return changed
+
+def export(datasets=tuple(DATASETS), out=OUT_DIR):
+    if pa is None:
+        print("columnar export skipped (pyarrow not installed)")
+        return
+    for name in datasets:
+        write(name, DATASETS[name](), out)
+
+if __name__ == "__main__":
+    export(sys.argv[1:] or tuple(DATASETS))
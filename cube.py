@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped entity × period × layer cube (float32) for the category history.
+- data/cube/cube-<hash>.f32 holds a raw C-order float32 array; data/cube/header.json describes the axes
+  and names the body it belongs to: {version, body, dtype, shape, entities, names, periods, layers,
+  updated, baseline_version}. write() lands a new body under a fresh name, then atomically replaces the
+  header, so a reader always pairs a header with its own body (the previous body is kept one round).
+  layers = the 8 categories in ORDER + "GTI"; periods are years (or ISO dates for a sub-annual calendar).
+- write() is called by backfill_countries.py (countries + the World row from gti.json).
+- query() maps the body read-only and slices only the requested rows; hot slices are kept in an
+  LRU cache keyed by the header's mtime, so a rewritten cube never serves stale slices.
+Usage: python cube.py USA "Public Health,GTI" 2000 2020
+"""
+import hashlib, json, os, sys, time
+from functools import lru_cache
+import numpy as np
+
+CUBE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cube")
+HEADER = "header.json"
+BODY = "cube.f32"   # body of headers written before bodies were versioned
+VERSION = 1
+
+def write(entities, names, periods, layers, values, baseline_version=None, out=CUBE_DIR):
+    """values: (entities, periods, layers) array; written atomically as float32 + header."""
+    values = np.ascontiguousarray(values, dtype="float32")
+    assert values.shape == (len(entities), len(periods), len(layers)), values.shape
+    os.makedirs(out, exist_ok=True)
+    try:
+        with open(os.path.join(out, HEADER)) as f: prev = json.load(f).get("body", BODY)
+    except (OSError, ValueError):
+        prev = None
+    body = f"cube-{hashlib.blake2b(memoryview(values).cast('B'), digest_size=8).hexdigest()}.f32"  # same values, same name
+    tmp = os.path.join(out, body + ".tmp")
+    with open(tmp, "wb") as f:
+        values.tofile(f); f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(out, body))
+    header = {"version": VERSION, "body": body, "dtype": "float32", "shape": list(values.shape),
+              "entities": list(entities), "names": list(names),
+              "periods": [p if isinstance(p, str) else int(p) for p in periods], "layers": list(layers),
+              "updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "baseline_version": baseline_version}
+    with open(os.path.join(out, HEADER + ".tmp"), "w") as f:
+        json.dump(header, f, separators=(",", ":")); f.flush(); os.fsync(f.fileno())
+    os.replace(os.path.join(out, HEADER + ".tmp"), os.path.join(out, HEADER))  # the switch: header -> new body
+    for f in os.listdir(out):  # older bodies; the previous one stays for readers that just read the old header
+        if f.endswith(".f32") and f not in (body, prev):
+            os.remove(os.path.join(out, f))
+    print(f"Wrote cube {values.shape[0]}×{values.shape[1]}×{values.shape[2]} float32 ({values.nbytes / 1e6:.1f} MB) to {out}")
+    return header
+
+def _stamp(path):
+    st = os.stat(os.path.join(path, HEADER))
+    return st.st_mtime_ns, st.st_size
+
+@lru_cache(maxsize=4)
+def _open(path, stamp):
+    """(header, index dicts, memmap) for one version of the cube file."""
+    with open(os.path.join(path, HEADER)) as f:
+        h = json.load(f)
+    mm = np.memmap(os.path.join(path, h.get("body", BODY)), dtype=h["dtype"], mode="r", shape=tuple(h["shape"]))
+    ent = {e: i for i, e in enumerate(h["entities"])}
+    lay = {l: i for i, l in enumerate(h["layers"])}
+    return h, ent, lay, np.array(h["periods"]), mm
+
+@lru_cache(maxsize=512)
+def _slice(path, stamp, rows, cols, lo, hi):
+    h, _, _, _, mm = _open(path, stamp)
+    out = np.array(mm[list(rows), lo:hi][:, :, list(cols)])  # copies just this block out of the map
+    out.setflags(write=False)
+    return out
+
+def header(path=CUBE_DIR):
+    return _open(path, _stamp(path))[0]
+
+def query(entities, layers=None, start=None, end=None, path=CUBE_DIR):
+    """(periods, values[entity, period, layer]) for entity codes × layer names × [start, end] (inclusive).
+    Unknown entities/layers raise KeyError; the returned array is read-only and may be shared."""
+    stamp = _stamp(path)
+    h, ent, lay, periods, _ = _open(path, stamp)
+    entities = [entities] if isinstance(entities, str) else list(entities)
+    layers = h["layers"] if layers is None else ([layers] if isinstance(layers, str) else list(layers))
+    rows = tuple(ent[e] for e in entities)
+    cols = tuple(lay[l] for l in layers)
+    lo = 0 if start is None else int(np.searchsorted(periods, start, side="left"))
+    hi = len(periods) if end is None else int(np.searchsorted(periods, end, side="right"))
+    return periods[lo:hi], _slice(path, stamp, rows, cols, lo, hi)
+
+def series(entity, layer, start=None, end=None, path=CUBE_DIR):
+    """{period: value} for one entity and layer, NaN periods skipped."""
+    periods, v = query(entity, layer, start, end, path)
+    return {p.item(): round(float(x), 4) for p, x in zip(periods, v[0, :, 0]) if np.isfinite(x)}
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        h = header(); print(json.dumps({k: h[k] for k in ("shape", "layers", "updated", "baseline_version")})); sys.exit()
+    ent, lays = args[0].split(","), (args[1].split(",") if len(args) > 1 else None)
+    a, b = (int(args[2]) if len(args) > 2 else None), (int(args[3]) if len(args) > 3 else None)
+    t = time.perf_counter(); periods, v = query(ent, lays, a, b)
+    t1 = time.perf_counter(); query(ent, lays, a, b); t2 = time.perf_counter()
+    for e, block in zip(ent, v):
+        for p, row in zip(periods, block):
+            print(e, p, " ".join("—" if not np.isfinite(x) else f"{x:.2f}" for x in row))
+    print(f"cold {1e6 * (t1 - t):.0f} µs, cached {1e6 * (t2 - t1):.0f} µs", file=sys.stderr)
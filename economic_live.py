@@ -6,42 +6,24 @@ Indicators (latest available year):
 - Unemployment, total (% of total labor force) SL.UEM.TOTL.ZS  (lower better)
 - GDP per capita growth (annual %)             NY.GDP.PCAP.KD.ZG (higher up to ~4–5% best)
 
-Outputs a 0–100 score (higher = better).
+Outputs a 0–100 score (higher = better). Histories come from worldbank.py's cache;
+score_history() gives the same blend per year for the historical backfill.
 """
-import json, os, math
-from urllib.request import urlopen
-from urllib.error import URLError
+import json, os
+import numpy as np
+import scoring, worldbank
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
 
-BASE = "https://api.worldbank.org/v2/country/WLD/indicator/{code}?format=json&per_page=70"  # ~70 years
-
 CODES = {
     "inflation": "FP.CPI.TOTL.ZG",
     "unemployment": "SL.UEM.TOTL.ZS",
     "gdp_pc_growth": "NY.GDP.PCAP.KD.ZG",
 }
-
-def _fetch_latest(code):
-    url = BASE.format(code=code)
-    with urlopen(url, timeout=15) as resp:
-        data = json.load(resp)
-    # data[1] is list of observations with latest first (not guaranteed)
-    vals = []
-    for row in data[1]:
-        v = row.get("value", None)
-        if v is not None:
-            try:
-                year = int(row.get("date", "0"))
-                vals.append((year, float(v)))
-            except Exception:
-                pass
-    if not vals:
-        return None
-    # pick the most recent year with a number
-    vals.sort(key=lambda x: x[0], reverse=True)
-    return vals[0][1]
+# normalize.json curve per indicator, and blend weights (inflation 0.4, unemployment 0.4, gdp_pc_growth 0.2)
+CURVES  = {"inflation": "inflation_yoy", "unemployment": "unemployment", "gdp_pc_growth": "gdp_pc_growth"}
+WEIGHTS = {"inflation": 0.4, "unemployment": 0.4, "gdp_pc_growth": 0.2}
 
 def _last_econ():
     try:
@@ -51,75 +33,49 @@ def _last_econ():
     except Exception:
         return 50.0
 
+# Curves live in data/normalize.json (see scoring.py); these stay as the scalar entry points.
 def score_inflation(pct):
-    # 2% -> 100; 5% -> ~70; 10% -> ~40; >=20% -> ~10; deflation (<0) penalized slightly
-    if pct is None:
-        return None
-    # Penalize both high inflation and deflation
-    if pct >= 0:
-        # linear from 2%..20% to 100..10; below 2% up to 0 gets small penalty, < -2% worse
-        if pct <= 2.0: return 95 + (2.0 - pct) * 2.5  # 2%->95, 0%->100, mild deflation improves slightly
-        if pct >= 20.0: return 10.0
-        return 100 - (pct - 2.0) * (90.0 / 18.0)
-    else:
-        # Deflation risk: -2% -> 70, lower gets worse
-        if pct <= -4.0: return 40.0
-        # 0 to -4 maps from 100 down to 40
-        return 100 + (pct) * 15.0  # -2% -> 70
+    # 2% -> 100; 20% -> 10; deflation penalized (0% -> 95, <=-4% -> 40)
+    return scoring.score("inflation_yoy", pct)
 
 def score_unemployment(pct):
-    # 3% -> 95; 5% -> 85; 10% -> 60; 20% -> ~25; >25% -> 15
-    if pct is None:
-        return None
-    if pct <= 3.0: return 95.0
-    if pct >= 25.0: return 15.0
-    # map 3..25 to 95..15 linearly
-    return 95.0 - (pct - 3.0) * (80.0 / 22.0)
+    # 3% -> 95; 25% -> 15 linear, flat beyond
+    return scoring.score("unemployment", pct)
 
 def score_gdp_pc_growth(pct):
     # -10% -> 10; -2% -> 40; 0% -> 55; 2% -> 75; 4% -> 90; >=6% -> 95
-    if pct is None:
-        return None
-    if pct <= -10.0: return 10.0
-    if pct >= 6.0: return 95.0
-    # piecewise linear
-    if pct < -2.0:
-        # -10..-2 -> 10..40
-        return 10.0 + (pct + 10.0) * (30.0 / 8.0)
-    if pct < 0.0:
-        # -2..0 -> 40..55
-        return 40.0 + (pct + 2.0) * (15.0 / 2.0)
-    if pct < 2.0:
-        # 0..2 -> 55..75
-        return 55.0 + pct * 10.0
-    if pct < 4.0:
-        # 2..4 -> 75..90
-        return 75.0 + (pct - 2.0) * 7.5
-    # 4..6 -> 90..95
-    return 90.0 + (pct - 4.0) * 2.5
+    return scoring.score("gdp_pc_growth", pct)
 
 def clamp01x100(v):
     if v is None: return None
     return max(min(v, 100.0), 0.0)
 
+def score_history(country="WLD"):
+    """Yearly Economic Wellbeing scores from the cached World Bank histories: {year: score}."""
+    hist = worldbank.histories(CODES.values(), country)
+    years = sorted({y for ys, _ in hist.values() for y in ys})
+    if not years: return {}
+    num = np.zeros(len(years)); den = np.zeros(len(years))
+    pos = {y: i for i, y in enumerate(years)}
+    for key, code in CODES.items():
+        ys, vals = hist[code]
+        raw = np.full(len(years), np.nan)
+        raw[[pos[y] for y in ys]] = vals
+        s = scoring.apply(CURVES[key], raw)
+        ok = ~np.isnan(s)
+        num[ok] += s[ok] * WEIGHTS[key]; den[ok] += WEIGHTS[key]
+    return {y: round(float(n / d), 2) for y, n, d in zip(years, num, den) if d > 0}
+
 def get_score():
     try:
-        infl = _fetch_latest(CODES["inflation"])
-        une  = _fetch_latest(CODES["unemployment"])
-        gdp  = _fetch_latest(CODES["gdp_pc_growth"])
-
-        s_infl = clamp01x100(score_inflation(infl))
-        s_une  = clamp01x100(score_unemployment(une))
-        s_gdp  = clamp01x100(score_gdp_pc_growth(gdp))
-
-        # Combine: inflation 0.4, unemployment 0.4, gdp_pc_growth 0.2
-        parts = [(s_infl, 0.4), (s_une, 0.4), (s_gdp, 0.2)]
+        latest = worldbank.latest(CODES.values())
+        parts = [(clamp01x100(scoring.score(CURVES[k], latest[CODES[k]])), WEIGHTS[k]) for k in CODES]
         vals = [v*w for (v,w) in parts if v is not None]
         wsum = sum(w for (v,w) in parts if v is not None)
         if not vals or wsum == 0:
             return _last_econ()
         return round(sum(vals)/wsum, 2)
-    except URLError:
+    except OSError:
         return _last_econ()
     except Exception:
         return _last_econ()
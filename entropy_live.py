@@ -6,8 +6,8 @@ Higher = worse (more disorder). Returns 0–100 and is used both as:
 - Modifier: multiplicative drag in GTI calculation
 """
 import os, json, re
-from urllib.request import urlopen
 from xml.etree import ElementTree as ET
+import http_client, scoring
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
@@ -35,8 +35,7 @@ def _last_entropy():
         return 50.0
 
 def _fetch(url):
-    with urlopen(url, timeout=10) as resp:
-        return ET.fromstring(resp.read())
+    return http_client.parsed(url, ET.fromstring, "xml", timeout=10)
 
 def _titles(root):
     out=[]
@@ -66,10 +65,9 @@ def get_score():
                 continue
         if not scores: return _last_entropy()
         avg=sum(scores)/len(scores)
-        # Map average risk tokens to 0..100 (tune as needed)
-        # 0 tokens -> 30, 0.5 -> 50, 1.5 -> 70, >=3 -> ~90+
-        mapped = 30 + max(min(avg, 3.0), 0.0) * 20
-        return round(max(min(mapped, 100.0), 0.0), 2)
+        # Map average risk tokens to 0..100 (curve "risk_density" in normalize.json)
+        # 0 tokens -> 30, 0.5 -> 40, 1.5 -> 60, >=3 -> 90
+        return round(scoring.score("risk_density", avg), 2)
     except Exception:
         return _last_entropy()
 
@@ -2,7 +2,8 @@
 # fetch_conflict.py — GDELT Timelines (30d "conflict/violence" volume proxy). No API key.
 # Writes: data/live/conflict.json
 import json, os, sys, time, pathlib, urllib.parse
-from urllib.request import urlopen, Request
+from concurrent.futures import ThreadPoolExecutor
+import asof, http_client, lkg
 
 OUT = pathlib.Path("data/live/conflict.json")
 OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -26,9 +27,7 @@ def fetch_series(query: str, timespan="60d", smooth=7):
         "timelinesmooth": str(smooth),
     }
     url = BASE + "?" + urllib.parse.urlencode(params)
-    req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    with urlopen(req, timeout=30) as r:
-        data = json.loads(r.read().decode("utf-8", errors="ignore"))
+    data = json.loads(http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30).decode("utf-8", errors="ignore"))
     # The JSON usually has: {"timeline":[{"value":"...","date":"YYYYMMDD"...}, ...]} under various keys.
     # We attempt to find numeric series by scanning values.
     series = []
@@ -64,14 +63,14 @@ def mean(vals):
 def main():
     updated_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     # Fetch and combine multiple theme series
-    buckets = []
-    for q in QUERIES:
+    # Submitted together; http_client paces them to GDELT's per-host limit
+    def safe(q):
         try:
-            s = fetch_series(q)
-            if s:
-                buckets.append(s)
+            return fetch_series(q)
         except Exception:
-            continue
+            return []
+    with ThreadPoolExecutor(max_workers=len(QUERIES)) as ex:
+        buckets = [s for s in ex.map(safe, QUERIES) if s]
 
     # Align by date and average across queries
     combined = []
@@ -89,6 +88,8 @@ def main():
             if vals:
                 combined.append((d, mean(vals)))
 
+    asof.record("conflict_vol", combined)  # native daily timeline for the sub-annual GTI
+
     # Compute last value and 30d averages vs prior 30d
     last_val = None
     avg_last30 = None
@@ -118,19 +119,9 @@ def main():
         "note": "GDELT Timelines combined: VIOLENCE, CONFLICT, PROTEST, ARREST (7‑day smooth, 60d window)."
     }
 
-    # Preserve previous file on total failure
-    if all(v is None for v in [last_val, avg_last30]):
-        if OUT.exists():
-            try:
-                cached = json.loads(OUT.read_text())
-                cached["note"] = "Using cached conflict.json (fetch failed)."
-                OUT.write_text(json.dumps(cached, indent=2))
-                print("conflict.json: cached")
-                return
-            except Exception:
-                pass
-
-    OUT.write_text(json.dumps(data, indent=2))
+    # Replaces the cached file only when complete; otherwise the last-known-good value is kept (stale)
+    if not lkg.store("conflict", data):
+        return
     print("conflict.json:", json.dumps(data)[:200] + ("..." if len(json.dumps(data))>200 else ""))
 
 if __name__ == "__main__":
@@ -2,8 +2,8 @@
 # fetch_employment.py — OWID: unemployment rate (World)
 # Writes: data/live/employment.json
 import json, io, time, pathlib
-from urllib.request import urlopen, Request
 import pandas as pd
+import asof, http_client, lkg
 
 OUT = pathlib.Path("data/live/employment.json")
 OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -14,9 +14,7 @@ URLS = [
 ]
 
 def fetch_csv(url):
-    req = Request(url, headers={"User-Agent":"Mozilla/5.0"})
-    with urlopen(req, timeout=45) as r:
-        raw = r.read()
+    raw = http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=45)
     try:
         return pd.read_csv(io.BytesIO(raw))
     except Exception:
@@ -38,30 +36,21 @@ def main():
                     vc = val_col[0]
                     world = df[df["entity"].str.lower()=="world"].sort_values("year")
                     if len(world) >= 2:
+                        asof.record("unemployment", zip(world["year"].map(lambda y: f"{int(y)}-12-31"), world[vc]))
                         last = float(world[vc].iloc[-1])
                         prev = float(world[vc].iloc[-2])
                         break
         except Exception:
             continue
 
-    if last is None:
-        if OUT.exists():
-            try:
-                data = json.loads(OUT.read_text())
-                data["note"] = "cached (fetch failed)"
-                OUT.write_text(json.dumps(data, indent=2))
-                print("employment.json: cached")
-                return
-            except Exception:
-                pass
-
     data = {
         "updated_iso": updated_iso,
         "unemployment_rate": round(last, 2) if last is not None else None,
         "delta_pct": round((last - prev), 2) if (last is not None and prev is not None) else None,
         "note": "Lower is better. Source: OWID (World unemployment)."
     }
-    OUT.write_text(json.dumps(data, indent=2))
+    if not lkg.store("employment", data):  # incomplete: last-known-good kept, flagged stale
+        return
     print("employment.json:", json.dumps(data)[:200] + ("..." if len(json.dumps(data))>200 else ""))
 
 if __name__ == "__main__":
@@ -2,8 +2,8 @@
 # fetch_food.py — FAO/OWID Food Price Index (monthly). Robust, no API key.
 # Writes: data/live/food.json
 import json, os, sys, time, pathlib, io
-from urllib.request import urlopen, Request
 import pandas as pd
+import asof, http_client, lkg
 
 OUT = pathlib.Path("data/live/food.json")
 OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -16,9 +16,7 @@ SOURCES = [
 ]
 
 def fetch_csv(url: str) -> pd.DataFrame:
-    req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    with urlopen(req, timeout=30) as r:
-        raw = r.read()
+    raw = http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
     # Try to read as CSV or TSV automatically
     try:
         df = pd.read_csv(io.BytesIO(raw))
@@ -26,6 +24,15 @@ def fetch_csv(url: str) -> pd.DataFrame:
         df = pd.read_csv(io.BytesIO(raw), sep="\t")
     return df
 
+def stamps(years):
+    """Observation dates for OWID "year" values: year-end for a yearly series; for a monthly one
+    (fractional years, 2024.75 = October) the end of that month, so each month keeps its own date."""
+    years = years.astype(float)
+    if (years % 1 == 0).all():
+        return years.map(lambda y: f"{int(y)}-12-31")
+    month = ((years % 1) * 12).round().clip(0, 11).astype(int) + 1
+    return [str(pd.Period(year=int(y), month=int(m), freq="M").end_time.date()) for y, m in zip(years, month)]
+
 def main():
     # Expect OWID format: columns ["Entity","Code","Year","Food price index"]
     # BUT grapher CSVs often come as ["Year","food_price_index"] (single series)
@@ -46,6 +53,7 @@ def main():
                 # Monthly vs yearly: OWID series for FAO FPI is monthly index with "Year" like 2024.75 sometimes;
                 # but typically it's monthly wide. If numeric year fractional, it's ok; we just take last two rows.
                 if len(df) >= 2:
+                    asof.record("food_price_index", zip(stamps(df["year"]), df["food_price_index"]))
                     last_val = float(df["food_price_index"].iloc[-1])
                     prev_val = float(df["food_price_index"].iloc[-2])
                     break
@@ -55,6 +63,8 @@ def main():
                 if key:
                     df = df.sort_values(key)
                     if len(df) >= 2:
+                        t = df[key].astype(str) if key == "date" else stamps(df[key])
+                        asof.record("food_price_index", zip(t, df["value"]))
                         last_val = float(df["value"].iloc[-1])
                         prev_val = float(df["value"].iloc[-2])
                         break
@@ -62,7 +72,7 @@ def main():
             # try next source
             continue
 
-    data = {}
+    data = {"updated_iso": updated_iso, "fpi_last": None, "fpi_mom": None, "fpi_yoy": None, "source": "unavailable"}
     if last_val is not None:
         mom = last_val - (prev_val if prev_val is not None else last_val)
         yoy = None  # not guaranteed monthly cadence; leave None for now
@@ -73,16 +83,10 @@ def main():
             "fpi_yoy": yoy,
             "source": "FAO/OWID Food Price Index",
         }
-    else:
-        # Keep previous data if exists, to avoid zeroing the UI
-        if OUT.exists():
-            try:
-                data = json.loads(OUT.read_text())
-                data["note"] = "Using cached food.json (fetch failed)."
-            except Exception:
-                data = {"updated_iso": updated_iso, "fpi_last": None, "fpi_mom": None, "fpi_yoy": None, "source": "unavailable"}
 
-    OUT.write_text(json.dumps(data, indent=2))
+    # Keeps the last-known-good file (flagged stale) instead of zeroing the UI on failure
+    if not lkg.store("food", data):
+        return
     print("food.json:", json.dumps(data)[:200] + ("..." if len(json.dumps(data))>200 else ""))
 
 if __name__ == "__main__":
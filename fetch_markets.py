@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import io, json, datetime, urllib.request, time, traceback
+import io, datetime, time, traceback
 from pathlib import Path
 import pandas as pd
+import asof, http_client, lkg, scoring
 
 ROOT = Path(__file__).resolve().parent
 LIVE = ROOT / "data" / "live"
@@ -21,9 +22,7 @@ def fetch_df(symbol, tries=2, sleep=3):
     url = CSV.format(sym=symbol)
     for i in range(tries):
         try:
-            req = urllib.request.Request(url, headers=UA)
-            with urllib.request.urlopen(req, timeout=30) as r:
-                raw = r.read().decode("utf-8", errors="replace")
+            raw = http_client.get_text(url, UA, timeout=30)
             df = pd.read_csv(io.StringIO(raw))
             if "Close" not in df.columns:
                 raise RuntimeError(f"CSV for {symbol} missing Close")
@@ -56,10 +55,11 @@ def zscore(x, mean, std, clip=3.0):
     z=(x-mean)/std
     return max(-clip, min(clip, z))
 
-def z_to_100(z, clip=3.0): return max(0.0, min(100.0, (z+clip)*(100.0/(2*clip))))
-def vix_to_score(vix):
-    v=max(10.0, min(40.0, vix))
-    return 100.0 - (v - 10.0) * (90.0/30.0)
+# curves "market_z" and "vix" in data/normalize.json (see scoring.py)
+def z_to_100(z, clip=3.0):
+    if clip == 3.0: return scoring.score("market_z", z)
+    return float(scoring.linear(z, (-clip, clip), (0.0, 100.0)))
+def vix_to_score(vix): return scoring.score("vix", vix)
 
 def main():
     out = {"updated": datetime.datetime.utcnow().isoformat()+"Z"}
@@ -76,11 +76,17 @@ def main():
             ac_score = z_to_100(zscore(ret30, mean_r, std_r, 3.0))
         else:
             ac_score = 60.0
+        # native daily series for the sub-annual GTI: clipped z of the 30d return vs its history
+        r30s = (ac_close / ac_close.shift(30) - 1.0).dropna()
+        if len(r30s) > 1 and float(r30s.std()) > 0:
+            z = ((r30s - r30s.mean()) / r30s.std()).clip(-3.0, 3.0)
+            asof.record("acwi_z", zip(ac.loc[z.index, "Date"].dt.strftime("%Y-%m-%d"), z.tolist()))
         ac_obj = {"symbol": ac_sym, "last": float(ac_close.iloc[-1]), "ret30": round(ret30,4), "score": round(ac_score,2)}
 
         # VIX
         vix_sym, vix = first_good_df(VIX_SYMS)
         vix_last = float(vix["Close"].iloc[-1])
+        asof.record("vix", zip(vix["Date"].dt.strftime("%Y-%m-%d"), vix["Close"].tolist()))
         vix_obj = {"symbol": vix_sym, "last": round(vix_last,2), "score": round(vix_to_score(vix_last),2)}
 
         # Brent (or fallback)
@@ -106,9 +112,10 @@ def main():
         })
     except Exception:
         traceback.print_exc()
-        # leave out fields to allow updater to carry forward; it will coalesce with previous status
 
-    OUT.write_text(json.dumps(out, indent=2))
+    # A partial run (any symbol group failed) keeps the previous complete snapshot, flagged stale
+    if not lkg.store("markets", out):
+        return
     print("Markets updated:", out)
 
 if __name__ == "__main__":
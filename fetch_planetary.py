@@ -2,9 +2,8 @@
 # fetch_planetary.py — robust CO2 ppm + global temp anomaly
 # Writes: data/live/planetary.json
 import json, io, time, pathlib, re, csv
-from urllib.request import urlopen, Request
-from urllib.error import HTTPError, URLError
 import pandas as pd
+import asof, http_client, lkg
 
 OUT = pathlib.Path("data/live/planetary.json")
 OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -20,14 +19,22 @@ OWID_TEMP = [
 ]
 
 def fetch_bytes(url, timeout=45):
-    req = Request(url, headers={"User-Agent":"Mozilla/5.0"})
-    with urlopen(req, timeout=timeout) as r:
-        return r.read()
+    return http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout)
+
+def read_table(raw):
+    try:
+        return pd.read_csv(io.BytesIO(raw))
+    except Exception:
+        return pd.read_csv(io.BytesIO(raw), sep="\t")
+
+def fetch_table(url, timeout=45):
+    """Parsed OWID table, shared in-process with backfill_historical (same "table" parser key)."""
+    return http_client.parsed(url, read_table, "table", headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout, copy=True)
 
 def fetch_noaa_co2():
     """Return (last_ppm, prev_ppm) from NOAA monthly MLO, skipping -99.99."""
     raw = fetch_bytes(NOAA_CO2).decode("utf-8", errors="ignore")
-    rows = []
+    rows = []; dated = []
     reader = csv.reader([ln for ln in raw.splitlines() if not ln.startswith("#")])
     for r in reader:
         # Format: year, month, decimal_date, average, interpolated, trend, #days
@@ -39,6 +46,9 @@ def fetch_noaa_co2():
             continue
         if avg > 0:
             rows.append(avg)
+            try: dated.append((f"{int(r[0]):04d}-{int(r[1]):02d}-15", avg))  # mid-month stamp
+            except Exception: pass
+    asof.record("co2_ppm", dated)
     if len(rows) >= 2:
         return rows[-1], rows[-2]
     return None, None
@@ -47,11 +57,7 @@ def fetch_owid_co2():
     """Return (last_ppm, prev_ppm) from OWID concentration (World/Global)."""
     for url in OWID_CO2:
         try:
-            raw = fetch_bytes(url)
-            try:
-                df = pd.read_csv(io.BytesIO(raw))
-            except Exception:
-                df = pd.read_csv(io.BytesIO(raw), sep="\t")
+            df = fetch_table(url)
             cols = [c.strip().lower() for c in df.columns]
             df.columns = cols
             # Typical: entity, code, year, co2 concentration (ppm)
@@ -74,11 +80,7 @@ def fetch_owid_temp():
     """Return (last_anom, prev_anom) from OWID global temperature anomaly."""
     for url in OWID_TEMP:
         try:
-            raw = fetch_bytes(url)
-            try:
-                df = pd.read_csv(io.BytesIO(raw))
-            except Exception:
-                df = pd.read_csv(io.BytesIO(raw), sep="\t")
+            df = fetch_table(url)
             cols = [c.strip().lower() for c in df.columns]
             df.columns = cols
             # Grapher variant A: columns: Year, World
@@ -128,18 +130,9 @@ def main():
         "note": "CO₂ from NOAA MLO (fallback OWID); temperature anomaly from OWID."
     }
 
-    # Cache fallback if everything is missing
-    if data["co2_ppm"] is None and data["gistemp_anom_c"] is None and OUT.exists():
-        try:
-            cached = json.loads(OUT.read_text())
-            cached["note"] = "cached (fetch failed)"
-            OUT.write_text(json.dumps(cached, indent=2))
-            print("planetary.json: cached")
-            return
-        except Exception:
-            pass
-
-    OUT.write_text(json.dumps(data, indent=2))
+    # Replaces the cached file only when both readings are present (last-known-good otherwise)
+    if not lkg.store("planetary", data):
+        return
     print("planetary.json:", json.dumps(data)[:220] + ("..." if len(json.dumps(data))>220 else ""))
 
 if __name__ == "__main__":
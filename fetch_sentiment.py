@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
-import csv, io, json, datetime, statistics, urllib.parse, urllib.request, time, traceback
+import csv, io, json, datetime, statistics, urllib.parse, time, traceback
 from pathlib import Path
+import asof, http_client, lkg
 
 ROOT = Path(__file__).resolve().parent
 LIVE = ROOT / "data" / "live"
@@ -11,9 +12,7 @@ UA = {"User-Agent":"AnthroMeter/1.0 (+github actions)"}
 def fetch(url, tries=2, sleep=3):
     for i in range(tries):
         try:
-            req = urllib.request.Request(url, headers=UA)
-            with urllib.request.urlopen(req, timeout=30) as r:
-                return r.read().decode("utf-8", errors="replace")
+            return http_client.get_text(url, UA, timeout=30)
         except Exception:
             if i+1==tries: raise
             time.sleep(sleep)
@@ -22,13 +21,13 @@ def tones_csv():
     base="https://api.gdeltproject.org/api/v2/doc/doc"
     url=f"{base}?{urllib.parse.urlencode({'format':'CSV','mode':'timelinetone','timespan':'30d'})}"
     txt=fetch(url)
-    vals=[]
+    rows=[]
     for r in csv.reader(io.StringIO(txt)):
         if not r: continue
         if r[0].lower().startswith("date"): continue
-        try: vals.append(float(r[1]))
+        try: rows.append((r[0], float(r[1])))
         except: pass
-    return vals
+    return rows
 
 def tones_json_fallback():
     # JSON fallback returns objects with fields date, value
@@ -36,11 +35,11 @@ def tones_json_fallback():
     url=f"{base}?{urllib.parse.urlencode({'format':'JSON','mode':'timelinetone','timespan':'30d'})}"
     txt=fetch(url)
     data=json.loads(txt)
-    vals=[]
+    rows=[]
     for row in data.get("timeline",[]):
-        try: vals.append(float(row.get("value",0)))
+        try: rows.append((row.get("date"), float(row.get("value",0))))
         except: pass
-    return vals
+    return rows
 
 def map_score(tone: float)->float:
     t=max(-5.0, min(5.0, tone))
@@ -52,9 +51,11 @@ def map_score(tone: float)->float:
 def main():
     out={"updated": datetime.datetime.utcnow().isoformat()+"Z"}
     try:
-        vals=tones_csv()
-        if not vals:
-            vals=tones_json_fallback()
+        rows=tones_csv()
+        if not rows:
+            rows=tones_json_fallback()
+        vals=[v for _,v in rows]
+        asof.record("gdelt_tone", [(d,v) for d,v in rows if d])
         if vals:
             avg=statistics.fmean(vals)
             med=statistics.median(vals)
@@ -66,9 +67,9 @@ def main():
             })
     except Exception:
         traceback.print_exc()
-        # leave out to allow updater to carry forward
 
-    OUT.write_text(json.dumps(out, indent=2))
+    if not lkg.store("sentiment", out):  # no tone data: last-known-good kept, flagged stale
+        return
     print("Sentiment updated:", out)
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Headline archive with full-text search, so RSS-driven score moves can be explained later.
+- Every headline the *_live scorers read is stored once per feed with first-seen time, pubDate
+  and its hit counts against each scorer lexicon (risk, violence, severity, positive, negative).
+- headlines(id = hash of feed + title), an FTS5 external-content index over the titles, and
+  hits(lexicon, seen_at, id, feed, n) clustered by lexicon and time for range drill-downs.
+- top(category, start, end): headlines that moved a category most in a window; search(): keywords.
+archive() reuses the parsed feeds categories.py just scored (http_client memo); nothing is refetched.
+DB: data/headlines.sqlite
+Usage: python headlines.py [top CATEGORY [start [end]] | search WORDS...]
+"""
+import datetime as dt, email.utils, hashlib, json, os, sys
+from xml.etree import ElementTree as ET
+import entropy_live, health_live, http_client, peace_live, sentiment_live, store
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "headlines.sqlite")
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+# lexicon -> (word set, tokenizer) of the scorer that counts it
+LEXICONS = {
+    "risk":     (entropy_live.RISK,     entropy_live.WORD),
+    "violence": (peace_live.VIOLENCE,   peace_live.WORD),
+    "severity": (health_live.SEVERITY,  health_live.WORD),
+    "positive": (sentiment_live.POS,    sentiment_live.WORD),
+    "negative": (sentiment_live.NEG,    sentiment_live.WORD),
+}
+# category -> (feeds its scorer reads, lexicons that move it)
+CATEGORIES = {
+    "Entropy Index":           (entropy_live.RSS_FEEDS,   ["risk"]),
+    "Global Peace & Conflict": (peace_live.RSS_FEEDS,     ["violence"]),
+    "Public Health":           (health_live.RSS_FEEDS,    ["severity"]),
+    "Sentiment & Culture":     (sentiment_live.RSS_FEEDS, ["positive", "negative"]),
+}
+FEEDS = list(dict.fromkeys(u for feeds, _ in CATEGORIES.values() for u in feeds))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS headlines(
+    id INTEGER PRIMARY KEY, feed TEXT NOT NULL, title TEXT NOT NULL, published TEXT, seen_at TEXT NOT NULL,
+    hits TEXT
+);
+CREATE INDEX IF NOT EXISTS headlines_seen ON headlines(seen_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS headlines_fts USING fts5(title, content='headlines', content_rowid='id');
+CREATE TABLE IF NOT EXISTS hits(
+    lexicon TEXT NOT NULL, seen_at TEXT NOT NULL, id INTEGER NOT NULL, feed TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (lexicon, seen_at, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS hits_rank ON hits(lexicon, n, seen_at);
+"""
+
+def connect(path=None):
+    return store.connect(path or DB_PATH, SCHEMA)
+
+def _id(feed, title):
+    return int.from_bytes(hashlib.blake2b(f"{feed}\0{title}".encode(), digest_size=8).digest(), "big", signed=True)
+
+def _iso(text):
+    try:
+        return email.utils.parsedate_to_datetime(text).astimezone(dt.timezone.utc).strftime(store.ISO)
+    except Exception:
+        return (text[:19] + "Z") if text and len(text) >= 19 and text[4] == "-" else None  # Atom dates are ISO already
+
+def items(root):
+    """[(title, published ISO or None)] of an RSS or Atom tree."""
+    out = [((n.findtext("title") or "").strip(), _iso(n.findtext("pubDate"))) for n in root.iter("item")]
+    if not out:
+        out = [((n.findtext(ATOM + "title") or "").strip(), _iso(n.findtext(ATOM + "published") or n.findtext(ATOM + "updated")))
+               for n in root.iter(ATOM + "entry")]
+    return [(t, p) for t, p in out if t]
+
+def counts(title):
+    """{lexicon: hits} with each scorer's own tokenizer (zero counts dropped)."""
+    out = {}
+    for name, (words, word_re) in LEXICONS.items():
+        n = sum(1 for w in word_re.findall(title) if w.lower() in words)
+        if n: out[name] = n
+    return out
+
+def add(feed, entries, seen_at=None, path=None):
+    """Store [(title, published)] from one feed in one transaction; headlines already archived are skipped.
+    Returns the number of new headlines."""
+    seen_at = seen_at or store.now_iso()
+    fresh = {_id(feed, t): (t, p) for t, p in entries}
+    conn = connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        ids = list(fresh)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            for (hid,) in conn.execute(f"SELECT id FROM headlines WHERE id IN ({','.join('?' * len(chunk))})", chunk):
+                fresh.pop(hid, None)
+        rows, hits = [], []
+        for hid, (title, published) in fresh.items():
+            c = counts(title)
+            rows.append((hid, feed, title, published, seen_at, json.dumps(c, separators=(",", ":")) if c else None))
+            hits += [(lex, seen_at, hid, feed, n) for lex, n in c.items()]
+        conn.executemany("INSERT INTO headlines VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO headlines_fts(rowid, title) VALUES (?, ?)", [(r[0], r[2]) for r in rows])
+        conn.executemany("INSERT INTO hits VALUES (?, ?, ?, ?, ?)", hits)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return len(rows)
+
+def archive(feeds=FEEDS, path=None):
+    """Archive the current items of every scorer feed (memoized parses when called after scoring)."""
+    seen_at, new = store.now_iso(), 0
+    for url in feeds:
+        try:
+            new += add(url, items(http_client.parsed(url, ET.fromstring, "xml", timeout=12)), seen_at, path)
+        except Exception as e:
+            print(f"[warn] headlines: {url}: {e}")
+    connect(path).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return new
+
+def _bound(t, end=False):
+    if not t: return "￿" if end else ""
+    t = str(t)
+    return t + ("T23:59:59Z" if end else "T00:00:00Z") if len(t) == 10 else t
+
+def _rows(cur):
+    cols = [d[0] for d in cur.description]
+    return [{**dict(zip(cols, r)), "hits": json.loads(r[cols.index("hits")] or "{}")} for r in cur]
+
+def top(category, start=None, end=None, limit=20, path=None):
+    """Headlines with the most lexicon hits for a category's scorer first seen in [start, end]."""
+    feeds, lexicons = CATEGORIES[category]
+    q = f"""SELECT h.seen_at, h.published, h.feed, h.title, h.hits, x.lexicon, x.n FROM hits x JOIN headlines h ON h.id = x.id
+            WHERE x.lexicon IN ({",".join("?" * len(lexicons))}) AND x.seen_at BETWEEN ? AND ?
+              AND x.feed IN ({",".join("?" * len(feeds))})
+            ORDER BY x.n DESC, x.seen_at DESC LIMIT ?"""
+    return _rows(connect(path).execute(q, (*lexicons, _bound(start), _bound(end, True), *feeds, limit)))
+
+def search(text, start=None, end=None, limit=50, path=None):
+    """Headlines matching every word of text (FTS5, best match first) first seen in [start, end]."""
+    match = " ".join('"' + w.replace('"', '""') + '"' for w in text.split())
+    q = """SELECT h.seen_at, h.published, h.feed, h.title, h.hits FROM headlines_fts f JOIN headlines h ON h.id = f.rowid
+           WHERE headlines_fts MATCH ? AND h.seen_at BETWEEN ? AND ? ORDER BY bm25(headlines_fts) LIMIT ?"""
+    return _rows(connect(path).execute(q, (match, _bound(start), _bound(end, True), limit)))
+
+def _print(rows):
+    for r in rows:
+        hits = " ".join(f"{k}={v}" for k, v in r["hits"].items())
+        print(f"{r['seen_at']}  {r['title'][:100]}  [{hits}]  {r['feed']}")
+
+if __name__ == "__main__":
+    a = sys.argv[1:]
+    if a and a[0] == "top":
+        _print(top(a[1], *(a[2:4])))
+    elif a and a[0] == "search":
+        _print(search(" ".join(a[1:])))
+    else:
+        print(f"{archive()} new headlines archived")
@@ -5,8 +5,8 @@ Input: WHO disease outbreak RSS + major outlets' health feeds.
 Heuristic severity token density -> map to 0–100 (higher = better health).
 """
 import json, os, re
-from urllib.request import urlopen
 from xml.etree import ElementTree as ET
+import http_client, scoring
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
@@ -23,7 +23,7 @@ measles polio dengue malaria mpox zika plague fatal deaths mortality
 icu intensive-care hospitalization shortage shortage oxygen
 """.split())
 
-WORD = re.compile(r"[A-Za-z0-9\\-']+")
+WORD = re.compile(r"[A-Za-z0-9\-']+")
 
 def _last_health():
     try:
@@ -33,8 +33,7 @@ def _last_health():
         return 50.0
 
 def _fetch(url):
-    with urlopen(url, timeout=12) as resp:
-        return ET.fromstring(resp.read())
+    return http_client.parsed(url, ET.fromstring, "xml", timeout=12)
 
 def _titles(root):
     out=[]
@@ -66,10 +65,8 @@ def get_score():
                 continue
         if not vals: return _last_health()
         avg=sum(vals)/len(vals)  # ~0..2 typically
-        # Invert to "health" (higher better). 0 severity→90; 0.5→80; 1.0→70; 2.0→55
-        sev = max(0.0, min(avg, 2.0))
-        health = 90.0 - sev*17.5
-        return round(max(0.0, min(100.0, health)), 2)
+        # Invert to "health" (higher better). 0 severity→90; 1.0→72.5; >=2.0→55 (curve "who_outbreak_rss")
+        return round(scoring.score("who_outbreak_rss", avg), 2)
     except Exception:
         return _last_health()
 
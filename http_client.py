@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for every fetcher (stdlib http.client, thread-safe).
+- Persistent keep-alive connections, pooled per (scheme, host, port), so repeated requests
+  to OWID, GDELT, stooq, World Bank or the RSS hosts skip the TCP+TLS handshake.
+- Sends Accept-Encoding: gzip, deflate and decodes transparently; follows redirects.
+- Per-host concurrency cap and token bucket (HOST_LIMITS); a 429/503 with Retry-After
+  pauses the whole host for that long before the request is retried (up to MAX_RETRY_AFTER;
+  a longer ask fails the request instead of stalling every thread waiting on the host).
+- Single-flight: concurrent get()s of one URL share a download, and bodies are memoized for
+  BODY_TTL seconds; parsed() does the same for the parsed result (DataFrame, element tree).
+get() returns the decoded body as bytes or raises HTTPError (.code, .url) / OSError.
+With GTI_MIRROR=<dir> set, bodies are read from <dir>/<host>/<path>[@query] instead of the network
+(synthetic inputs from synth.py, or the raw/ tree of a vintage.py checkout); a missing file is a 404.
+"""
+import email.utils, http.client, os, threading, time, zlib
+from concurrent.futures import Future
+from urllib.parse import urljoin, urlsplit
+
+USER_AGENT = "AnthroMeter/1.0 (+github actions)"
+MAX_IDLE = 4            # idle keep-alive connections kept per host
+MAX_REDIRECTS = 5
+RETRIES = 3             # on 429/503 and on a dropped keep-alive connection
+BODY_TTL = 300.0        # seconds a downloaded body is reused within a run
+PARSED_TTL = 600.0
+MAX_RETRY_AFTER = 120.0 # longest Retry-After honoured; a server asking for more fails the request
+
+# host -> (max concurrent requests, tokens per second, burst)
+HOST_LIMITS = {
+    "api.gdeltproject.org": (1, 0.2, 2),   # GDELT throttles bursts hard
+    "stooq.com":            (2, 2.0, 4),
+    "ourworldindata.org":   (4, 5.0, 8),
+    "api.worldbank.org":    (4, 5.0, 8),
+}
+DEFAULT_LIMIT = (4, 5.0, 8)
+MIRROR = os.environ.get("GTI_MIRROR")
+
+class HTTPError(OSError):
+    def __init__(self, url, code, reason=""):
+        super().__init__(f"HTTP {code} {reason} for {url}")
+        self.url, self.code, self.reason = url, code, reason
+
+class _Host:
+    """Pool + limits for one origin."""
+    def __init__(self, host):
+        conc, self.rate, self.burst = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+        self.slots = threading.BoundedSemaphore(conc)
+        self.lock = threading.Lock()
+        self.idle = []
+        self.tokens = float(self.burst)
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+
+    def take(self):
+        """Wait for a token (and for any Retry-After pause on this host)."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                wait = max(self.blocked_until - now, 0.0)
+                if not wait and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = wait or (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+_hosts = {}
+_hosts_lock = threading.Lock()
+
+def _host(key):
+    with _hosts_lock:
+        if key not in _hosts:
+            _hosts[key] = _Host(key[1])
+        return _hosts[key]
+
+def _connect(scheme, host, port, timeout):
+    cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    return cls(host, port, timeout=timeout)
+
+def _decode(body, encoding):
+    encoding = (encoding or "").lower()
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(body, 47)  # 32 + 15: gzip/zlib header auto-detect
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -15)  # some servers send raw deflate
+    return body
+
+def _retry_after(value, default):
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except Exception:
+            return default
+
+def _key(url):
+    u = urlsplit(url)
+    return u.scheme, u.hostname, u.port or (443 if u.scheme == "https" else 80)
+
+def _once(url, headers, timeout):
+    """One request on a pooled connection: (status, headers, body, location)."""
+    u = urlsplit(url)
+    scheme, hostname, port = key = _key(url)
+    pool = _host(key)
+    path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+    hdrs = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive", **(headers or {})}
+    with pool.slots:
+        pool.take()
+        for attempt in (0, 1):
+            with pool.lock:
+                conn = pool.idle.pop() if pool.idle else None
+            reused = conn is not None
+            conn = conn or _connect(scheme, hostname, port, timeout)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request("GET", path, headers=hdrs)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError, http.client.BadStatusLine):
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # server closed an idle keep-alive socket: retry on a fresh one
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                with pool.lock:
+                    if len(pool.idle) < MAX_IDLE: pool.idle.append(conn)
+                    else: conn.close()
+            return resp.status, resp.headers, _decode(body, resp.headers.get("Content-Encoding")), resp.headers.get("Location")
+
+_memo = {}       # key -> (expires_at, value)
+_inflight = {}   # key -> Future of the owner's result
+_memo_lock = threading.Lock()
+
+def single_flight(key, ttl, produce):
+    """produce() once per key: concurrent callers wait for the owner; results live for ttl seconds."""
+    with _memo_lock:
+        now = time.monotonic()
+        hit = _memo.get(key)
+        if hit and hit[0] > now:
+            return hit[1]
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = _inflight[key] = Future()
+    if not owner:
+        return fut.result()
+    try:
+        value = produce()
+    except BaseException as e:
+        with _memo_lock: _inflight.pop(key, None)
+        fut.set_exception(e)
+        raise
+    with _memo_lock:
+        _inflight.pop(key, None)
+        if ttl > 0:
+            if len(_memo) > 256:  # drop expired entries now and then
+                for k in [k for k, (exp, _) in _memo.items() if exp <= now]: _memo.pop(k, None)
+            _memo[key] = (time.monotonic() + ttl, value)
+    fut.set_result(value)
+    return value
+
+def get(url, headers=None, timeout=30, retries=RETRIES, ttl=BODY_TTL):
+    """GET url and return the decoded body (bytes); shared with any identical request in flight or within ttl."""
+    return single_flight(("body", url), ttl, lambda: _get(url, headers, timeout, retries))
+
+def parsed(url, parse, kind, headers=None, timeout=30, ttl=PARSED_TTL, copy=False):
+    """parse(get(url)) memoized per (kind, url). kind names the parser so modules with equivalent
+    parsers (e.g. CSV-then-TSV readers) share one result; copy=True hands out .copy() for mutable
+    results such as DataFrames."""
+    value = single_flight(("parsed", kind, url), ttl, lambda: parse(get(url, headers, timeout)))
+    return value.copy() if copy else value
+
+def mirror_key(url):
+    """<host>/<path>[@query]: where a body of url lives in a mirror directory (and in vintage.py's raw/)."""
+    u = urlsplit(url)
+    return u.netloc + u.path + ("@" + u.query.replace("/", "_") if u.query else "")
+
+def _get(url, headers, timeout, retries):
+    if MIRROR:
+        try:
+            with open(os.path.join(MIRROR, *mirror_key(url).split("/")), "rb") as f: return f.read()
+        except FileNotFoundError:
+            raise HTTPError(url, 404, "not in mirror")
+    for redirect in range(MAX_REDIRECTS + 1):
+        for attempt in range(retries + 1):
+            status, resp_headers, body, location = _once(url, headers, timeout)
+            if status in (429, 503) and attempt < retries:
+                wait = _retry_after(resp_headers.get("Retry-After"), 2.0 * 2 ** attempt)
+                if wait > MAX_RETRY_AFTER:
+                    raise HTTPError(url, status, f"Retry-After {wait:.0f}s")
+                _host(_key(url)).pause(wait)
+                continue
+            break
+        if status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            continue
+        if status >= 400:
+            raise HTTPError(url, status, resp_headers.get("Status", ""))
+        return body
+    raise HTTPError(url, status, "too many redirects")
+
+def get_text(url, headers=None, timeout=30, encoding="utf-8"):
+    return get(url, headers, timeout).decode(encoding, errors="replace")
+
+def close_all():
+    with _memo_lock:
+        _memo.clear()
+    with _hosts_lock:
+        for pool in _hosts.values():
+            with pool.lock:
+                for conn in pool.idle: conn.close()
+                pool.idle.clear()
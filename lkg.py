@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Last-known-good (stale-while-revalidate) layer for the live fetchers.
+- commit(): a fetcher's new value replaces data/live/<name>.json only when every required
+  field is present; otherwise the previous value is kept and flagged stale with the attempt time.
+- read(): the cached value immediately, with its age and a staleness flag (failed refresh or
+  older than the source's max age).
+- refresh()/wait_for(): run fetchers in background threads; the caller composes from the cache
+  once its latency budget is spent and can recompose if a refresh lands before its deadline.
+Every attempt and each complete value also go to the SQLite store (store.py), which read() prefers;
+the JSON files are derived views. Their "_lkg" block: {ok_iso, attempt_iso, stale, missing}.
+"""
+import calendar, json, os, pathlib, threading, time
+from concurrent.futures import Future, wait
+import store as readings
+
+LIVE_DIR = pathlib.Path(__file__).resolve().parent / "data" / "live"
+ISO = "%Y-%m-%dT%H:%M:%SZ"
+
+# source -> (fetcher module, required fields for a complete value, max age in hours before stale)
+SOURCES = {
+    "planetary":  ("fetch_planetary",  ["co2_ppm", "gistemp_anom_c"],        24 * 45),
+    "sentiment":  ("fetch_sentiment",  ["avg_tone_30d", "score"],            48),
+    "markets":    ("fetch_markets",    ["acwi", "vix", "brent", "econ_score", "entropy_score"], 48),
+    "food":       ("fetch_food",       ["fpi_last"],                         24 * 45),
+    "conflict":   ("fetch_conflict",   ["last_val", "avg_last30"],           48),
+    "foodaccess": ("fetch_foodaccess", ["undernourished_pct"],               24 * 400),
+    "employment": ("fetch_employment", ["unemployment_rate"],                24 * 400),
+}
+
+_lock = threading.Lock()
+
+def _now():
+    return time.strftime(ISO, time.gmtime())
+
+def _age_s(iso):
+    try:
+        return max(0.0, time.time() - calendar.timegm(time.strptime(iso, ISO)))
+    except Exception:
+        return None
+
+def _stamp(data):
+    """Run timestamp of a legacy live file (fetchers wrote updated_iso or an isoformat "updated")."""
+    return data.get("updated_iso") or ((data.get("updated") or "")[:19] + "Z" if data.get("updated") else None)
+
+def _load(path):
+    try:
+        return json.loads(pathlib.Path(path).read_text())
+    except Exception:
+        return None
+
+def _write(path, data):
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)  # readers never see a half-written file
+
+def store(name, data):
+    """commit() for a named source in SOURCES."""
+    return commit(LIVE_DIR / f"{name}.json", data, SOURCES[name][1])
+
+def commit(path, data, required):
+    """Store data as the new last-known-good value if complete; returns True when it replaced the cache."""
+    missing = [k for k in required if (data or {}).get(k) is None]
+    now = _now()
+    try:
+        readings.write_snapshot(pathlib.Path(path).stem, data, complete=not missing, missing=missing, fetched_at=now)
+    except Exception as e:
+        print(f"[warn] store: {e}")
+    with _lock:
+        cached = _load(path)
+        if not missing or not cached:
+            out = dict(data or {})
+            out["_lkg"] = {"ok_iso": now if not missing else None, "attempt_iso": now, "stale": bool(missing), "missing": missing}
+            _write(path, out)
+            return not missing
+        meta = cached.get("_lkg") or {"ok_iso": _stamp(cached)}
+        meta.update({"attempt_iso": now, "stale": True, "missing": missing})
+        cached["_lkg"] = meta
+        _write(path, cached)
+    print(f"{pathlib.Path(path).name}: kept last-known-good (incomplete refresh, missing {', '.join(missing)})")
+    return False
+
+def read(name, max_age_h=None):
+    """(value without metadata, {"age_s", "stale", "ok_iso"}) for a live source; ({}, stale) if never fetched."""
+    data = _load(LIVE_DIR / f"{name}.json") or {}
+    meta = data.pop("_lkg", None) or {}
+    ok_iso = meta.get("ok_iso") if meta else _stamp(data)
+    try:
+        snap, ok, last = readings.snapshot(name)
+        if snap is not None:  # indexed read of the latest complete fetch; the JSON file is only a view
+            data, ok_iso = snap, ok
+            meta = {"stale": bool(last and not last[1])}
+    except Exception:
+        pass
+    age = _age_s(ok_iso)
+    max_age_h = SOURCES.get(name, (None, None, None))[2] if max_age_h is None else max_age_h
+    stale = bool(meta.get("stale")) or age is None or (max_age_h is not None and age > max_age_h * 3600)
+    return data, {"age_s": None if age is None else int(age), "stale": stale, "ok_iso": ok_iso if age is not None else None}
+
+def refresh(names=None):
+    """Start fetchers in daemon threads; returns {name: Future}. Nothing joins them past the
+    caller's deadline: a fetcher still running at exit leaves its last-known-good file as it was."""
+    futs = {}
+    for name in names or SOURCES:
+        fut = futs[name] = Future()
+        def run(fut=fut, module=SOURCES[name][0]):
+            try:
+                __import__(module).main(); fut.set_result(True)
+            except BaseException as e:
+                fut.set_exception(e)
+        threading.Thread(target=run, name=f"lkg-{name}", daemon=True).start()
+    return futs
+
+def wait_for(futs, timeout):
+    """Block up to timeout seconds; returns the names that finished (successfully or not)."""
+    done, _ = wait(list(futs.values()), timeout=max(0.0, timeout))
+    return [n for n, f in futs.items() if f in done]
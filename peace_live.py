@@ -5,8 +5,8 @@ Input: world news RSS, count conflict/violence tokens per headline.
 Output: 0–100 (higher = better peace). We invert + scale a risk score.
 """
 import json, os, re
-from urllib.request import urlopen
 from xml.etree import ElementTree as ET
+import http_client, scoring
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
@@ -35,8 +35,7 @@ def _last_peace():
         return 50.0
 
 def _fetch(url):
-    with urlopen(url, timeout=12) as resp:
-        return ET.fromstring(resp.read())
+    return http_client.parsed(url, ET.fromstring, "xml", timeout=12)
 
 def _titles(root):
     out=[]
@@ -70,10 +69,8 @@ def get_score():
                 continue
         if not vals: return _last_peace()
         avg=sum(vals)/len(vals)  # ~0..2 typically
-        # Map risk→peace (invert). 0 risk→90, 0.5→75, 1.0→60, 2.0→40
-        risk = max(0.0, min(avg, 2.0))
-        peace = 90.0 - risk*25.0
-        return round(max(0.0, min(100.0, peace)), 2)
+        # Map risk→peace (invert). 0 risk→90, 0.5→77.5, 1.0→65, >=2.0→40 (curve "news_conflict_rss")
+        return round(scoring.score("news_conflict_rss", avg), 2)
     except Exception:
         return _last_peace()
 
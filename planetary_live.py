@@ -6,7 +6,7 @@ Planetary Health (stub): fetch latest CO₂ (ppm) and map to 0–100 (higher = b
 - Mapping (clamped): 280 ppm -> 100, 500 ppm -> 0
 """
 import os, json, math, csv, io, sys
-from urllib.request import urlopen
+import http_client, scoring
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
@@ -14,13 +14,9 @@ CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
 # Candidate CSV URL (subject to change by NOAA; kept simple for a stub)
 NOAA_CSV = "https://gml.noaa.gov/webdata/ccgg/trends/co2/co2_trend_mlo.csv"
 
-def clamp01(x):
-    return 0.0 if x < 0 else (1.0 if x > 1 else x)
-
 def ppm_to_score(ppm):
-    # 280 -> 100, 500 -> 0 (linear), clamp
-    t = (ppm - 280.0) / (500.0 - 280.0)
-    return round((1.0 - clamp01(t)) * 100.0, 2)
+    # 280 -> 100, 500 -> 0 (linear), clamp — curve "co2_ppm" in normalize.json
+    return round(scoring.score("co2_ppm", ppm), 2)
 
 def _read_last_categories_score():
     try:
@@ -33,8 +29,7 @@ def _read_last_categories_score():
 def get_score():
     try:
         # Fetch CSV and parse the last valid monthly mean from end
-        with urlopen(NOAA_CSV, timeout=10) as resp:
-            raw = resp.read().decode("utf-8", errors="ignore")
+        raw = http_client.get(NOAA_CSV, timeout=10).decode("utf-8", errors="ignore")
         # CSV has comment lines at top; find numeric rows
         reader = csv.reader(io.StringIO(raw))
         rows = []
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Custom-weight GTI: the 1900–present curve under any weighting of the eight categories, without a backfill.
+- The category history (data/gti/categories via shards.load) is read once into a years × categories
+  float64 matrix and reloaded only when gti.json / the category index change on disk.
+- A request's weights are clipped at 0, normalized to sum 1 and quantized to 1/QUANT steps; the curve
+  is one matrix-vector product. Like the official GTI (which needs all eight categories), a year is
+  null unless every category with non-zero weight reports it, so the equal-weight default reproduces
+  gti.json's series; "coverage" says how much of the weight each year actually had.
+- Encoded responses are kept in an LRU keyed by the quantized weights and evicted by total bytes
+  (CACHE_BYTES), so repeated sliders/presets are a dict lookup.
+Response (compact JSON): {"order": [...], "weights": [...], "year0": 1900, "gti": [...], "coverage": [...]}
+with one entry per year from year0 (gti null where coverage < 1).
+Served by server.py at /api/gti?w=w1,...,w8 (order as in the response; omitted = equal weights).
+Usage: python reweight.py [w1 ... w8]
+"""
+import json, os, pathlib, sys, threading, time
+from collections import OrderedDict
+import numpy as np
+import shards
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA = pathlib.Path(ROOT) / "data"
+QUANT = 1000                 # weight resolution: 0.001
+CACHE_BYTES = 16 << 20       # encoded responses kept in the LRU
+
+_lock = threading.Lock()
+_hist = {"stamp": None}      # order, year0, C (years × categories), ok (finite mask), C0 (NaN -> 0)
+_cache = OrderedDict()       # key -> encoded body
+_cache_bytes = 0
+_WATCH = [str(DATA / "gti.json"), str(DATA / "gti" / "index.json")]   # the backfill rewrites both on every run
+
+def _stamp():
+    out = []
+    for p in _WATCH:
+        try:
+            st = os.stat(p); out.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+def history():
+    """The in-memory category matrix, (re)loaded when the files behind it changed."""
+    global _cache_bytes
+    stamp = _stamp()
+    if _hist["stamp"] == stamp:
+        return _hist
+    with _lock:
+        if _hist["stamp"] != stamp:
+            by_cat = (shards.load(DATA) or {}).get("by_category") or {}
+            order = list(by_cat)
+            years = sorted({int(y) for hist in by_cat.values() for y in hist})
+            year0 = years[0] if years else 0
+            C = np.full((years[-1] - year0 + 1 if years else 0, len(order)), np.nan)
+            for j, k in enumerate(order):
+                for y, v in by_cat[k].items():
+                    if v is not None: C[int(y) - year0, j] = float(v)
+            ok = np.isfinite(C)
+            _hist.update(order=order, year0=year0, C=C, ok=ok.astype("float64"), C0=np.where(ok, C, 0.0), stamp=stamp)
+            _cache.clear(); _cache_bytes = 0
+    return _hist
+
+def quantize(weights, k):
+    """Clip, normalize and round a weight vector to QUANT steps; returns a tuple of ints summing to ~QUANT."""
+    w = np.clip(np.asarray(weights, dtype="float64").reshape(-1), 0.0, None)
+    if w.size != k or not np.isfinite(w).all() or w.sum() <= 0:
+        raise ValueError(f"need {k} non-negative weights with a positive sum")
+    return tuple(int(q) for q in np.rint(w / w.sum() * QUANT))
+
+def _list(a, digits):
+    return [None if v != v else v for v in np.round(a, digits).tolist()]  # NaN -> null
+
+def score(weights=None):
+    """Encoded JSON body (bytes) of the GTI curve under `weights` (category order of the history)."""
+    global _cache_bytes
+    h = history()
+    k = len(h["order"])
+    key = quantize(np.ones(k) if weights is None else weights, k)
+    body = _cache.get(key)
+    if body is not None:
+        with _lock:
+            if key in _cache: _cache.move_to_end(key)
+        return body
+    w = np.array(key, dtype="float64") / QUANT
+    num, cov = h["C0"] @ w, h["ok"] @ w
+    full = cov >= w.sum() - 1e-9   # every weighted category reports that year
+    gti = np.where(full, num / np.where(full, cov, 1.0), np.nan)
+    body = json.dumps({"order": h["order"], "weights": [q / QUANT for q in key], "year0": h["year0"],
+                       "gti": _list(gti, 2), "coverage": _list(cov / w.sum(), 3)},
+                      separators=(",", ":")).encode()
+    with _lock:
+        if key not in _cache:
+            _cache[key] = body; _cache_bytes += len(body)
+            while _cache_bytes > CACHE_BYTES and len(_cache) > 1:
+                _cache_bytes -= len(_cache.popitem(last=False)[1])
+    return body
+
+def stats():
+    return {"entries": len(_cache), "bytes": _cache_bytes, "limit": CACHE_BYTES}
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    body = score([float(x) for x in sys.argv[1:]] or None)
+    t1 = time.perf_counter()
+    score([float(x) for x in sys.argv[1:]] or None)
+    t2 = time.perf_counter()
+    print(body.decode())
+    print(f"# {len(body)} B; cold {1e3 * (t1 - t0):.2f} ms (incl. load), cached {1e3 * (t2 - t1):.3f} ms", file=sys.stderr)
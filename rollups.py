@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Regional, income-group and custom-set GTI rollups from the per-country scores.
+- Membership is a sparse group × country matrix in CSR form (indptr, indices, data): World Bank
+  regions and income levels (worldbank.countries(), cached) plus any sets in data/groups.json
+  ({"name": ["FRA", "DEU", ...]} or {"name": {"FRA": 0.5, ...}} for fractional membership).
+- Members are weighted per year by population or GDP (population × GDP per capita): a group score is
+  Σ m·w·x / Σ m·w over the members that report that year. Only ISO3 countries enter, never OWID_*
+  aggregates, so nothing is double counted.
+- Every group × year × layer comes out of one segment sum over the CSR rows (np.add.reduceat), so
+  hundreds of custom groups cost about one pass over their member rows.
+- Per-country input hashes are kept in data/rollups/state.json; a rerun recomputes and rewrites only
+  the groups that contain a changed country (or whose membership changed).
+Writes: data/rollups/<slug>.json, data/rollups/index.json, data/rollups/state.json
+Usage: python rollups.py [--weight population|gdp]   (recomputes from data/cube + cached weights)
+"""
+import hashlib, json, os, re, sys, time
+import numpy as np
+import worldbank
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+OUT_DIR = os.path.join(ROOT, "data", "rollups")
+GROUPS_PATH = os.path.join(ROOT, "data", "groups.json")
+WEIGHTS_PATH = os.path.join(OUT_DIR, "weights.npz")
+BLOCK = 1 << 22   # member-rows × years × layers summed per reduceat call (bounds peak memory)
+
+def read_json(p, default=None):
+    try:
+        with open(p) as f: return json.load(f)
+    except Exception:
+        return default
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def groups(codes):
+    """{group name: {ISO3: membership}} over the given country codes."""
+    have = set(codes)
+    out = {}
+    for code, meta in worldbank.countries().items():
+        if code not in have: continue
+        for kind in ("region", "income"):
+            if meta.get(kind) and meta[kind] != "Not classified":
+                out.setdefault(f"{kind.title()}: {meta[kind]}", {})[code] = 1.0
+    for name, members in (read_json(GROUPS_PATH, {}) or {}).items():
+        members = members if isinstance(members, dict) else {c: 1.0 for c in members}
+        out[name] = {c: float(m) for c, m in members.items() if c in have}
+    return {k: v for k, v in sorted(out.items()) if v}
+
+def membership(codes, groups):
+    """CSR (indptr, indices, data) of the group × country matrix, rows in groups' order."""
+    pos = {c: i for i, c in enumerate(codes)}
+    indptr, indices, data = [0], [], []
+    for members in groups.values():
+        for c, m in sorted(members.items()):
+            indices.append(pos[c]); data.append(m)
+        indptr.append(len(indices))
+    return np.array(indptr), np.array(indices, dtype="int64"), np.array(data, dtype="float64")
+
+def aggregate(X, W, indptr, indices, data):
+    """Weighted group means: X[country, year, layer], W[country, year] -> [group, year, layer] (NaN where empty)."""
+    E, T, L = X.shape
+    ok = np.isfinite(X) & (np.nan_to_num(W) > 0)[:, :, None]
+    wx = np.where(ok, np.nan_to_num(W)[:, :, None] * np.nan_to_num(X), 0.0).reshape(E, T * L)
+    wk = np.where(ok, np.nan_to_num(W)[:, :, None], 0.0).reshape(E, T * L)
+    G = len(indptr) - 1
+    num = np.zeros((G, T * L)); den = np.zeros((G, T * L))
+    g = 0
+    while g < G:  # blocks of whole groups, so each reduceat segment is one CSR row
+        h = g + 1
+        while h < G and (indptr[h + 1] - indptr[g]) * T * L <= BLOCK: h += 1
+        lo, hi = indptr[g], indptr[h]
+        starts = indptr[g:h] - lo
+        keep = indptr[g + 1:h + 1] > indptr[g:h]          # empty rows would break reduceat
+        if hi > lo and keep.any():
+            idx, m = indices[lo:hi], data[lo:hi, None]
+            num[g:h][keep] = np.add.reduceat(m * wx[idx], starts[keep], axis=0)
+            den[g:h][keep] = np.add.reduceat(m * wk[idx], starts[keep], axis=0)
+        g = h
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, np.nan).reshape(G, T, L)
+
+def weights(pop, gdp_pc=None, kind="population"):
+    """[country, year] weights; GDP = population × GDP per capita."""
+    return pop * gdp_pc if kind == "gdp" and gdp_pc is not None else pop
+
+def _digest(*arrays):
+    h = hashlib.sha1()
+    for a in arrays: h.update(np.ascontiguousarray(a, dtype="float64").tobytes())
+    return h.hexdigest()
+
+def write(codes, years, layers, X, pop, gdp_pc=None, kind="population", version=None, out=OUT_DIR):
+    """Recompute the groups touched since the last run and write their shards; returns the index dict."""
+    t0 = time.perf_counter()
+    years = [int(y) for y in years]
+    W = weights(pop, gdp_pc, kind)
+    grp = groups(codes)
+    state = read_json(os.path.join(out, "state.json"), {}) or {}
+    same_axes = state.get("axes") == {"years": years, "layers": list(layers), "weight": kind}
+    seen = state.get("countries", {}) if same_axes else {}
+    now = {c: _digest(X[i], W[i]) for i, c in enumerate(codes)}
+    changed = {c for c in codes if seen.get(c) != now[c]} | (set(seen) - set(codes))
+    old_members = state.get("groups", {}) if same_axes else {}
+    touched = [n for n, m in grp.items()
+               if old_members.get(n) != m or changed & set(m) or not os.path.exists(os.path.join(out, f"{slug(n)}.json"))]
+    os.makedirs(out, exist_ok=True)
+    if touched:
+        R = aggregate(X, W, *membership(codes, {n: grp[n] for n in touched}))
+        updated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        gi = list(layers).index("GTI") if "GTI" in layers else None
+        for r, name in enumerate(touched):
+            block = R[r]
+            fin = lambda v: round(float(v), 3)
+            shard = {"group": name, "members": sorted(grp[name]), "weight": kind, "updated": updated, "baseline_version": version,
+                     "series": [{"year": y, "gti": fin(block[t, gi])} for t, y in enumerate(years)
+                                if gi is not None and np.isfinite(block[t, gi])],
+                     "by_category": {k: {y: fin(block[t, j]) for t, y in enumerate(years) if np.isfinite(block[t, j])}
+                                     for j, k in enumerate(layers) if k != "GTI"}}
+            with open(os.path.join(out, f"{slug(name)}.json"), "w") as f:
+                json.dump(shard, f, separators=(",", ":"))
+    for name in set(old_members) - set(grp):
+        try: os.remove(os.path.join(out, f"{slug(name)}.json"))
+        except FileNotFoundError: pass
+    index = {"updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "weight": kind, "baseline_version": version,
+             "groups": [{"group": n, "file": f"{slug(n)}.json", "members": len(m)} for n, m in grp.items()]}
+    with open(os.path.join(out, "index.json"), "w") as f:
+        json.dump(index, f, indent=1)
+    with open(os.path.join(out, "state.json"), "w") as f:
+        json.dump({"axes": {"years": years, "layers": list(layers), "weight": kind}, "countries": now, "groups": grp}, f)
+    print(f"Rollups: {len(touched)}/{len(grp)} group(s) recomputed ({len(changed)} changed countries, "
+          f"{kind} weights) in {time.perf_counter() - t0:.3f}s -> {out}")
+    return index
+
+def save_weights(codes, years, pop, gdp_pc=None, path=WEIGHTS_PATH):
+    """Keep the weight panels next to the rollups so `python rollups.py` can rerun without refetching."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, codes=np.array(codes), years=np.array(years), pop=pop,
+                        gdp_pc=gdp_pc if gdp_pc is not None else np.full_like(pop, np.nan))
+
+if __name__ == "__main__":
+    import cube
+    kind = sys.argv[sys.argv.index("--weight") + 1] if "--weight" in sys.argv else "population"
+    h = cube.header()
+    codes = [e for e in h["entities"] if not e.startswith("OWID_")]
+    periods, X = cube.query(codes)
+    wz = np.load(WEIGHTS_PATH)
+    pos = {c: i for i, c in enumerate(wz["codes"].tolist())}
+    rows = [pos.get(c, -1) for c in codes]
+    pick = lambda a: np.where(np.array(rows)[:, None] >= 0, a[rows], np.nan)
+    write(codes, periods, h["layers"], np.asarray(X, dtype="float64"), pick(wz["pop"]), pick(wz["gdp_pc"]), kind, h.get("baseline_version"))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Freshness-aware scheduler: a long-running alternative to the once-a-day cron.
+- Each source declares how often to check while new data is plausible (every), when its
+  publication period rolls over (period: None/"month"/"year") and how long after that the
+  release usually lands (lag_days), plus a retry policy (retries, backoff seconds).
+- Periodic sources are polled only between their expected release and the first observed
+  change for that period; fast sources (markets, GDELT) are checked every hour.
+- A run counts as a change only if the output fingerprint moved (timestamps/notes ignored);
+  updater.py is rerun only after such a change, once in-flight fetchers have finished.
+- All subprocesses share one concurrency cap.
+State: data/cache/scheduler.json
+Run: python scheduler.py [--once] [--status] [--max-concurrency N] [--run NAME[,NAME…]]
+     (--run: only the named sources, and only if due; exit 1 if one failed; used by the daily workflow)
+"""
+import asyncio, datetime as dt, hashlib, json, os, sys, time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(ROOT, "data", "cache", "scheduler.json")
+PY = sys.executable or "python"
+HOUR, DAY = 3600, 86400
+TICK = 30
+MAX_CONCURRENCY = 3
+VOLATILE = {"updated", "updated_iso", "note", "fetched_at", "_lkg"}  # change every run; not data
+
+SOURCES = {
+    "markets":    {"cmd": ["fetch_markets.py"],    "outputs": ["data/live/markets.json", "data/series/vix.csv", "data/series/acwi_z.csv"],
+                   "every": HOUR,     "period": None,    "lag_days": 0,  "retries": 3, "backoff": 300},
+    "sentiment":  {"cmd": ["fetch_sentiment.py"],  "outputs": ["data/live/sentiment.json", "data/series/gdelt_tone.csv"],
+                   "every": HOUR,     "period": None,    "lag_days": 0,  "retries": 3, "backoff": 300},
+    "conflict":   {"cmd": ["fetch_conflict.py"],   "outputs": ["data/live/conflict.json", "data/series/conflict_vol.csv"],
+                   "every": HOUR,     "period": None,    "lag_days": 0,  "retries": 3, "backoff": 300},
+    "planetary":  {"cmd": ["fetch_planetary.py"],  "outputs": ["data/live/planetary.json", "data/series/co2_ppm.csv"],   # NOAA monthly mean, ~5th
+                   "every": DAY,      "period": "month", "lag_days": 4,  "retries": 4, "backoff": 1800},
+    "food":       {"cmd": ["fetch_food.py"],       "outputs": ["data/live/food.json", "data/series/food_price_index.csv"],  # FAO FPI, first Friday
+                   "every": 6 * HOUR, "period": "month", "lag_days": 2,  "retries": 4, "backoff": 1800},
+    "employment": {"cmd": ["fetch_employment.py"], "outputs": ["data/live/employment.json", "data/series/unemployment.csv"],  # annual
+                   "every": 7 * DAY,  "period": "year",  "lag_days": 30, "retries": 2, "backoff": 6 * HOUR},
+    "foodaccess": {"cmd": ["fetch_foodaccess.py"], "outputs": ["data/live/foodaccess.json", "data/series/undernourished.csv"],  # annual
+                   "every": 7 * DAY,  "period": "year",  "lag_days": 180, "retries": 2, "backoff": 6 * HOUR},
+    "categories": {"cmd": ["categories.py"],       "outputs": ["data/categories.json"],  # RSS/NOAA/World Bank scorers
+                   "every": 6 * HOUR, "period": None,    "lag_days": 0,  "retries": 2, "backoff": 900},
+    "backfill":   {"cmd": ["backfill_historical.py", "--incremental"], "outputs": ["data/gti.json"],  # OWID/WB annual; bands: backfill.yml
+                   "every": 7 * DAY,  "period": "year",  "lag_days": 60, "retries": 2, "backoff": 6 * HOUR},
+}
+UPDATER = ["updater.py"]
+
+def read_json(p, default=None):
+    try:
+        with open(p) as f: return json.load(f)
+    except Exception:
+        return default
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, "w") as f: json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+def fingerprint(paths):
+    """Content hash of a source's outputs, ignoring run timestamps and notes in JSON."""
+    h = hashlib.sha1()
+    for rel in paths:
+        p = os.path.join(ROOT, rel)
+        if not os.path.exists(p): h.update(b"-"); continue
+        if p.endswith(".json"):
+            blob = read_json(p, {})
+            if isinstance(blob, dict): blob = {k: v for k, v in blob.items() if k not in VOLATILE}
+            h.update(json.dumps(blob, sort_keys=True).encode())
+        else:
+            with open(p, "rb") as f: h.update(f.read())
+    return h.hexdigest()
+
+def period_start(period, now):
+    d = dt.datetime.fromtimestamp(now, dt.timezone.utc)
+    if period == "year":  d = d.replace(month=1, day=1)
+    if period == "month": d = d.replace(day=1)
+    return d.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+def next_period_start(period, now):
+    d = dt.datetime.fromtimestamp(period_start(period, now), dt.timezone.utc)
+    d = d.replace(year=d.year + 1) if period == "year" else \
+        d.replace(year=d.year + d.month // 12, month=d.month % 12 + 1)
+    return d.timestamp()
+
+def next_due(src, st, now):
+    """Epoch seconds at which the source should next run."""
+    if st.get("retry_at"):
+        return st["retry_at"]
+    last = st.get("last_run", 0)
+    if not last:
+        return now  # never run: fetch once to seed the fingerprint
+    if not src["period"]:
+        return last + src["every"]
+    release = period_start(src["period"], now) + src["lag_days"] * DAY
+    if now < release:
+        return release  # this period's release is not out yet
+    if st.get("last_change", 0) >= release:
+        return next_period_start(src["period"], now) + src["lag_days"] * DAY  # already picked up
+    return last + src["every"]
+
+class Scheduler:
+    def __init__(self, max_concurrency=MAX_CONCURRENCY):
+        self.state = read_json(STATE_PATH, {}) or {}
+        self.sem = asyncio.Semaphore(max_concurrency)
+        self.running = set()
+        self.dirty = bool(self.state.get("_updater", {}).get("pending"))
+
+    async def run_cmd(self, name, args):
+        async with self.sem:
+            t0 = time.time()
+            proc = await asyncio.create_subprocess_exec(PY, *args, cwd=ROOT,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+            out, _ = await proc.communicate()
+            tail = out.decode(errors="replace").strip().splitlines()[-1:] or [""]
+            print(f"[{time.strftime('%H:%M:%S')}] {name}: exit {proc.returncode} in {time.time()-t0:.1f}s {tail[0][:120]}")
+            return proc.returncode == 0
+
+    async def run_source(self, name):
+        src = SOURCES[name]; st = self.state.setdefault(name, {})
+        before = st.get("fingerprint") or fingerprint(src["outputs"])
+        ok = await self.run_cmd(name, src["cmd"])
+        now = time.time()
+        st["last_run"] = now
+        if not ok:
+            st["failures"] = st.get("failures", 0) + 1
+            st["retry_at"] = now + src["backoff"] * 2 ** (st["failures"] - 1) if st["failures"] <= src["retries"] else None
+            if not st["retry_at"]: st["failures"] = 0  # give up until the next regular check
+        else:
+            st["failures"] = 0; st["retry_at"] = None; st["last_ok"] = now
+            fp = fingerprint(src["outputs"])
+            if fp != before:
+                st["last_change"] = now; self.dirty = True
+            st["fingerprint"] = fp
+        self.state.setdefault("_updater", {})["pending"] = self.dirty
+        save_state(self.state)
+        return ok
+
+    async def run_updater(self):
+        self.dirty = False
+        ok = await self.run_cmd("updater", UPDATER)
+        u = self.state.setdefault("_updater", {})
+        u["last_run"] = time.time(); u["ok"] = ok; u["pending"] = not ok
+        self.dirty = not ok
+        save_state(self.state)
+
+    def due(self, now):
+        return [n for n, src in SOURCES.items()
+                if n not in self.running and next_due(src, self.state.get(n, {}), now) <= now]
+
+    async def _launch(self, name):
+        self.running.add(name)
+        try: await self.run_source(name)
+        finally: self.running.discard(name)
+
+    async def run_due(self, names):
+        """Run the named sources that are due now; False if any of them failed."""
+        due = [n for n in self.due(time.time()) if n in names]
+        for n in sorted(set(names) - set(due)):
+            print(f"{n}: not due until {time.strftime('%Y-%m-%d %H:%M', time.gmtime(next_due(SOURCES[n], self.state.get(n, {}), time.time())))}")
+        return all(await asyncio.gather(*(self.run_source(n) for n in due)))
+
+    async def once(self):
+        await asyncio.gather(*(self._launch(n) for n in self.due(time.time())))
+        if self.dirty: await self.run_updater()
+
+    async def forever(self):
+        tasks = set()
+        def reap(t):  # a failed run_source (e.g. save_state OSError) is logged, not dropped
+            tasks.discard(t)
+            if not t.cancelled() and t.exception():
+                print(f"[{time.strftime('%H:%M:%S')}] {t.get_name()}: {t.exception()!r}", file=sys.stderr)
+        while True:
+            for n in self.due(time.time()):
+                t = asyncio.create_task(self._launch(n), name=n); tasks.add(t); t.add_done_callback(reap)
+            if self.dirty and not self.running:
+                self.running.add("updater")
+                try: await self.run_updater()
+                finally: self.running.discard("updater")
+            await asyncio.sleep(TICK)
+
+def print_status(state):
+    now = time.time()
+    fmt = lambda t: time.strftime("%Y-%m-%d %H:%M", time.gmtime(t)) if t else "—"
+    for n, src in SOURCES.items():
+        st = state.get(n, {})
+        print(f"{n:11s} last run {fmt(st.get('last_run'))}  last change {fmt(st.get('last_change'))}  next {fmt(max(now, next_due(src, st, now)))}")
+
+def flag_value(argv, name, default):
+    return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else default
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--status" in argv:
+        return print_status(read_json(STATE_PATH, {}) or {})
+    sched = Scheduler(int(flag_value(argv, "--max-concurrency", MAX_CONCURRENCY)))
+    if "--run" in argv:
+        names = [n for n in flag_value(argv, "--run", "").split(",") if n]
+        unknown = set(names) - set(SOURCES)
+        if unknown:
+            raise SystemExit(f"unknown source(s): {', '.join(sorted(unknown))}")
+        sys.exit(0 if asyncio.run(sched.run_due(names)) else 1)
+    try:
+        asyncio.run(sched.once() if "--once" in argv else sched.forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
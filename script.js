@@ -3,23 +3,38 @@ document.addEventListener('DOMContentLoaded', () => {
   const bust = () => Date.now();
   const urls = {
     gti:     () => `./data/gti.json?t=${bust()}`,
+    shard:   (f) => `./data/gti/${f}?t=${bust()}`,
     status:  () => `./data/status.json?t=${bust()}`,
     cats:    () => `./data/categories.json?t=${bust()}`,
     sources: () => `./data/sources.json?t=${bust()}`,
     events:  () => `./data/events.json?t=${bust()}`,
-    sums:    () => `./data/summaries.json?t=${bust()}`
+    sums:    () => `./data/summaries.json?t=${bust()}`,
+    clog:    (f) => `./data/changelog/${f}?t=${bust()}`
   };
   const cssVar = (name) => getComputedStyle(document.body).getPropertyValue(name).trim();
 
   // === display helpers (never print 0.00 for nulls) ===
   const isNum = (v) => (typeof v === 'number' && isFinite(v));
   const dNum  = (v, d=2) => (isNum(v) ? v.toFixed(d) : '—');
+  const esc   = (v) => String(v ?? '').replace(/[&<>"']/g, (c)=>({'&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;'}[c]));
   const dPct  = (v, d=2) => (isNum(v) ? (v*100).toFixed(d)+'%' : '—');
   const nOr   = (v, d=0) => (isNum(v) ? v : d);
 
   const humanAgo = (ms)=>{ const s=Math.floor(ms/1000); if(s<60)return`${s}s ago`; const m=Math.floor(s/60); if(m<60)return`${m}m ago`; const h=Math.floor(m/60); if(h<24)return`${h}h ago`; const d=Math.floor(h/24); return `${d}d ago`; };
   async function getJSON(url){ try{ const r=await fetch(url,{cache:'no-store'}); if(!r.ok) throw new Error(`HTTP ${r.status}`); return await r.json(); }catch{ return null; } }
 
+  // Plotly (several MB) is not in the page: the pre-rendered sparkline/KPIs paint first and the chart takes over once it loads
+  const PLOTLY_SRC = 'https://cdn.plot.ly/plotly-2.35.2.min.js';
+  let plotlyReq = null;
+  function loadPlotly(){
+    if (window.Plotly) return Promise.resolve(window.Plotly);
+    return plotlyReq ||= new Promise((resolve, reject)=>{
+      const s=document.createElement('script'); s.src=PLOTLY_SRC; s.crossOrigin='anonymous'; s.async=true;
+      s.onload=()=>resolve(window.Plotly); s.onerror=()=>{ plotlyReq=null; s.remove(); reject(new Error('plotly')); };
+      document.head.appendChild(s);
+    });
+  }
+
   // Elements
   const kpiYear = document.getElementById('kpi-year');
   const kpiGTI  = document.getElementById('kpi-gti');
@@ -76,7 +91,7 @@ document.addEventListener('DOMContentLoaded', () => {
   chkDecade?.addEventListener('change', ()=>{ prefs.decade = !!chkDecade.checked; savePrefs(); plotLine(true); });
   selColor?.addEventListener('change', ()=>{ prefs.lineColor = selColor.value; savePrefs(); plotLine(true); });
   selWeight?.addEventListener('change', ()=>{ prefs.lineWeight = Number(selWeight.value); savePrefs(); plotLine(true); });
-  selRange?.addEventListener('change', ()=>{ prefs.range = selRange.value; savePrefs(); plotLine(true); });
+  selRange?.addEventListener('change', async()=>{ prefs.range = selRange.value; savePrefs(); await ensureRange(rangeStart()).catch(()=>{}); plotLine(true); });
 
   tabs.forEach(btn=>{
     btn.addEventListener('click', (e)=>{
@@ -87,10 +102,30 @@ document.addEventListener('DOMContentLoaded', () => {
       panels.forEach(p=>p.classList.remove('active'));
       btn.classList.add('active'); tgt.classList.add('active');
       if(btn.dataset.tab==='overview' && window.Plotly){ try{ Plotly.Plots.resize('chart-plot'); }catch{} }
+      if(btn.dataset.tab==='changelog' && !CLOG.loaded){ loadChangelog().catch(()=>{}); }
+      if(btn.dataset.tab==='details' && !CATHIST.loaded){ loadCategoryHistory().catch(()=>{ CATHIST.loaded=false; }); }
     }, {passive:true});
   });
 
-  let SERIES = []; let EVENTS = {}; let SUMS = {}; let LAST_STATUS_ISO = null;
+  let SERIES = []; let BANDS = []; let EVENTS = {}; let SUMS = {}; let LAST_STATUS_ISO = null;
+
+  // Range-sharded GTI: index + tail render first; older decades are fetched only when the range reaches them
+  const SHARDS = { index:null, loaded:new Set() };
+  const mergeRows = (into, rows)=>{ const m=new Map(into.map(r=>[r.year,r])); rows.forEach(r=>m.set(r.year,r)); return [...m.values()].sort((a,b)=>a.year-b.year); };
+  function rangeStart(){
+    const pick=(selRange&&selRange.value)||'all'; const last=SHARDS.index?.last_year;
+    if(!isNum(last)) return -Infinity;
+    return pick==='decade'? last-9 : pick==='20y'? last-19 : pick==='5y'? last-4 : -Infinity;
+  }
+  async function ensureRange(start){
+    const idx=SHARDS.index; if(!idx) return false;
+    const tailStart = idx.tail?.start ?? Infinity;
+    const need=(idx.decades||[]).filter(d=>d.end>=start && d.start<tailStart && !SHARDS.loaded.has(d.file));
+    if(!need.length) return false;
+    const blobs=await Promise.all(need.map(d=>getJSON(urls.shard(d.file))));
+    blobs.forEach((b,i)=>{ if(!b) return; SHARDS.loaded.add(need[i].file); SERIES=mergeRows(SERIES,b.series||[]); BANDS=mergeRows(BANDS,b.bands||[]); });
+    return true;
+  }
 
   function computeRange(years){
     const pick=(selRange&&selRange.value)||'all';
@@ -118,12 +153,13 @@ document.addEventListener('DOMContentLoaded', () => {
   function plotLine(force=false){
     const el = document.getElementById('chart-plot'); if(!el) return;
     if(!Array.isArray(SERIES)||SERIES.length===0){ el.innerHTML='<div class="warn">No GTI data found.</div>'; return; }
-    el.innerHTML='';
     const years = SERIES.map(d=>d.year);
     const vals  = SERIES.map(d=>d.gti);
-    const lastYear = years.at(-1), lastVal = vals.at(-1);
-    kpiYear && (kpiYear.textContent = String(lastYear));
-    kpiGTI  && (kpiGTI.textContent  = String(Math.round(nOr(lastVal,0))));
+    const last = SERIES.findLast(d=>isNum(d.gti));   // trailing years may be null (as updater.first_paint skips them)
+    kpiYear && (kpiYear.textContent = last ? String(last.year) : '—');
+    kpiGTI  && (kpiGTI.textContent  = last ? String(Math.round(last.gti)) : '—');
+    if(!window.Plotly){ loadPlotly().then(()=>plotLine(force)).catch(()=>{}); return; }  // keep the sparkline until then
+    el.innerHTML='';
 
     const colorMap={blue:'#2563eb',green:'#059669',purple:'#7c3aed',orange:'#ea580c',red:'#dc2626'};
     const useColor=(prefs.lineColor && prefs.lineColor!=='auto')? colorMap[prefs.lineColor] : undefined;
@@ -142,9 +178,17 @@ document.addEventListener('DOMContentLoaded', () => {
       paper_bgcolor:cssVar('--card'), plot_bgcolor:cssVar('--card'), font:{color:cssVar('--fg')}
     };
 
-    Plotly.newPlot('chart-plot',[{ x:years, y:vals, type:'scatter', mode:'lines',
+    // Weight-sensitivity ribbon (p5–p95 across sampled weightings), drawn under the line
+    const bands = Array.isArray(BANDS) ? BANDS.filter(b=>isNum(b.p5) && isNum(b.p95)) : [];
+    const ribbon = bands.length ? [
+      { x:bands.map(b=>b.year), y:bands.map(b=>b.p95), type:'scatter', mode:'lines', line:{width:0}, hoverinfo:'skip', showlegend:false },
+      { x:bands.map(b=>b.year), y:bands.map(b=>b.p5), type:'scatter', mode:'lines', line:{width:0}, fill:'tonexty',
+        fillcolor:'rgba(100,116,139,0.22)', hovertemplate:'p5–p95 weight band<extra></extra>', showlegend:false }
+    ] : [];
+
+    Plotly.newPlot('chart-plot',[...ribbon, { x:years, y:vals, type:'scatter', mode:'lines',
       hovertemplate:'Year: %{x}<br>GTI: %{y:.0f}<extra></extra>',
-      line:{width:useWidth, color:useColor}
+      line:{width:useWidth, color:useColor}, showlegend:false
     }], layout, {displayModeBar:false, responsive:true}).then(gd=>{
       if(force){ try{ Plotly.relayout(gd, layout); }catch{} }
       gd.on('plotly_click', ev=>{
@@ -181,34 +225,36 @@ document.addEventListener('DOMContentLoaded', () => {
     }catch{}
     const ul=document.getElementById('signals-list'); if(!ul) return;
     const items=[];
+    // last-known-good sections older than their cadence (or whose last refresh failed)
+    const staleTag=(sec)=> sec?.stale ? ` <span class="muted" title="last good value ${isNum(sec.age_h)? sec.age_h+'h' : ''} old">stale</span>` : '';
     try{
       if(status.planetary){
-        items.push(`<li><span class="sig-name">CO₂ (ppm)</span><span class="sig-val">${dNum(status.planetary.co2_ppm,2)}</span></li>`);
-        items.push(`<li><span class="sig-name">Temp anomaly (°C)</span><span class="sig-val">${dNum(status.planetary.gistemp_anom_c,2)}</span></li>`);
+        items.push(`<li><span class="sig-name">CO₂ (ppm)</span><span class="sig-val">${dNum(status.planetary.co2_ppm,2)}</span>${staleTag(status.planetary)}</li>`);
+        items.push(`<li><span class="sig-name">Temp anomaly (°C)</span><span class="sig-val">${dNum(status.planetary.gistemp_anom_c,2)}</span>${staleTag(status.planetary)}</li>`);
       }
       if(status.food){
         const mom = isNum(status.food.fpi_mom) ? dNum(status.food.fpi_mom,2) : '—';
-        items.push(`<li><span class="sig-name">Food price index</span><span class="sig-val">${dNum(status.food.fpi_last,2)} (${mom} m/m)</span></li>`);
+        items.push(`<li><span class="sig-name">Food price index</span><span class="sig-val">${dNum(status.food.fpi_last,2)} (${mom} m/m)</span>${staleTag(status.food)}</li>`);
       }
       if(status.food_access){
         const d = isNum(status.food_access.delta_pct) ? dNum(status.food_access.delta_pct,2) : '—';
-        items.push(`<li><span class="sig-name">Undernourished (World)</span><span class="sig-val">${dNum(status.food_access.undernourished_pct,2)}% (${d} Δ)</span></li>`);
+        items.push(`<li><span class="sig-name">Undernourished (World)</span><span class="sig-val">${dNum(status.food_access.undernourished_pct,2)}% (${d} Δ)</span>${staleTag(status.food_access)}</li>`);
       }
       if(status.employment){
         const d = isNum(status.employment.delta_pct) ? dNum(status.employment.delta_pct,2) : '—';
-        items.push(`<li><span class="sig-name">Unemployment (World)</span><span class="sig-val">${dNum(status.employment.unemployment_rate,2)}% (${d} Δ)</span></li>`);
+        items.push(`<li><span class="sig-name">Unemployment (World)</span><span class="sig-val">${dNum(status.employment.unemployment_rate,2)}% (${d} Δ)</span>${staleTag(status.employment)}</li>`);
       }
       if(status.sentiment){
-        items.push(`<li><span class="sig-name">News tone (30d avg)</span><span class="sig-val">${dNum(status.sentiment.avg_tone_30d,2)}</span></li>`);
+        items.push(`<li><span class="sig-name">News tone (30d avg)</span><span class="sig-val">${dNum(status.sentiment.avg_tone_30d,2)}</span>${staleTag(status.sentiment)}</li>`);
       }
       if(status.conflict){
         const d30 = isNum(status.conflict.delta_30) ? dNum(status.conflict.delta_30,2) : '—';
-        items.push(`<li><span class="sig-name">Conflict pulse (30d)</span><span class="sig-val">${dNum(status.conflict.avg_last30,2)} (${d30} vs prev 30d)</span></li>`);
+        items.push(`<li><span class="sig-name">Conflict pulse (30d)</span><span class="sig-val">${dNum(status.conflict.avg_last30,2)} (${d30} vs prev 30d)</span>${staleTag(status.conflict)}</li>`);
       }
       if(status.markets){
-        items.push(`<li><span class="sig-name">ACWI (30d return)</span><span class="sig-val">${isNum(status.markets.acwi_ret30)? (status.markets.acwi_ret30*100).toFixed(2)+'%' : '—'}</span></li>`);
-        items.push(`<li><span class="sig-name">VIX (level)</span><span class="sig-val">${dNum(status.markets.vix,2)}</span></li>`);
-        items.push(`<li><span class="sig-name">Brent 30d vol</span><span class="sig-val">${isNum(status.markets.brent_vol30)? (status.markets.brent_vol30*100).toFixed(2)+'%' : '—'}</span></li>`);
+        items.push(`<li><span class="sig-name">ACWI (30d return)</span><span class="sig-val">${isNum(status.markets.acwi_ret30)? (status.markets.acwi_ret30*100).toFixed(2)+'%' : '—'}</span>${staleTag(status.markets)}</li>`);
+        items.push(`<li><span class="sig-name">VIX (level)</span><span class="sig-val">${dNum(status.markets.vix,2)}</span>${staleTag(status.markets)}</li>`);
+        items.push(`<li><span class="sig-name">Brent 30d vol</span><span class="sig-val">${isNum(status.markets.brent_vol30)? (status.markets.brent_vol30*100).toFixed(2)+'%' : '—'}</span>${staleTag(status.markets)}</li>`);
       }
       ul.innerHTML = items.join('');
     }catch{}
@@ -219,7 +265,8 @@ document.addEventListener('DOMContentLoaded', () => {
     const order=["Planetary Health","Economic Wellbeing","Global Peace & Conflict","Public Health","Civic Freedom & Rights","Technological Progress","Sentiment & Culture","Entropy Index"];
     const rows=order.map(k=>({name:k,score:(cats.scores && typeof cats.scores[k]==='number')? cats.scores[k] : 50}));
     const barsEl=document.getElementById('category-bars');
-    if(barsEl){
+    if(barsEl && !window.Plotly){ loadPlotly().then(()=>renderCategories(cats)).catch(()=>{}); }
+    else if(barsEl){
       Plotly.newPlot('category-bars',[{x:rows.map(r=>r.score),y:rows.map(r=>r.name),type:'bar',orientation:'h',hovertemplate:'%{y}: %{x}<extra></extra>'}],{
         margin:{l:170,r:20,t:10,b:30}, xaxis:{range:[0,100], showgrid:true, gridcolor:cssVar('--grid')},
         paper_bgcolor:cssVar('--card'), plot_bgcolor:cssVar('--card'), font:{color:cssVar('--fg')}
@@ -247,9 +294,71 @@ document.addEventListener('DOMContentLoaded', () => {
     }
   }
 
+  // Category history: one small file per category, listed in the shard index; only fetched once Details is opened
+  const CATHIST = { loaded:false };
+  async function loadCategoryHistory(){
+    CATHIST.loaded = true;
+    const el=document.getElementById('category-history'); if(!el) return;
+    const idx = SHARDS.index || await getJSON(urls.shard('index.json'));
+    const list = (idx && idx.categories) || [];
+    if(!list.length){ el.innerHTML='<div class="warn">No category history found.</div>'; return; }
+    const blobs = (await Promise.all(list.map(c=>getJSON(urls.shard(c.file))))).filter(Boolean);
+    await loadPlotly();
+    el.innerHTML='';
+    Plotly.newPlot('category-history', blobs.map(b=>({ x:b.years, y:b.values, name:b.category, type:'scatter', mode:'lines',
+      hovertemplate:`${b.category}: %{y:.1f}<extra>%{x}</extra>` })), {
+      margin:{l:50,r:20,t:40,b:40}, title:'Category history (0–100)', legend:{orientation:'h'},
+      xaxis:{showgrid:true, gridcolor:cssVar('--grid')}, yaxis:{range:[0,100], showgrid:true, gridcolor:cssVar('--grid')},
+      paper_bgcolor:cssVar('--card'), plot_bgcolor:cssVar('--card'), font:{color:cssVar('--fg')}
+    }, {displayModeBar:false, responsive:true}).catch(()=>{});
+  }
+
+  // Change log: head.json first (constant size), then one month segment per "Older" click via index.json
+  const CLOG = { loaded:false, rows:[], segments:[], next:0, oldest:null };
+  const clogRow = (r)=>{
+    const n = (r.count||1) > 1 ? ` <span class="muted">(×${esc(r.count)}, through ${esc(r.date_last)})</span>` : '';
+    return `<tr><td>${esc(r.date)}</td><td>${esc(r.change)}${n}</td></tr>`;
+  };
+  function renderChangelog(){
+    const el=document.getElementById('changelog-list'); if(!el) return;
+    const cells = CLOG.rows.slice().reverse().map(clogRow).join('');
+    el.innerHTML = `<table><thead><tr><th>Date</th><th>Change</th></tr></thead><tbody>${cells}</tbody></table>`;
+    const btn=document.getElementById('changelog-older');
+    btn && (btn.style.display = CLOG.next < CLOG.segments.length ? '' : 'none');
+  }
+  async function loadChangelog(){
+    const head = await getJSON(urls.clog('head.json'));
+    const idx  = await getJSON(urls.clog((head && head.index) || 'index.json'));
+    CLOG.rows = (head && head.entries) || [];
+    CLOG.oldest = CLOG.rows.length ? CLOG.rows[0].date : null;
+    CLOG.segments = (idx && idx.segments) || []; CLOG.next = 0; CLOG.loaded = true;
+    renderChangelog();
+  }
+  async function loadOlderChangelog(){
+    const seg = CLOG.segments[CLOG.next++]; if(!seg) return;
+    const blob = await getJSON(urls.clog(seg.file));
+    // segments overlap the head; keep only runs older than what is already shown
+    const older = ((blob && blob.entries) || []).filter(r => !CLOG.oldest || r.date < CLOG.oldest);
+    if(older.length){ CLOG.rows = older.concat(CLOG.rows); CLOG.oldest = older[0].date; }
+    renderChangelog();
+  }
+  document.getElementById('changelog-older')?.addEventListener('click', ()=>{ loadOlderChangelog().catch(()=>{}); });
+
+  async function loadGTI(){
+    // Prefer index + tail (small); fall back to the monolithic gti.json when shards are missing
+    const idx = await getJSON(urls.shard('index.json'));
+    const tail = idx ? await getJSON(urls.shard(idx.tail?.file || 'tail.json')) : null;
+    if (idx && tail){
+      SHARDS.index = idx; SHARDS.loaded = new Set();
+      return { updated: idx.updated, series: tail.series || [], bands: tail.bands || [] };
+    }
+    SHARDS.index = null;
+    return await getJSON(urls.gti());
+  }
+
   async function loadAll(){
     const [gti, status, cats, src, ev, sums] = await Promise.all([
-      getJSON(urls.gti()),
+      loadGTI(),
       getJSON(urls.status()),
       getJSON(urls.cats()),
       getJSON(urls.sources()),
@@ -258,10 +367,14 @@ document.addEventListener('DOMContentLoaded', () => {
     ]);
     const series = (gti && Array.isArray(gti.series)) ? gti.series : [];
     SERIES = series.length ? series : [{year:1900, gti:300}];
+    BANDS = (gti && Array.isArray(gti.bands)) ? gti.bands : [];
     if (gti?.updated && kpiUpd) kpiUpd.textContent = new Date(gti.updated).toUTCString();
     EVENTS = ev || {}; SUMS = sums || {};
     renderSignals(status); renderCategories(cats); renderSources(src); plotLine();
     LAST_STATUS_ISO = status?.updated_iso || LAST_STATUS_ISO;
+    if (CATHIST.loaded) loadCategoryHistory().catch(()=>{});  // only once the Details tab has been opened
+    // widen to the selected range in the background, then repaint once
+    if (await ensureRange(rangeStart()).catch(()=>false)) plotLine(true);
   }
 
   async function poll(){
@@ -275,11 +388,41 @@ document.addEventListener('DOMContentLoaded', () => {
     }catch{}
   }
 
+  // Push when self-hosted (server.py /events); the 60 s status poll stays as the fallback (e.g. GitHub Pages)
+  let SSE_LIVE = false;
+  function listenSSE(){
+    if(!('EventSource' in window)) return;
+    const es = new EventSource('./events');
+    es.onopen  = ()=>{ SSE_LIVE = true; };
+    es.onerror = ()=>{ SSE_LIVE = false; };   // the browser reconnects by itself unless the route is missing
+    es.addEventListener('change', (ev)=>{
+      if(!autoRF?.checked) return;
+      let files = []; try{ files = JSON.parse(ev.data).files || []; }catch{}
+      if(files.length && files.every(f=>f.includes('/changelog/'))){ if(CLOG.loaded) loadChangelog().catch(()=>{}); return; }
+      loadAll().catch(()=>{});
+    });
+  }
+
   loadAll().catch(()=>{});
-  setInterval(()=>{ if(autoRF?.checked) poll(); }, 60000);
+  loadPlotly().catch(()=>{});  // async, in parallel with the data; never blocks the first paint
+  listenSSE();
+  setInterval(()=>{ if(autoRF?.checked && !SSE_LIVE) poll(); }, 60000);
+
+  // Service worker: data is served from cache first; it posts 'data-updated' when a fresher copy lands
+  if ('serviceWorker' in navigator){
+    let swTimer = null;
+    navigator.serviceWorker.addEventListener('message', (ev)=>{
+      if(ev.data?.type !== 'data-updated') return;
+      if(String(ev.data.path||'').includes('/changelog/') && CLOG.loaded){ loadChangelog().catch(()=>{}); return; }
+      if(swTimer) clearTimeout(swTimer);  // several files usually land together: repaint once
+      swTimer = setTimeout(()=>{ loadAll().catch(()=>{}); }, 300);
+    });
+    window.addEventListener('load', ()=>{ navigator.serviceWorker.register('./sw.js').catch(()=>{}); });
+  }
 
-  btnPNG?.addEventListener('click', async()=>{ try{ await Plotly.downloadImage('chart-plot',{format:'png',filename:'anthrometer-gti'});}catch{} });
-  btnCSV?.addEventListener('click', ()=>{
+  btnPNG?.addEventListener('click', async()=>{ try{ await loadPlotly(); await Plotly.downloadImage('chart-plot',{format:'png',filename:'anthrometer-gti'});}catch{} });
+  btnCSV?.addEventListener('click', async()=>{
+    await ensureRange(-Infinity).catch(()=>{});  // export the full history, not just the loaded window
     if(!Array.isArray(SERIES)||SERIES.length===0) return;
     const rows=['year,gti'].concat(SERIES.map(d=>`${d.year},${d.gti}`)).join('\n');
     const blob=new Blob([rows],{type:'text/csv'}); const url=URL.createObjectURL(blob);
@@ -6,8 +6,8 @@ Sentiment & Culture (stub): read global headlines via RSS, do simple lexicon sco
 - On failure, falls back to last saved value (or 50).
 """
 import os, json, re, sys
-from urllib.request import urlopen
 from xml.etree import ElementTree as ET
+import http_client, scoring
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 CATEGORIES_PATH = os.path.join(DATA_DIR, "categories.json")
@@ -39,9 +39,7 @@ def _last_sentiment():
         return 50.0
 
 def _fetch_feed(url):
-    with urlopen(url, timeout=10) as resp:
-        xml = resp.read()
-    return ET.fromstring(xml)
+    return http_client.parsed(url, ET.fromstring, "xml", timeout=10)
 
 def _extract_titles(root):
     titles = []
@@ -78,9 +76,8 @@ def get_score():
             return _last_sentiment()
         # Normalize: mean headline score → 0..100 (50 neutral)
         avg = sum(scores) / len(scores)  # typically around [-0.5, +0.5]
-        # Map: -2 => 30, 0 => 50, +2 => 70 (clamp 0..100)
-        mapped = 50.0 + max(min(avg, 2.0), -2.0) * 10.0
-        return round(max(min(mapped, 100.0), 0.0), 2)
+        # Map: -2 => 30, 0 => 50, +2 => 70 (curve "news_sentiment" in normalize.json)
+        return round(scoring.score("news_sentiment", avg), 2)
     except Exception:
         return _last_sentiment()
 
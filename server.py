@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Self-hosted dashboard server (stdlib asyncio only).
+- Serves the site root and data/ with gzip, strong ETags and 304s on If-None-Match; keep-alive.
+- Watches data/ for new updater.py output (mtime scan, debounced) and pushes a single
+  Server-Sent Event per change on /events, so open dashboards refetch only on real changes.
+- Only the shell (SHELL_FILES) and data/ are served, never data/cache, data/vintages or SQLite files.
+- Encoded bodies are cached per (path, mtime, size) in an LRU bounded by BODY_CACHE_BYTES; binary or
+  already-compressed files (UNCACHED) are read per request with an mtime/size ETag. File reads, gzip
+  and /api/gti scoring run in worker threads (asyncio.to_thread), off the event loop. An idle client
+  costs one socket and a heartbeat comment every HEARTBEAT seconds.
+- /api/gti?w=w1,...,w8: the GTI curve under custom category weights (reweight.py; numpy is imported
+  on the first call, so plain file serving stays stdlib-only).
+Run: python server.py [--host 0.0.0.0] [--port 8000]
+"""
+import asyncio, email.utils, gzip, hashlib, json, mimetypes, os, sys, threading, time
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.realpath(__file__))
+DATA_DIR = os.path.join(ROOT, "data")
+WATCH_SKIP = ("cache", "series")        # fetcher-side caches: not served as change events
+POLL_SECONDS = 2.0                      # data/ mtime scan interval
+SETTLE_SECONDS = 3.0                    # wait for a quiet period so one updater run = one event
+HEARTBEAT = 25.0
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "image/svg+xml", "application/xml")
+SHELL_FILES = ("index.html", "styles.css", "script.js", "sw.js")   # served from ROOT; everything else only under data/
+DATA_PRIVATE = ("cache", "vintages")    # fetcher caches and the vintage store under data/: never served
+BODY_CACHE_BYTES = 32 << 20             # raw + gzip bytes kept in the body LRU
+UNCACHED = (".parquet", ".arrow", ".f32", ".sqlite", ".pack", ".gz", ".zip")  # binary/compressed: no gzip, no cache
+
+_bodies = OrderedDict()  # path -> (mtime_ns, size, etag, raw, gz or None), LRU order
+_bodies_bytes = 0
+_bodies_lock = threading.Lock()
+_clients = set() # asyncio.Queue per open /events stream
+_last_event = {"id": 0, "data": None}
+
+def _body(path):
+    """(mtime_ns, size, etag, raw, gz); runs in worker threads, so the LRU is touched under _bodies_lock."""
+    global _bodies_bytes
+    st = os.stat(path)
+    with _bodies_lock:
+        hit = _bodies.get(path)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            _bodies.move_to_end(path)
+            return hit
+    with open(path, "rb") as f: raw = f.read()
+    if path.endswith(UNCACHED):
+        return (st.st_mtime_ns, st.st_size, f"{st.st_mtime_ns:x}-{st.st_size:x}", raw, None)
+    ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    gz = gzip.compress(raw, 6, mtime=0) if ctype.startswith(COMPRESSIBLE) and len(raw) > 512 else None
+    new = (st.st_mtime_ns, st.st_size, hashlib.sha1(raw).hexdigest()[:20], raw, gz)
+    cost = lambda e: len(e[3]) + len(e[4] or b"")
+    with _bodies_lock:
+        old = _bodies.pop(path, None)
+        if old:
+            _bodies_bytes -= cost(old)
+        if cost(new) <= BODY_CACHE_BYTES // 4:  # one big file must not flush the whole cache
+            _bodies[path] = new; _bodies_bytes += cost(new)
+            while _bodies_bytes > BODY_CACHE_BYTES:
+                _bodies_bytes -= cost(_bodies.popitem(last=False)[1])
+    return new
+
+def _resolve(target):
+    """Filesystem path for a URL path, or None. Allowlist: the shell (SHELL_FILES) and data/, minus
+    DATA_PRIVATE and SQLite databases; no traversal, dotfiles or symlinks out of data/."""
+    rel = unquote(urlsplit(target).path).lstrip("/") or "index.html"
+    parts = rel.split("/")
+    if any(p in ("", ".", "..") or p.startswith(".") for p in parts):
+        return None
+    if len(parts) == 1:
+        return os.path.join(ROOT, rel) if rel in SHELL_FILES and os.path.isfile(os.path.join(ROOT, rel)) else None
+    if parts[0] != "data" or parts[1] in DATA_PRIVATE or ".sqlite" in parts[-1]:
+        return None
+    path = os.path.realpath(os.path.join(ROOT, rel))
+    return path if path.startswith(DATA_DIR + os.sep) and os.path.isfile(path) else None
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status}"] + [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+REASONS = {200: "200 OK", 304: "304 Not Modified", 400: "400 Bad Request", 404: "404 Not Found", 405: "405 Method Not Allowed",
+           500: "500 Internal Server Error", 503: "503 Service Unavailable"}
+
+async def serve_file(method, target, headers, writer):
+    path = _resolve(target)
+    if not path:
+        body = b"not found"
+        writer.write(_head(REASONS[404], {"Content-Type": "text/plain", "Content-Length": len(body)}) + (body if method == "GET" else b""))
+        return
+    try:
+        mtime, size, digest, raw, gz = await asyncio.to_thread(_body, path)   # read + gzip off the event loop
+    except OSError:
+        body = b"not found"
+        writer.write(_head(REASONS[404], {"Content-Type": "text/plain", "Content-Length": len(body)}) + (body if method == "GET" else b""))
+        return
+    use_gz = gz is not None and "gzip" in headers.get("accept-encoding", "")
+    etag = f'"{digest}-gz"' if use_gz else f'"{digest}"'  # strong ETags differ per encoding
+    h = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding",
+         "Last-Modified": email.utils.formatdate(mtime / 1e9, usegmt=True),
+         "Content-Type": mimetypes.guess_type(path)[0] or "application/octet-stream"}
+    inm = headers.get("if-none-match", "")
+    if inm and (inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]):
+        writer.write(_head(REASONS[304], {k: h[k] for k in ("ETag", "Cache-Control", "Vary")}))
+        return
+    body = gz if use_gz else raw
+    if use_gz: h["Content-Encoding"] = "gzip"
+    h["Content-Length"] = len(body)
+    writer.write(_head(REASONS[200], h) + (body if method == "GET" else b""))
+
+async def serve_events(method, target, headers, writer):
+    """SSE stream; replays the latest change for reconnecting clients that missed it (Last-Event-ID).
+    HEAD gets the headers only."""
+    if method == "HEAD":
+        writer.write(_head(REASONS[200], {"Content-Type": "text/event-stream", "Cache-Control": "no-cache", "Content-Length": 0}))
+        return
+    writer.write(_head(REASONS[200], {"Content-Type": "text/event-stream", "Cache-Control": "no-cache",
+                                      "Connection": "keep-alive", "X-Accel-Buffering": "no"}))
+    writer.write(b"retry: 5000\n\n")
+    seen = headers.get("last-event-id", "")
+    if _last_event["data"] and seen and seen != str(_last_event["id"]):
+        writer.write(_sse(_last_event["id"], _last_event["data"]))
+    q = asyncio.Queue(maxsize=8)
+    _clients.add(q)
+    try:
+        while True:
+            try:
+                msg = await asyncio.wait_for(q.get(), HEARTBEAT)
+            except asyncio.TimeoutError:
+                msg = b": ping\n\n"
+            writer.write(msg)
+            await writer.drain()
+    finally:
+        _clients.discard(q)
+
+def _sse(eid, data):
+    return f"id: {eid}\nevent: change\ndata: {data}\n\n".encode()
+
+def broadcast(files):
+    _last_event["id"] += 1
+    _last_event["data"] = json.dumps({"files": files, "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}, separators=(",", ":"))
+    msg = _sse(_last_event["id"], _last_event["data"])
+    for q in list(_clients):
+        if q.full():  # slow consumer: drop the backlog, the newest event is what matters
+            while not q.empty(): q.get_nowait()
+        q.put_nowait(msg)
+    print(f"[sse] change #{_last_event['id']} -> {len(_clients)} client(s): {', '.join(files[:6])}{' …' if len(files) > 6 else ''}")
+
+async def serve_gti(method, target, headers, writer):
+    """Custom-weight GTI curve; responses come from reweight.py's LRU, so repeats cost a lookup.
+    Malformed weights are a 400; a missing history/numpy a 503; anything else a 500 (logged)."""
+    q = parse_qs(urlsplit(target).query)
+    try:
+        weights = [float(x) for x in q["w"][0].split(",")] if "w" in q else None
+        import reweight
+        body, status = await asyncio.to_thread(reweight.score, weights), 200   # numpy on an LRU miss
+    except (ValueError, TypeError, KeyError, IndexError, ZeroDivisionError) as e:
+        body, status = f"bad weights: {e}".encode(), 400
+    except (ImportError, OSError) as e:
+        print(f"[api] /api/gti unavailable: {e!r}", file=sys.stderr)
+        body, status = b"GTI history unavailable", 503
+    except Exception as e:
+        print(f"[api] /api/gti failed for {target!r}: {e!r}", file=sys.stderr)
+        body, status = b"internal error", 500
+    h = {"Content-Type": "application/json" if status == 200 else "text/plain", "Content-Length": len(body),
+         "Cache-Control": "no-cache"}
+    writer.write(_head(REASONS[status], h) + (body if method == "GET" else b""))
+
+ROUTES = {"/events": serve_events, "/api/gti": serve_gti}
+
+def _scan():
+    """{relative data path: (mtime_ns, size)} for served JSON/CSV files under data/."""
+    out = {}
+    for dirpath, dirnames, filenames in os.walk(DATA_DIR):
+        if dirpath == DATA_DIR:
+            dirnames[:] = [d for d in dirnames if d not in WATCH_SKIP]
+        for fn in filenames:
+            if fn.endswith((".json", ".csv", ".svg")):
+                p = os.path.join(dirpath, fn)
+                try: st = os.stat(p)
+                except OSError: continue
+                out[os.path.relpath(p, ROOT).replace(os.sep, "/")] = (st.st_mtime_ns, st.st_size)
+    return out
+
+async def watch():
+    """Poll data/ mtimes; once changes stop for SETTLE_SECONDS, emit one event listing them."""
+    prev = await asyncio.to_thread(_scan)
+    pending, quiet_since = set(), None
+    while True:
+        await asyncio.sleep(POLL_SECONDS)
+        cur = await asyncio.to_thread(_scan)
+        diff = {k for k in cur.keys() | prev.keys() if cur.get(k) != prev.get(k)}
+        prev = cur
+        if diff:
+            pending |= diff; quiet_since = time.monotonic()
+        elif pending and time.monotonic() - quiet_since >= SETTLE_SECONDS:
+            broadcast(sorted(pending)); pending = set()
+
+async def handle(reader, writer):
+    try:
+        while True:
+            line = await asyncio.wait_for(reader.readline(), 60)
+            if not line: break
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                writer.write(_head(REASONS[400], {"Content-Length": 0, "Connection": "close"})); break
+            headers = {}
+            while True:
+                h = await asyncio.wait_for(reader.readline(), 30)
+                if h in (b"\r\n", b"\n", b""): break
+                k, _, v = h.decode("latin-1").partition(":")
+                headers[k.strip().lower()] = v.strip()
+            if method not in ("GET", "HEAD"):
+                writer.write(_head(REASONS[405], {"Allow": "GET, HEAD", "Content-Length": 0})); break
+            route = ROUTES.get(urlsplit(target).path, serve_file)
+            await route(method, target, headers, writer)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close" or version == "HTTP/1.0":
+                break
+    except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        try:
+            writer.close(); await writer.wait_closed()
+        except Exception:
+            pass
+
+def flag_value(argv, name, default):
+    return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else default
+
+async def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    host, port = flag_value(argv, "--host", "127.0.0.1"), int(flag_value(argv, "--port", "8000"))
+    server = await asyncio.start_server(handle, host, port, limit=16384, backlog=1024)
+    print(f"Serving {ROOT} on http://{host}:{port}/ (SSE at /events)")
+    async with server:
+        await asyncio.gather(server.serve_forever(), watch())
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
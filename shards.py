@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# shards.py — split the GTI output so nothing reads more than it needs:
+# - per-decade chunks + a small tail of the series, so the page can load a window;
+# - one history file per category (gti.json itself keeps only the lean core), fetched by the
+#   Details tab when it is opened; load() reassembles the full dict for the backfills/exports;
+# - summary.json: latest values, the last TAIL_YEARS rows and a sparkline series for updater.py.
+# Writes: data/gti/index.json, data/gti/tail.json, data/gti/<decade>s.json, data/gti/summary.json,
+#         data/gti/categories/<slug>.json
+# Files are only rewritten when their content changes, so closed decades stay byte-identical.
+import json, math, re, time, pathlib
+
+DATA = pathlib.Path("data")
+OUT = DATA / "gti"
+TAIL_YEARS = 20
+SUMMARY_YEARS = 30   # updater.py's status uses the last 30 rows
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+def _clean(rows):
+    """Replace NaN/inf with null so the shards are valid JSON for browsers."""
+    out = []
+    for r in rows:
+        out.append({k: (None if isinstance(v, float) and not math.isfinite(v) else v) for k, v in r.items()})
+    return out
+
+def _write_if_changed(path, blob):
+    text = json.dumps(blob, separators=(",", ":"))
+    if path.exists() and path.read_text() == text:
+        return False
+    path.write_text(text)
+    return True
+
+def write(gti, out=OUT, tail_years=TAIL_YEARS):
+    """Shard gti["series"] (and gti["bands"] if present) by decade; returns the index dict."""
+    series = _clean(sorted(gti.get("series") or [], key=lambda r: r["year"]))
+    if not series:
+        return None
+    bands = _clean(gti.get("bands") or [])
+    out.mkdir(parents=True, exist_ok=True)
+    first, last = int(series[0]["year"]), int(series[-1]["year"])
+    decades, changed = [], 0
+    for start in range(first - first % 10, last + 1, 10):
+        end = start + 9
+        rows = [r for r in series if start <= r["year"] <= end]
+        if not rows: continue
+        name = f"{start}s.json"
+        blob = {"start": start, "end": end, "series": rows, "bands": [b for b in bands if start <= b["year"] <= end]}
+        changed += _write_if_changed(out / name, blob)
+        decades.append({"start": start, "end": end, "file": name, "years": len(rows)})
+    t0 = last - tail_years + 1
+    tail = {"start": t0, "end": last, "series": [r for r in series if r["year"] >= t0],
+            "bands": [b for b in bands if b["year"] >= t0]}
+    changed += _write_if_changed(out / "tail.json", tail)
+    updated = gti.get("updated") or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    categories = []
+    if gti.get("by_category"):
+        (out / "categories").mkdir(exist_ok=True)
+        for name, hist in gti["by_category"].items():
+            rows = sorted((int(y), v) for y, v in hist.items())
+            vals = [None if v is None or not math.isfinite(v) else round(v, 4) for _, v in rows]
+            blob = {"category": name, "years": [y for y, _ in rows], "values": vals}
+            f = f"categories/{slug(name)}.json"
+            changed += _write_if_changed(out / f, blob)
+            lastv = next(((y, v) for (y, _), v in zip(reversed(rows), reversed(vals)) if v is not None), (None, None))
+            categories.append({"name": name, "file": f, "last_year": lastv[0], "last": lastv[1]})
+    elif (out / "index.json").exists():
+        categories = json.loads((out / "index.json").read_text()).get("categories") or []
+    summary = {"updated": updated, "baseline_version": gti.get("baseline_version"), "first_year": first, "last_year": last,
+               "series": series[-SUMMARY_YEARS:],
+               "spark": [{"year": r["year"], "gti": round(r["gti"], 2)} for r in series if r.get("gti") is not None],
+               "categories": categories}
+    changed += _write_if_changed(out / "summary.json", summary)
+    index = {"updated": updated,
+             "first_year": first, "last_year": last,
+             "tail": {"file": "tail.json", "start": t0, "end": last},
+             "decades": decades, "categories": [{"name": c["name"], "file": c["file"]} for c in categories]}
+    _write_if_changed(out / "index.json", index)
+    print(f"GTI shards: {len(decades)} decades + tail + {len(categories)} category files ({changed} file(s) changed) in {out}")
+    return index
+
+def core(gti):
+    """gti.json without the per-category history (which lives in data/gti/categories/), NaN as null."""
+    return {k: (_clean(v) if k in ("series", "bands") else v) for k, v in gti.items() if k != "by_category"}
+
+def read_categories(out=OUT):
+    """{category: {year: score}} from the per-category files."""
+    try:
+        index = json.loads((out / "index.json").read_text())
+    except Exception:
+        return {}
+    cats = {}
+    for c in index.get("categories") or []:
+        blob = json.loads((out / c["file"]).read_text())
+        cats[c["name"]] = {y: (float("nan") if v is None else v) for y, v in zip(blob["years"], blob["values"])}
+    return cats
+
+def load(data=DATA):
+    """The full pre-split gti dict (core + by_category); an older gti.json that still embeds it is returned as is."""
+    try:
+        gti = json.loads((data / "gti.json").read_text())
+    except Exception:
+        return None
+    if "by_category" not in gti:
+        gti["by_category"] = read_categories(data / "gti")
+    return gti
+
+if __name__ == "__main__":
+    gti = load()
+    write(gti)
+    (DATA / "gti.json").write_text(json.dumps(core(gti), indent=2))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Embedded SQLite time-series store for every live reading (WAL mode, safe for concurrent writers).
+- readings(source, metric, observed_at, fetched_at, value): one row per reading; the primary key is
+  the clustered index (WITHOUT ROWID), and readings_fetched covers "latest fetch per metric" lookups.
+  A re-fetch that returns the same value for the same observed_at is not stored again.
+- fetches(source, fetched_at, complete, missing): every fetch attempt, so staleness is queryable.
+- write() takes a batch in one transaction; history()/latest()/snapshot() are indexed range reads.
+data/live/*.json stay as derived views written alongside (lkg.py).
+DB: data/readings.sqlite
+Usage: python store.py [source [metric [start [end]]]]
+"""
+import json, os, sqlite3, sys, threading, time
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "readings.sqlite")
+ISO = "%Y-%m-%dT%H:%M:%SZ"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings(
+    source TEXT NOT NULL, metric TEXT NOT NULL, observed_at TEXT NOT NULL, fetched_at TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (source, metric, observed_at, fetched_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS readings_fetched ON readings(source, fetched_at, metric, observed_at, value);
+CREATE TABLE IF NOT EXISTS fetches(
+    source TEXT NOT NULL, fetched_at TEXT NOT NULL, complete INTEGER NOT NULL, missing TEXT,
+    PRIMARY KEY (source, fetched_at, complete)
+) WITHOUT ROWID;
+"""
+
+_local = threading.local()
+
+def connect(path=None, schema=SCHEMA):
+    """Per-thread WAL connection (sqlite3 connections must not be shared across threads)."""
+    path = path or DB_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    if path not in conns:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.executescript(schema)
+        conns[path] = conn
+    return conns[path]
+
+def now_iso():
+    return time.strftime(ISO, time.gmtime())
+
+def flatten(blob, prefix=""):
+    """Numeric leaves of a nested dict as {"a.b": value} (strings, bools and metadata skipped)."""
+    out = {}
+    for k, v in (blob or {}).items():
+        if str(k).startswith("_"): continue
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(flatten(v, key + "."))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool) and v == v:
+            out[key] = float(v)
+    return out
+
+def unflatten(flat):
+    out = {}
+    for key, v in flat.items():
+        node = out
+        *parents, leaf = key.split(".")
+        for p in parents: node = node.setdefault(p, {})
+        node[leaf] = v
+    return out
+
+def write(source, rows, fetched_at=None, path=None):
+    """Insert (metric, observed_at, value) rows in one transaction; returns the number stored."""
+    fetched_at = fetched_at or now_iso()
+    rows = [(source, m, str(t), fetched_at, None if v is None else float(v)) for m, t, v in rows]
+    if not rows: return 0
+    conn = connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        before = conn.total_changes
+        # skip readings identical to the latest stored value for the same (source, metric, observed_at)
+        conn.executemany("""
+            INSERT OR IGNORE INTO readings(source, metric, observed_at, fetched_at, value)
+            SELECT ?1, ?2, ?3, ?4, ?5 WHERE NOT EXISTS (
+                SELECT 1 FROM readings r WHERE r.source = ?1 AND r.metric = ?2 AND r.observed_at = ?3
+                  AND r.value IS ?5
+                  AND r.fetched_at = (SELECT max(fetched_at) FROM readings
+                                      WHERE source = ?1 AND metric = ?2 AND observed_at = ?3))""", rows)
+        stored = conn.total_changes - before
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return stored
+
+def write_snapshot(source, blob, complete=True, missing=(), fetched_at=None, path=None):
+    """A fetcher's summary values (nested dict) observed at fetch time, plus the attempt record."""
+    fetched_at = fetched_at or now_iso()
+    if complete:
+        write(source, [(m, fetched_at, v) for m, v in flatten(blob).items()], fetched_at, path)
+    connect(path).execute("INSERT OR REPLACE INTO fetches VALUES (?, ?, ?, ?)",
+                          (source, fetched_at, int(bool(complete)), ",".join(missing) or None))
+
+def snapshot(source, path=None):
+    """(nested dict of the latest complete fetch, its fetched_at, last attempt row) or (None, None, attempt)."""
+    conn = connect(path)
+    ok = conn.execute("SELECT max(fetched_at) FROM fetches WHERE source = ? AND complete = 1", (source,)).fetchone()[0]
+    last = conn.execute("SELECT fetched_at, complete, missing FROM fetches WHERE source = ? ORDER BY fetched_at DESC, complete LIMIT 1",
+                        (source,)).fetchone()
+    if not ok:
+        return None, None, last
+    rows = conn.execute("SELECT metric, value FROM readings WHERE source = ? AND fetched_at = ? AND observed_at = ?",
+                        (source, ok, ok)).fetchall()
+    return unflatten(dict(rows)), ok, last
+
+def history(source, metric, start=None, end=None, as_of=None, path=None):
+    """[(observed_at, value)] for start <= observed_at <= end, each at its newest vintage (<= as_of if given)."""
+    q = """SELECT observed_at, value FROM readings r WHERE source = ? AND metric = ? AND observed_at >= ? AND observed_at <= ?
+             AND fetched_at = (SELECT max(fetched_at) FROM readings WHERE source = r.source AND metric = r.metric
+                               AND observed_at = r.observed_at AND fetched_at <= ?)
+           ORDER BY observed_at"""
+    return connect(path).execute(q, (source, metric, str(start or ""), str(end or "￿"), as_of or "￿")).fetchall()
+
+def latest(source, path=None):
+    """{metric: (observed_at, value)} for the newest observation of every metric of a source."""
+    rows = connect(path).execute("""SELECT metric, max(observed_at), value FROM readings WHERE source = ?
+                                    GROUP BY metric""", (source,)).fetchall()
+    return {m: (t, v) for m, t, v in rows}
+
+def sources(path=None):
+    return [r[0] for r in connect(path).execute("SELECT DISTINCT source FROM fetches UNION SELECT DISTINCT source FROM readings")]
+
+def checkpoint(path=None):
+    """Fold the WAL back into the main file (before committing data/ to git)."""
+    connect(path).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+if __name__ == "__main__":
+    a = sys.argv[1:]
+    if not a:
+        for s in sources(): print(s, json.dumps(latest(s))[:200])
+    elif len(a) == 1:
+        print(json.dumps(snapshot(a[0])[0], indent=2))
+    else:
+        for t, v in history(a[0], a[1], *(a[2:4])): print(t, v)
@@ -0,0 +1,90 @@
+// sw.js — offline app shell + stale-while-revalidate data for AnthroMeter
+// - Shell (page, CSS, JS) and the pinned Plotly bundle are precached at install.
+// - ./data/*.json is answered from cache at once and revalidated in the background; when the
+//   network copy differs, the cache is updated and open pages get {type:'data-updated', path}.
+// - Cache keys drop the ?t= bust param so every cache-busted request maps to one entry.
+const VERSION = 'd375461a3e';  // = the ?v= on styles.css/script.js in index.html; updater.py stamps both from their content hash
+const SHELL_CACHE = `gti-shell-${VERSION}`;
+const DATA_CACHE  = 'gti-data-v1';
+const PLOTLY = 'https://cdn.plot.ly/plotly-2.35.2.min.js';
+const SHELL = ['./', './index.html', `./styles.css?v=${VERSION}`, `./script.js?v=${VERSION}`];
+
+self.addEventListener('install', (e)=>{
+  e.waitUntil((async()=>{
+    const c = await caches.open(SHELL_CACHE);
+    await c.addAll(SHELL);
+    // cross-origin: fetch in cors mode so the cached response is readable, not opaque
+    try{ await c.add(new Request(PLOTLY, {mode:'cors'})); }catch{}
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', (e)=>{
+  e.waitUntil((async()=>{
+    const keep = new Set([SHELL_CACHE, DATA_CACHE]);
+    for (const k of await caches.keys()) if (!keep.has(k)) await caches.delete(k);
+    await self.clients.claim();
+  })());
+});
+
+const dataKey = (url)=>{ const u=new URL(url); u.searchParams.delete('t'); return u.href; };
+const inflight = new Map();
+
+async function notify(path){
+  for (const c of await self.clients.matchAll({type:'window'})) c.postMessage({type:'data-updated', path});
+}
+
+// one background revalidation per file at a time; compares bodies so unchanged files stay silent
+function revalidate(key, path, hadCopy){
+  if (inflight.has(key)) return inflight.get(key);
+  const p = (async()=>{
+    const cache = await caches.open(DATA_CACHE);
+    const res = await fetch(key, {cache:'no-cache'});
+    if (!res.ok) return null;
+    const old = hadCopy ? await cache.match(key) : null;
+    const changed = !old || (await old.text()) !== (await res.clone().text());
+    if (changed) await cache.put(key, res.clone());
+    if (changed && hadCopy) notify(path);
+    return res;
+  })().catch(()=>null).finally(()=>inflight.delete(key));
+  inflight.set(key, p);
+  return p;
+}
+
+async function staleWhileRevalidate(e, url){
+  const key = dataKey(url.href);
+  const cached = await caches.match(key, {cacheName:DATA_CACHE});
+  const fresh = revalidate(key, url.pathname, !!cached);
+  if (cached){ e.waitUntil(fresh); return cached; }
+  const res = await fresh;
+  return res ? res.clone() : new Response('null', {status:504, headers:{'Content-Type':'application/json'}});
+}
+
+// shell: cache first (ignoring ?v= so an older precache still boots offline), refreshed in the background
+async function shellFirst(e, req){
+  const cache = await caches.open(SHELL_CACHE);
+  const hit = await cache.match(req) || await cache.match(req, {ignoreSearch:true}) ||
+              (req.mode === 'navigate' ? await cache.match('./index.html') : null);
+  const net = fetch(req).then(res=>{ if (res.ok) cache.put(req, res.clone()); return res; }).catch(()=>null);
+  if (hit){ e.waitUntil(net); return hit; }
+  return (await net) || Response.error();
+}
+
+self.addEventListener('fetch', (e)=>{
+  const req = e.request;
+  if (req.method !== 'GET') return;
+  const url = new URL(req.url);
+  if (url.href === PLOTLY){  // versioned URL: immutable, cache first
+    e.respondWith(caches.match(PLOTLY).then(hit=>hit || fetch(req)));
+    return;
+  }
+  if (url.origin !== self.location.origin) return;
+  const scope = new URL(self.registration.scope).pathname;
+  if (url.pathname.startsWith(scope + 'data/') && url.pathname.endsWith('.json')){
+    e.respondWith(staleWhileRevalidate(e, url));
+    return;
+  }
+  if (req.mode === 'navigate' || /\.(css|js|html)$/.test(url.pathname) || url.pathname === scope){
+    e.respondWith(shellFirst(e, req));
+  }
+});
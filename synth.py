@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Synthetic inputs at production scale, in the exact shapes the fetchers parse, laid out as a mirror
+directory for http_client (GTI_MIRROR=<dir>: <host>/<path>[@query] per URL).
+At scale 1: 250 entities × 125 years in every OWID grapher CSV, daily stooq bars and 15-minute GDELT
+timelines, 100k headlines over the RSS/Atom feeds the *_live scorers read, World Bank WDI pages and
+country metadata, NOAA Mauna Loa monthly/daily CSVs. Scale N multiplies what grows in production:
+entities (ISO3 codes first, OWID_* aggregates once the 17,576 three-letter codes run out), headlines
+and the density of the stooq/GDELT series; the NOAA and WDI World series keep their natural size.
+URLs come from the fetchers themselves (their constants, or their request code run against a
+recording stub), so a fetcher change cannot silently leave the generator behind.
+Writes: <out>/<host>/... and <out>/manifest.json ({url: {"key", "kind", "rows", "bytes"}})
+Usage: python synth.py OUT [--scale=N] [--seed=S]
+"""
+import datetime as dt, email.utils, itertools, json, os, string, sys, time
+import numpy as np
+import backfill_historical as bh
+import economic_live, entropy_live, fetch_conflict, fetch_employment, fetch_food, fetch_foodaccess, fetch_markets
+import fetch_planetary, fetch_sentiment, headlines, health_live, http_client, peace_live, planetary_live, sentiment_live, worldbank
+
+ENTITIES = 250
+YEARS = (1900, 2024)
+HEADLINES = 100_000
+FIRST_DAY = dt.datetime(1900, 1, 1)
+REGIONS = ["East Asia & Pacific", "Europe & Central Asia", "Latin America & Caribbean", "Middle East & North Africa",
+           "North America", "South Asia", "Sub-Saharan Africa"]
+INCOMES = ["Low income", "Lower middle income", "Upper middle income", "High income"]
+# OWID grapher value column per file (what each consumer's hint / column scan picks up)
+OWID_COLUMNS = {
+    "co2": "Annual CO2 emissions", "temp": "Global average temperature anomaly relative to 1961-1990",
+    "gdp_pc": "GDP per capita", "lifeexp": "Period life expectancy at birth", "vdem": "Liberal democracy index",
+    "internet": "Share of the population using the Internet", "energyint": "Primary energy consumption per GDP (kWh/$)",
+    "battle": "Deaths in state-based conflicts per 100,000", "population": "Population (historical)",
+}
+FILLER = """government report market city talks minister plan record week people season study court official
+leaders global new says after over amid early final local region national data growth rates energy water
+school health climate vote trade tech film music sport team league cup border coast summit""".split()
+
+class _Captured(Exception):
+    pass
+
+def requested_urls(fn, *args, **kw):
+    """URLs fn asks http_client for (the request is stopped before any network access)."""
+    seen, real = [], http_client.get
+    def stub(url, *a, **k):
+        seen.append(url)
+        raise _Captured(url)
+    http_client.get = stub
+    try:
+        fn(*args, **kw)
+    except Exception:
+        pass
+    finally:
+        http_client.get = real
+    return seen
+
+def _codes(n):
+    """n entity codes: ISO3-shaped first, then OWID_* aggregates."""
+    iso = ("".join(t) for t in itertools.product(string.ascii_uppercase, repeat=3))
+    out = [c for c, _ in zip(iso, range(min(n, 26 ** 3)))]
+    return out + [f"OWID_X{i:05d}" for i in range(n - len(out))]
+
+class Mirror:
+    def __init__(self, out):
+        self.out, self.manifest = out, {}
+
+    def put(self, url, body, kind, rows):
+        key = http_client.mirror_key(url)
+        path = os.path.join(self.out, *key.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f: f.write(body)
+        self.manifest[url] = {"key": key, "kind": kind, "rows": int(rows), "bytes": len(body)}
+
+    def save(self):
+        with open(os.path.join(self.out, "manifest.json"), "w") as f: json.dump(self.manifest, f, indent=1)
+
+def _csv(header, cols, fmt):
+    """Fast CSV: columns (equal-length sequences) formatted row by row with one %-template."""
+    lines = [header] + [fmt % r for r in zip(*cols)]
+    return ("\n".join(lines) + "\n").encode()
+
+def owid(m, rng, codes, names):
+    years = np.arange(YEARS[0], YEARS[1] + 1)
+    for key, urls in bh.CANDIDATES.items():
+        col = OWID_COLUMNS.get(key, key)
+        ents = [("World", "OWID_WRL"), ("Northern Hemisphere", ""), ("Southern Hemisphere", "")] if key == "temp" else \
+               [("World", "OWID_WRL"), ("Europe", ""), ("High-income countries", "OWID_HIC")] + list(zip(names, codes))
+        E, T = len(ents), len(years)
+        if key == "temp":                                     # °C anomaly: warming trend, small noise
+            vals = -0.3 + 0.01 * (years - years[0])[None, :] + rng.normal(0, 0.1, (E, T))
+        else:
+            level = rng.uniform(1, 100, E)[:, None] * (1 + 0.01 * (years - years[0]))[None, :]
+            vals = level + rng.normal(0, 1, (E, T)).cumsum(axis=1)
+        gap = rng.random((E, T)) < 0.05                        # ~5% missing country-years, dropped like OWID does
+        gap[0] = False
+        e_idx, t_idx = np.nonzero(~gap)
+        cols = ([ents[e][0] for e in e_idx], [ents[e][1] for e in e_idx], years[t_idx].tolist(), vals[e_idx, t_idx].round(4).tolist())
+        body = _csv(f'Entity,Code,Year,"{col}"', cols, '"%s",%s,%d,%s')
+        m.put(urls[0], body, "owid", e_idx.size)          # temp: also fetch_planetary.OWID_TEMP[0]
+    for url, col in ((fetch_employment.URLS[0], "Unemployment, total (% of total labor force)"),
+                     (fetch_foodaccess.URLS[0], "Prevalence of undernourishment (% of population)")):
+        E = len(codes) + 1
+        e_idx, t_idx = np.nonzero(np.ones((E, len(years)), dtype=bool))
+        ents = [("World", "OWID_WRL")] + list(zip(names, codes))
+        vals = rng.uniform(2, 30, (E, len(years)))
+        m.put(url, _csv(f'Entity,Code,Year,"{col}"', ([ents[e][0] for e in e_idx], [ents[e][1] for e in e_idx],
+                                                        years[t_idx].tolist(), vals[e_idx, t_idx].round(3).tolist()), '"%s",%s,%d,%s'),
+              "owid", e_idx.size)
+    m.put(fetch_food.SOURCES[0], _csv("Year,food_price_index", (years.tolist(), (60 + rng.normal(0, 2, len(years)).cumsum()).round(2).tolist()),
+                                      "%d,%s"), "owid", len(years))
+    m.put(fetch_planetary.OWID_CO2[0], _csv('Entity,Code,Year,"Monthly concentration of atmospheric carbon dioxide (ppm)"',
+                                            (["World"] * len(years), ["OWID_WRL"] * len(years), years.tolist(),
+                                             np.linspace(296, 424, len(years)).round(2).tolist()), '"%s",%s,%d,%s'), "owid", len(years))
+
+def noaa(m, rng):
+    months = [(y, mo) for y in range(YEARS[0], YEARS[1] + 1) for mo in range(1, 13)]
+    ppm = np.linspace(296, 424, len(months)) + 3 * np.sin(np.arange(len(months)) / 12 * 2 * np.pi)
+    head = "# synthetic Mauna Loa monthly means\nyear,month,decimal date,average,deseasonalized,ndays,sdev,unc"
+    m.put(fetch_planetary.NOAA_CO2, _csv(head, ([y for y, _ in months], [mo for _, mo in months], [y + (mo - 0.5) / 12 for y, mo in months],
+                                                ppm.round(2).tolist(), ppm.round(2).tolist()), "%d,%d,%.4f,%s,%s,-1,-9.99,-0.99"),
+          "noaa", len(months))
+    days = (dt.datetime(YEARS[1], 12, 31) - FIRST_DAY).days + 1
+    d = [FIRST_DAY + dt.timedelta(days=i) for i in range(days)]
+    trend = np.linspace(296, 424, days)
+    m.put(planetary_live.NOAA_CSV, _csv("# synthetic daily trend\nyear,month,day,decimal,smoothed,trend",
+                                        ([x.year for x in d], [x.month for x in d], [x.day for x in d], np.linspace(YEARS[0], YEARS[1] + 1, days).tolist(),
+                                         trend.round(2).tolist(), trend.round(2).tolist()), "%d,%d,%d,%.4f,%s,%s"), "noaa", days)
+
+def _stamps(n, start, step):
+    return [start + step * i for i in range(n)]
+
+def stooq(m, rng, scale):
+    n = ((dt.datetime(YEARS[1], 12, 31) - FIRST_DAY).days + 1) * scale
+    t = _stamps(n, FIRST_DAY, dt.timedelta(days=1) / scale)
+    fmt = "%Y-%m-%d" if scale == 1 else "%Y-%m-%d %H:%M:%S"
+    stamps = [x.strftime(fmt) for x in t]
+    for syms, base in ((fetch_markets.ACWI_SYMS, 100.0), (fetch_markets.VIX_SYMS, 18.0), (fetch_markets.BRENT_SYMS, 70.0)):
+        close = base * np.exp(rng.normal(0, 0.01 / np.sqrt(scale), n).cumsum() * 0.2)
+        for url in requested_urls(fetch_markets.fetch_df, syms[0], tries=1):
+            m.put(url, _csv("Date,Open,High,Low,Close,Volume", (stamps, close.round(4).tolist(), (close * 1.01).round(4).tolist(),
+                                                                 (close * 0.99).round(4).tolist(), close.round(4).tolist(), rng.integers(1e5, 1e7, n).tolist()),
+                            "%s,%s,%s,%s,%s,%d"), "stooq", n)
+
+def gdelt(m, rng, scale):
+    now = dt.datetime.utcnow().replace(second=0, microsecond=0)
+    def timeline(days):
+        n = days * 96 * scale
+        step = dt.timedelta(minutes=15) / scale
+        return [(now - step * (n - i)).strftime("%Y%m%dT%H%M%SZ") for i in range(n)], n
+    stamps, n = timeline(30)
+    tone = (-1.5 + rng.normal(0, 0.3, n)).round(4).tolist()
+    csv_url, json_url = requested_urls(fetch_sentiment.tones_csv)[0], requested_urls(fetch_sentiment.tones_json_fallback)[0]
+    m.put(csv_url, _csv("Date,Value", (stamps, tone), "%s,%s"), "gdelt", n)
+    m.put(json_url, json.dumps({"timeline": [{"date": d, "value": v} for d, v in zip(stamps, tone)]}).encode(), "gdelt", n)
+    stamps, n = timeline(60)
+    for q in fetch_conflict.QUERIES:
+        vol = np.abs(0.5 + rng.normal(0, 0.05, n)).round(5).tolist()
+        for url in requested_urls(fetch_conflict.fetch_series, q):
+            m.put(url, json.dumps({"query_details": {"title": q}, "timeline": [{"date": d, "value": v} for d, v in zip(stamps, vol)]}).encode(),
+                  "gdelt", n)
+
+def world_bank(m, rng, codes, names):
+    wdi = list(economic_live.CODES.values())
+    years = list(range(1960, YEARS[1] + 1))
+    rows = [{"indicator": {"id": c, "value": c}, "country": {"id": "1W", "value": "World"}, "countryiso3code": "WLD",
+             "date": str(y), "value": round(float(v), 3), "unit": "", "obs_status": "", "decimal": 1}
+            for c in wdi for y, v in zip(reversed(years), rng.uniform(1, 8, len(years)))]
+    meta = {"page": 1, "pages": 1, "per_page": worldbank.PER_PAGE, "total": len(rows), "sourceid": "2", "lastupdated": "2025-07-01"}
+    for url in requested_urls(worldbank.fetch_batch, wdi):
+        m.put(url, json.dumps([meta, rows]).encode(), "worldbank", len(rows))
+    for url in requested_urls(worldbank._get, "WLD", [wdi[0]], per_page=1, extra="&mrv=1"):
+        m.put(url, json.dumps([{**meta, "per_page": 1, "pages": len(years)}, rows[:1]]).encode(), "worldbank", 1)
+    iso = [(c, n) for c, n in zip(codes, names) if not c.startswith("OWID_")]
+    countries = [{"id": c, "iso2Code": c[:2], "name": n, "region": {"id": "", "value": REGIONS[i % len(REGIONS)]},
+                  "incomeLevel": {"id": "", "value": INCOMES[(i // 7) % len(INCOMES)]}} for i, (c, n) in enumerate(iso)]
+    countries += [{"id": "WLD", "name": "World", "region": {"id": "NA", "value": "Aggregates"}, "incomeLevel": {"id": "NA", "value": "Aggregates"}}]
+    m.put(worldbank.COUNTRIES_API, json.dumps([{"page": 1, "pages": 1, "per_page": 400, "total": len(countries)}, countries]).encode(),
+          "worldbank", len(countries))
+
+def rss(m, rng, scale):
+    lexicon = sorted(entropy_live.RISK | peace_live.VIOLENCE | health_live.SEVERITY | sentiment_live.POS | sentiment_live.NEG)
+    feeds = headlines.FEEDS
+    total = HEADLINES * scale
+    now = time.time()
+    for f, url in enumerate(feeds):
+        n = total // len(feeds) + (f < total % len(feeds))
+        words = rng.integers(0, len(FILLER), (n, 6))
+        hits = rng.random(n) < 0.3                                 # ~30% of titles carry a scorer word
+        lex = rng.integers(0, len(lexicon), n)
+        ages = np.sort(rng.uniform(0, 30 * 86400, n))
+        titles = [" ".join([FILLER[w] for w in ws[:5]] + ([lexicon[l]] if h else []) + [f"#{f}-{i}"]).capitalize()
+                  for i, (ws, h, l) in enumerate(zip(words.tolist(), hits.tolist(), lex.tolist()))]
+        if "who.int" in url:   # one Atom feed, so the Atom path is exercised too
+            entries = "".join(f"<entry><title>{t}</title><published>{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(now - a))}</published></entry>"
+                              for t, a in zip(titles, ages.tolist()))
+            body = f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom"><title>synthetic</title>{entries}</feed>'
+        else:
+            items = "".join(f"<item><title>{t}</title><pubDate>{email.utils.formatdate(now - a, usegmt=True)}</pubDate></item>"
+                            for t, a in zip(titles, ages.tolist()))
+            body = f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>synthetic</title>{items}</channel></rss>'
+        m.put(url, body.encode(), "rss", n)
+
+def generate(out, scale=1, seed=0):
+    """Write the mirror for one scale; returns the manifest."""
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    m = Mirror(out)
+    codes = _codes(ENTITIES * scale)
+    names = [f"Country {c}" for c in codes]
+    owid(m, rng, codes, names)
+    noaa(m, rng)
+    stooq(m, rng, scale)
+    gdelt(m, rng, scale)
+    world_bank(m, rng, codes, names)
+    rss(m, rng, scale)
+    m.save()
+    size = sum(v["bytes"] for v in m.manifest.values())
+    print(f"synth x{scale}: {len(m.manifest)} files, {sum(v['rows'] for v in m.manifest.values())} rows, "
+          f"{size / 1e6:.1f} MB in {time.perf_counter() - t0:.1f}s -> {out}")
+    return m.manifest
+
+if __name__ == "__main__":
+    a = sys.argv[1:]
+    if not a:
+        raise SystemExit(__doc__)
+    generate(a[0], int(bh.flag_value(a, "--scale") or 1), int(bh.flag_value(a, "--seed") or 0))
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import asof
+
+@pytest.fixture(autouse=True)
+def series_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(asof, "SERIES_DIR", str(tmp_path / "series"))
+    monkeypatch.setattr(asof, "STATE_PATH", str(tmp_path / "series" / "_state.json"))
+    monkeypatch.setattr(asof, "OUTPUTS", {f: str(tmp_path / f"gti_{f}.json") for f in asof.OUTPUTS})
+    monkeypatch.setattr(asof.store, "write", lambda *a, **k: None)   # keep data/readings.sqlite out of it
+    return tmp_path
+
+def D(*days):
+    return np.array(days, dtype="datetime64[D]")
+
+def test_asof_takes_last_observation_within_staleness():
+    t, v = D("2024-01-01", "2024-01-10"), np.array([1.0, 2.0])
+    out = asof.asof(D("2023-12-31", "2024-01-01", "2024-01-09", "2024-01-10", "2024-01-20", "2024-01-21"), t, v, 10)
+    np.testing.assert_array_equal(out, [np.nan, 1, 1, 2, 2, np.nan])
+
+def test_calendar_month_ends_are_capped_at_end():
+    cal = asof.calendar("M", "2024-01-01", "2024-03-15")
+    assert [str(d) for d in cal] == ["2024-01-31", "2024-02-29", "2024-03-15"]
+
+def test_day_accepts_gdelt_and_iso_stamps():
+    assert asof.day("20240105T120000Z") == "2024-01-05"
+    assert asof.day("2024-01-05 12:00") == "2024-01-05"
+
+def test_record_merges_sorted_and_keeps_last_duplicate():
+    assert asof.record("vix", [("2024-01-03", 3), ("2024-01-01", 1), ("2024-01-01", 1.5)]) == "2024-01-01"
+    t, v = asof.load("vix")
+    assert [str(x) for x in t] == ["2024-01-01", "2024-01-03"]
+    np.testing.assert_array_equal(v, [1.5, 3])
+
+def test_record_reports_only_real_changes():
+    asof.record("vix", [("2024-01-01", 1), ("2024-01-02", 2)])
+    assert asof.record("vix", [("2024-01-02", 2)]) is None            # same value again
+    assert asof.record("vix", [("2024-01-02", 2.5)]) == "2024-01-02"  # revision
+    assert asof.record("vix", [("2024-01-05", 5)]) == "2024-01-05"    # append
+    t, v = asof.load("vix")
+    np.testing.assert_array_equal(v, [1, 2.5, 5])
+    state = asof._read_state()["vix"]
+    assert state["dirty_from"] == "2024-01-01" and state["n"] == 3
+
+def test_record_skips_missing_values():
+    assert asof.record("vix", [("2024-01-01", None), ("2024-01-02", float("nan"))]) is None
+
+def test_incremental_compute_matches_full(series_dir):
+    start = "2024-01-01"
+    asof.record("vix", [(f"2024-01-{d:02d}", 10 + d) for d in range(1, 20)])
+    asof.record("gdelt_tone", [(f"2024-01-{d:02d}", d % 5 - 2) for d in range(1, 20)])
+    asof.compute("D", start=start, full=True)
+    asof.clear_dirty({k: s.get("rev") for k, s in asof._read_state().items()})
+    asof.record("vix", [("2024-01-15", 40), ("2024-01-25", 12)])       # revision + new day
+    inc = asof.compute("D", start=start)
+    full = asof.compute("D", start=start, full=True)
+    assert inc["dates"] == full["dates"]
+    assert inc["gti"] == full["gti"]
+    assert inc["by_category"] == full["by_category"]
+
+def test_clear_dirty_keeps_marks_recorded_during_compute(monkeypatch):
+    asof.record("vix", [("2024-01-02", 20)])
+    real = asof.compute
+    def compute(freq, **kw):
+        out = real(freq, **kw)
+        if freq == "M":
+            asof.record("vix", [("2024-01-03", 21)])   # an lkg.refresh thread, mid-compute
+        return out
+    monkeypatch.setattr(asof, "compute", compute)
+    asof.compute_all()
+    assert asof._read_state()["vix"].get("dirty_from") == "2024-01-02"
+    monkeypatch.setattr(asof, "compute", real)
+    asof.compute_all()
+    assert "dirty_from" not in asof._read_state()["vix"]
+
+def test_record_annual_keeps_the_gti_stamp():
+    asof.record_annual({"Public Health": {"2020": 60, 2021: 61}, "Unknown": {"2020": 1}}, "2025-01-01T00:00:00Z")
+    t, v = asof.load("annual:Public Health")
+    assert [str(x) for x in t] == ["2020-12-31", "2021-12-31"]
+    assert asof.annual_updated() == "2025-01-01T00:00:00Z"
+    assert not asof.load("annual:Unknown")[0].size
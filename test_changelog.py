@@ -0,0 +1,59 @@
+import json
+import pytest
+import changelog
+
+@pytest.fixture(autouse=True)
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(changelog, "DIR", tmp_path / "changelog")
+    monkeypatch.setattr(changelog, "LEGACY", tmp_path / "changelog.json")
+    return tmp_path / "changelog"
+
+def read(p):
+    return json.loads(p.read_text())
+
+def test_collapse_merges_consecutive_identical_entries():
+    runs = changelog.collapse([{"date": "2024-01-01", "change": "a"}, {"date": "2024-01-02", "change": "a"},
+                               {"date": "2024-01-03", "change": "b"}, {"date": "2024-01-04", "change": "a"}])
+    assert runs == [{"date": "2024-01-01", "date_last": "2024-01-02", "change": "a", "count": 2},
+                    {"date": "2024-01-03", "date_last": "2024-01-03", "change": "b", "count": 1},
+                    {"date": "2024-01-04", "date_last": "2024-01-04", "change": "a", "count": 1}]
+
+def test_collapse_is_idempotent_on_runs():
+    runs = changelog.collapse([{"date": "d1", "change": "a"}, {"date": "d2", "change": "a"}])
+    assert changelog.collapse(runs + [{"date": "d3", "change": "a"}]) == [
+        {"date": "d1", "date_last": "d3", "change": "a", "count": 3}]
+
+def test_month_rollover_compacts_the_previous_month(log_dir):
+    for d in range(1, 4):
+        changelog.append("same", f"2024-01-0{d} 00:00:00 UTC")
+    changelog.append("other", "2024-01-09 00:00:00 UTC")
+    changelog.append("new month", "2024-02-01 00:00:00 UTC")
+    seg = read(log_dir / "2024-01.json")
+    assert [(r["change"], r["count"]) for r in seg["entries"]] == [("same", 3), ("other", 1)]
+    log = [json.loads(l) for l in (log_dir / "log.jsonl").read_text().splitlines()]
+    assert log == [{"date": "2024-02-01 00:00:00 UTC", "change": "new month"}]
+    index = read(log_dir / "index.json")
+    assert index["segments"] == [{"month": "2024-01", "file": "2024-01.json", "runs": 2, "entries": 4,
+                                  "first": "2024-01-01 00:00:00 UTC", "last": "2024-01-09 00:00:00 UTC"}]
+
+def test_late_entries_merge_into_an_existing_segment(log_dir):
+    changelog.append("a", "2024-01-01 00:00:00 UTC")
+    changelog.append("b", "2024-02-01 00:00:00 UTC")
+    with open(log_dir / "log.jsonl", "a") as f:
+        f.write(json.dumps({"date": "2024-01-31 00:00:00 UTC", "change": "late"}) + "\n")
+    assert changelog.compact("2024-02") == 1
+    assert [r["change"] for r in read(log_dir / "2024-01.json")["entries"]] == ["a", "late"]
+
+def test_head_is_bounded(log_dir, monkeypatch):
+    monkeypatch.setattr(changelog, "HEAD_N", 3)
+    for i in range(10):
+        changelog.append(f"change {i}", f"2024-01-01 00:00:{i:02d} UTC")
+    assert [e["change"] for e in read(log_dir / "head.json")["entries"]] == ["change 7", "change 8", "change 9"]
+
+def test_migrate_imports_and_removes_the_legacy_file(log_dir):
+    changelog.LEGACY.write_text(json.dumps({"entries": [{"date": "2023-12-01", "change": "x"},
+                                                        {"date": "2099-01-01", "change": "y"}]}))
+    assert changelog.migrate() == 2
+    assert not changelog.LEGACY.exists()
+    assert [r["change"] for r in read(log_dir / "2023-12.json")["entries"]] == ["x"]
+    assert [json.loads(l)["change"] for l in (log_dir / "log.jsonl").read_text().splitlines()] == ["y"]
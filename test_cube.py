@@ -0,0 +1,55 @@
+import json
+import numpy as np
+import pytest
+import cube
+
+LAYERS = ["Public Health", "GTI"]
+YEARS = [2000, 2001, 2002]
+
+def values(fill, n=2):
+    v = np.arange(n * len(YEARS) * len(LAYERS), dtype="float32").reshape(n, len(YEARS), len(LAYERS)) + fill
+    v[0, 0, 0] = np.nan
+    return v
+
+def write(path, fill, n=2):
+    codes = ["AAA", "BBB", "CCC"][:n]
+    return cube.write(codes, codes, YEARS, LAYERS, values(fill, n), baseline_version=1, out=str(path))
+
+def bodies(path):
+    return sorted(p.name for p in path.glob("*.f32"))
+
+def test_query_slices_entities_layers_and_periods(tmp_path):
+    write(tmp_path, 0)
+    periods, v = cube.query(["BBB", "AAA"], ["GTI"], 2001, 2002, path=str(tmp_path))
+    assert periods.tolist() == [2001, 2002]
+    np.testing.assert_array_equal(v[:, :, 0], values(0)[[1, 0], 1:, 1])
+    assert not v.flags.writeable
+    assert cube.series("AAA", "Public Health", path=str(tmp_path)) == {2001: 2.0, 2002: 4.0}   # NaN skipped
+    with pytest.raises(KeyError):
+        cube.query("ZZZ", path=str(tmp_path))
+
+def test_header_names_its_own_body(tmp_path):
+    h = write(tmp_path, 0)
+    assert json.loads((tmp_path / cube.HEADER).read_text())["body"] == h["body"]
+    assert bodies(tmp_path) == [h["body"]]
+    assert write(tmp_path, 0)["body"] == h["body"]   # same values, same body name
+
+def test_rewrite_switches_readers_and_keeps_one_previous_body(tmp_path):
+    h1 = write(tmp_path, 0)
+    old_header = cube.header(str(tmp_path))                       # a reader mid-read holds this header
+    h2 = write(tmp_path, 100, n=3)
+    assert bodies(tmp_path) == sorted([h1["body"], h2["body"]])
+    old = np.fromfile(tmp_path / old_header["body"], dtype="float32").reshape(old_header["shape"])
+    np.testing.assert_array_equal(old, values(0))                # its body is still intact
+    periods, v = cube.query("CCC", "GTI", path=str(tmp_path))     # the query sees the new cube, not cached slices
+    np.testing.assert_array_equal(v[0, :, 0], values(100, 3)[2, :, 1])
+    h3 = write(tmp_path, 200)
+    assert bodies(tmp_path) == sorted([h2["body"], h3["body"]])   # bodies older than the previous one are removed
+
+def test_legacy_header_without_body_reads_cube_f32(tmp_path):
+    h = write(tmp_path, 0)
+    (tmp_path / h["body"]).rename(tmp_path / cube.BODY)
+    legacy = {k: v for k, v in h.items() if k != "body"}
+    (tmp_path / cube.HEADER).write_text(json.dumps(legacy))
+    _, v = cube.query("BBB", path=str(tmp_path))
+    np.testing.assert_array_equal(v[0], values(0)[1])
@@ -0,0 +1,31 @@
+import json
+import pytest
+import reweight
+
+@pytest.fixture(autouse=True)
+def history(monkeypatch):
+    by_cat = {"A": {"2000": 40, "2001": 50, "2002": 60}, "B": {"2000": 80, "2001": None, "2002": 20}}
+    monkeypatch.setattr(reweight.shards, "load", lambda data=None: {"by_category": by_cat})
+    monkeypatch.setattr(reweight, "_hist", {"stamp": None})
+    monkeypatch.setattr(reweight, "_cache", reweight.OrderedDict())
+    monkeypatch.setattr(reweight, "_cache_bytes", 0)
+
+def test_equal_weights_need_every_category_like_the_official_series():
+    r = json.loads(reweight.score())
+    assert r["order"] == ["A", "B"] and r["year0"] == 2000
+    assert r["gti"] == [60.0, None, 40.0]
+    assert r["coverage"] == [1.0, 0.5, 1.0]
+
+def test_zero_weight_categories_do_not_null_a_year():
+    r = json.loads(reweight.score([1, 0]))
+    assert r["gti"] == [40.0, 50.0, 60.0]
+
+def test_weights_are_quantized_and_cached():
+    assert reweight.score([1, 3]) is reweight.score([2, 6])
+    assert json.loads(reweight.score([1, 3]))["weights"] == [0.25, 0.75]
+    assert reweight.stats()["entries"] == 1
+
+def test_bad_weights_raise_value_error():
+    for w in ([1], [-1, 0], [float("nan"), 1]):
+        with pytest.raises(ValueError):
+            reweight.score(w)
@@ -0,0 +1,65 @@
+import json
+import numpy as np
+import pytest
+import rollups
+
+def naive(X, W, groups, codes):
+    """Reference: Σ m·w·x / Σ m·w per group, year and layer, one loop at a time."""
+    pos = {c: i for i, c in enumerate(codes)}
+    G, (E, T, L) = len(groups), X.shape
+    out = np.full((G, T, L), np.nan)
+    for g, members in enumerate(groups.values()):
+        for t in range(T):
+            for l in range(L):
+                num = den = 0.0
+                for c, m in members.items():
+                    x, w = X[pos[c], t, l], W[pos[c], t]
+                    if np.isfinite(x) and np.isfinite(w) and w > 0:
+                        num += m * w * x; den += m * w
+                if den > 0: out[g, t, l] = num / den
+    return out
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(7)
+    codes = [f"C{i:02d}" for i in range(12)]
+    X = rng.uniform(0, 100, (12, 6, 3))
+    X[rng.random(X.shape) < 0.2] = np.nan
+    W = rng.uniform(1, 50, (12, 6))
+    W[0] = np.nan; W[1, :3] = 0
+    groups = {"a": {c: 1.0 for c in codes[:5]}, "empty": {}, "b": {"C03": 0.5, "C07": 1.0, "C11": 2.0},
+              "all": {c: 1.0 for c in codes}, "one": {"C00": 1.0}}
+    return codes, X, W, groups
+
+@pytest.mark.parametrize("block", [1, 40, rollups.BLOCK])
+def test_aggregate_matches_the_naive_weighted_mean(panel, monkeypatch, block):
+    codes, X, W, groups = panel
+    monkeypatch.setattr(rollups, "BLOCK", block)   # 1: one group per reduceat call
+    got = rollups.aggregate(X, W, *rollups.membership(codes, groups))
+    np.testing.assert_allclose(got, naive(X, W, groups, codes))
+
+def test_membership_is_csr_in_group_order(panel):
+    codes, _, _, groups = panel
+    indptr, indices, data = rollups.membership(codes, groups)
+    assert indptr.tolist() == [0, 5, 5, 8, 20, 21]
+    assert indices[5:8].tolist() == [3, 7, 11] and data[5:8].tolist() == [0.5, 1.0, 2.0]
+
+def test_weights_gdp_is_population_times_gdp_per_capita():
+    pop, gdp = np.array([[2.0]]), np.array([[3.0]])
+    assert rollups.weights(pop, gdp, "gdp")[0, 0] == 6.0
+    assert rollups.weights(pop, gdp)[0, 0] == 2.0
+
+def test_write_recomputes_only_groups_with_a_changed_member(tmp_path, monkeypatch):
+    codes = ["AAA", "BBB", "CCC"]
+    monkeypatch.setattr(rollups, "groups", lambda c: {"x": {"AAA": 1.0, "BBB": 1.0}, "y": {"CCC": 1.0}})
+    X = np.arange(3 * 2 * 2, dtype="float64").reshape(3, 2, 2)
+    pop = np.ones((3, 2))
+    out = str(tmp_path)
+    rollups.write(codes, [2000, 2001], ["Cat", "GTI"], X, pop, out=out)
+    x = json.loads((tmp_path / "x.json").read_text())
+    assert x["series"] == [{"year": 2000, "gti": 3.0}, {"year": 2001, "gti": 5.0}]
+    mtimes = {n: (tmp_path / f"{n}.json").stat().st_mtime_ns for n in "xy"}
+    X[2, 0, 1] = 100.0
+    rollups.write(codes, [2000, 2001], ["Cat", "GTI"], X, pop, out=out)
+    assert (tmp_path / "x.json").stat().st_mtime_ns == mtimes["x"]
+    assert json.loads((tmp_path / "y.json").read_text())["series"][0]["gti"] == 100.0
@@ -0,0 +1,51 @@
+import json
+import numpy as np
+import pytest
+import scoring
+
+def _normalize(tmp_path, spec):
+    p = tmp_path / "normalize.json"
+    p.write_text(json.dumps({"Cat": spec}))
+    return str(p)
+
+@pytest.fixture
+def curves(tmp_path, monkeypatch):
+    path = _normalize(tmp_path, {
+        "down": {"clamp": [0, 100], "curve": {"x": [10, 40], "y": [100, 10]}},
+        "peak": {"clamp": [20, 100], "curve": {"x": [-4, 0, 2, 20], "y": [0, 95, 100, 10]}},
+        "plain": {"source": "no curve"},
+    })
+    parsed = scoring.curves.__wrapped__(path)
+    monkeypatch.setattr(scoring, "curves", lambda: parsed)
+    return path
+
+def test_curves_skips_entries_without_a_curve(curves):
+    assert sorted(scoring.curves()) == ["down", "peak"]
+
+def test_curves_rejects_non_increasing_knots(tmp_path):
+    path = _normalize(tmp_path, {"bad": {"curve": {"x": [1, 1], "y": [0, 100]}}})
+    with pytest.raises(ValueError):
+        scoring.curves.__wrapped__(path)
+
+def test_apply_interpolates_and_is_flat_beyond_the_end_knots(curves):
+    out = scoring.apply("down", [0, 10, 25, 40, 100])
+    np.testing.assert_allclose(out, [100, 100, 55, 10, 10])
+
+def test_apply_clamps_and_keeps_nan(curves):
+    out = scoring.apply("peak", [-10, 1, np.nan])
+    np.testing.assert_allclose(out, [20, 97.5, np.nan])
+
+def test_apply_matrix_scores_each_column_through_its_curve(curves):
+    X = np.array([[25.0, 2.0], [40.0, 20.0]])
+    np.testing.assert_allclose(scoring.apply_matrix(["down", "peak"], X), [[55, 100], [10, 20]])
+
+def test_score_scalar(curves):
+    assert scoring.score("down", None) is None
+    assert scoring.score("down", float("nan")) is None
+    assert scoring.score("down", 25) == pytest.approx(55)
+
+def test_configured_curves_stay_in_0_100():
+    for name, (x, y, lo, hi) in scoring.curves().items():
+        xs = np.linspace(x[0] - 10 * abs(x[0] or 1), x[-1] + 10 * abs(x[-1] or 1), 101)
+        out = scoring.apply(name, xs)
+        assert np.all((out >= 0) & (out <= 100)), name
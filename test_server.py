@@ -0,0 +1,59 @@
+import os
+import pytest
+import server
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    for rel in ["index.html", "styles.css", "script.js", "sw.js", "server.py", "README.md", "REVIEW_DIFF.patch",
+                ".env", "data/gti.json", "data/gti/index.json", "data/live/food.json", "data/readings.sqlite",
+                "data/readings.sqlite-wal", "data/cache/worldbank/x.json", "data/vintages/index.sqlite",
+                "data/vintages/packs/a.pack", "data/.hidden.json", ".git/config"]:
+        p = tmp_path / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_text(rel)
+    (tmp_path / "data" / "escape.json").symlink_to(tmp_path / "server.py")
+    monkeypatch.setattr(server, "ROOT", str(tmp_path))
+    monkeypatch.setattr(server, "DATA_DIR", str(tmp_path / "data"))
+    return tmp_path
+
+@pytest.mark.parametrize("url,rel", [
+    ("/", "index.html"), ("/index.html", "index.html"), ("/styles.css?v=abc", "styles.css"), ("/sw.js", "sw.js"),
+    ("/data/gti.json", "data/gti.json"), ("/data/gti/index.json", "data/gti/index.json"),
+    ("/data/live/food.json?t=1", "data/live/food.json"), ("/data/live/%66ood.json", "data/live/food.json"),
+])
+def test_serves_the_shell_and_data(root, url, rel):
+    assert server._resolve(url) == os.path.join(str(root), rel)
+
+@pytest.mark.parametrize("url", [
+    "/server.py", "/README.md", "/REVIEW_DIFF.patch", "/.env", "/.git/config", "/data", "/data/", "/data/gti",
+    "/data/readings.sqlite", "/data/readings.sqlite-wal", "/data/cache/worldbank/x.json", "/data/vintages/index.sqlite",
+    "/data/vintages/packs/a.pack", "/data/.hidden.json", "/data/../server.py", "/data/%2e%2e/server.py",
+    "/data/gti/../../server.py", "/data//gti.json", "/data/escape.json", "/missing.html", "/data/missing.json",
+])
+def test_refuses_everything_else(root, url):
+    assert server._resolve(url) is None
+
+def test_body_cache_is_bounded_and_skips_binaries(root, monkeypatch):
+    monkeypatch.setattr(server, "BODY_CACHE_BYTES", 4000)
+    monkeypatch.setattr(server, "_bodies", server.OrderedDict())
+    monkeypatch.setattr(server, "_bodies_bytes", 0)
+    for i in range(6):
+        (root / "data" / f"f{i}.json").write_text("x" * 900)
+        server._body(str(root / "data" / f"f{i}.json"))
+    assert server._bodies_bytes <= 4000
+    assert list(server._bodies)[-1].endswith("f5.json") and not any(p.endswith("f0.json") for p in server._bodies)
+    (root / "data" / "big.json").write_bytes(os.urandom(1500))     # > BODY_CACHE_BYTES // 4: served, not cached
+    server._body(str(root / "data" / "big.json"))
+    (root / "data" / "t.parquet").write_bytes(b"PAR1" * 10)
+    _, _, etag, raw, gz = server._body(str(root / "data" / "t.parquet"))
+    assert raw == b"PAR1" * 10 and gz is None and "-" in etag
+    assert not any(p.endswith(("big.json", "t.parquet")) for p in server._bodies)
+
+def test_body_etag_follows_content(root):
+    p = root / "data" / "gti.json"
+    p.write_text("a" * 1000)
+    first = server._body(str(p))
+    assert server._body(str(p)) is first
+    p.write_text("b" * 1001)
+    second = server._body(str(p))
+    assert second[2] != first[2] and second[4] is not None   # new ETag, gzip for a compressible body
@@ -0,0 +1,75 @@
+import os
+import numpy as np
+import pytest
+import vintage
+
+@pytest.fixture
+def repo(tmp_path):
+    data = tmp_path / "data"
+    (data / "live").mkdir(parents=True)
+    kw = {"path": str(tmp_path / "v" / "index.sqlite"), "pack_dir": str(tmp_path / "v" / "packs")}
+    return data, kw
+
+def blob(n, seed):
+    rng = np.random.default_rng(seed)
+    return "\n".join(f"{2000 + i},{x:.6f}" for i, x in enumerate(rng.normal(size=n))).encode()
+
+def test_chunks_are_content_defined():
+    a = blob(20000, 1)
+    ca = vintage.chunks(a)
+    assert b"".join(ca) == a and len(ca) > 10
+    assert all(len(c) <= vintage.MAX_CHUNK for c in ca)
+    b = a[:50000] + b"inserted row\n" + a[50000:]
+    ids_a, ids_b = {vintage._id(c) for c in ca}, {vintage._id(c) for c in vintage.chunks(b)}
+    assert len(ids_b - ids_a) <= 2   # an insert changes the chunk(s) around it, not the rest of the file
+
+def test_commit_checkout_round_trip(repo, tmp_path):
+    data, kw = repo
+    (data / "gti.json").write_bytes(blob(5000, 1))
+    (data / "live" / "food.json").write_bytes(b'{"fpi_last": 120}')
+    v1 = vintage.commit({"https://example.org/a.csv?x=1": b"raw,bytes\n"}, label="one", data_dir=str(data), **kw)
+    first = {"gti.json": blob(5000, 1), "live/food.json": b'{"fpi_last": 120}', "raw/example.org/a.csv@x=1": b"raw,bytes\n"}
+
+    edited = bytearray(blob(5000, 1)); edited[30000:30005] = b"99999"
+    (data / "gti.json").write_bytes(bytes(edited))
+    (data / "live" / "food.json").unlink()
+    v2 = vintage.commit(label="two", data_dir=str(data), **kw)
+
+    assert vintage.checkout(v1, **kw) == first
+    second = vintage.checkout(v2, dest=str(tmp_path / "out"), **kw)
+    assert second == {"gti.json": bytes(edited), "raw/example.org/a.csv@x=1": b"raw,bytes\n"}   # raw inputs persist
+    assert (tmp_path / "out" / "gti.json").read_bytes() == bytes(edited)
+    assert vintage.checkout(v2, paths=["live/*"], **kw) == {}
+
+    log = {r[0]: r for r in vintage.log(kw["path"])}
+    assert log[v2][3] == 2 and log[v2][4] <= 4   # two changed paths; only the edited chunk(s) + recipe are new
+
+def test_unchanged_commit_is_skipped(repo):
+    data, kw = repo
+    (data / "gti.json").write_bytes(b"{}")
+    assert vintage.commit(data_dir=str(data), **kw)
+    assert vintage.commit(data_dir=str(data), **kw) is None
+
+def test_resolve_exact_id_and_prefix(repo):
+    data, kw = repo
+    (data / "gti.json").write_bytes(b"a" * 5000)
+    v1 = vintage.commit(data_dir=str(data), **kw)
+    (data / "gti.json").write_bytes(b"b" * 5000)
+    v2 = vintage.commit(data_dir=str(data), **kw)
+    assert vintage.resolve(v1, kw["path"]) == v1           # also when v2 was taken in the same second
+    assert vintage.resolve("2999", kw["path"]) == v2
+    with pytest.raises(KeyError):
+        vintage.resolve("1999", kw["path"])
+
+def test_diff_reads_only_changed_chunks(repo):
+    data, kw = repo
+    base = blob(20000, 3)
+    (data / "gti.json").write_bytes(base)
+    v1 = vintage.commit(data_dir=str(data), **kw)
+    (data / "gti.json").write_bytes(base.replace(b"2500,", b"2500,-", 1))
+    v2 = vintage.commit(data_dir=str(data), **kw)
+    out = vintage.diff(v1, v2, **kw)
+    assert any(l.startswith("+2500,-") for l in out) and any(l.startswith("-2500,") for l in out)
+    read = int(out[-1].split()[2])
+    packed = max(os.path.getsize(os.path.join(kw["pack_dir"], f)) for f in os.listdir(kw["pack_dir"]))
+    assert read < packed / 4
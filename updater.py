@@ -1,10 +1,30 @@
 #!/usr/bin/env python3
 # updater.py — assemble status.json (safe if live feeds missing)
-import json, time, pathlib
+# Live inputs come from the last-known-good layer (lkg.py, backed by the SQLite store): every section is filled from the newest
+# complete fetch and flagged stale with its age, rather than written as nulls. With --refresh the
+# fetchers run in the background and status.json is composed once LATENCY_BUDGET is spent.
+# It also pre-renders the first paint: an SVG sparkline + KPI values inlined into index.html
+# (between <!-- snapshot:* --> markers) and data/snapshot.json, shown before Plotly or any data loads.
+# New readings also pass through the streaming outlier/change-point detectors (anomaly.py) into status.json,
+# and each run's inputs/outputs are recorded as a deduplicated vintage (vintage.py, data/vintages/).
+# The app shell is versioned by content: ?v= on styles.css/script.js and sw.js's VERSION follow their hash.
+import calendar, email.utils, hashlib, html, json, math, re, sys, time, pathlib
+import anomaly, asof, changelog, columnar, lkg, shards, store, vintage
 
 DATA_DIR = pathlib.Path("data")
 LIVE_DIR = DATA_DIR / "live"
 STATUS   = DATA_DIR / "status.json"
+SNAPSHOT = DATA_DIR / "snapshot.json"
+SUMMARY  = DATA_DIR / "gti" / "summary.json"   # small sidecar written with gti.json (shards.py)
+INDEX    = pathlib.Path("index.html")
+SW       = pathlib.Path("sw.js")
+SHELL    = [pathlib.Path("styles.css"), pathlib.Path("script.js")]   # precached by sw.js under ?v=<VERSION>
+LATENCY_BUDGET   = 20.0    # seconds --refresh waits before composing from the cache
+REFRESH_DEADLINE = 120.0   # a refresh landing before this recomposes status.json once
+
+# status.json section -> lkg source
+SECTIONS = {"planetary": "planetary", "food": "food", "sentiment": "sentiment", "conflict": "conflict",
+            "markets": "markets", "food_access": "foodaccess", "employment": "employment"}
 
 def read_json(p, default=None):
     try:
@@ -12,18 +32,16 @@ def read_json(p, default=None):
     except Exception:
         return default
 
-def main():
-    DATA_DIR.mkdir(exist_ok=True)
-    LIVE_DIR.mkdir(parents=True, exist_ok=True)
-
-    planetary = read_json(LIVE_DIR / "planetary.json", default={})
-    sentiment = read_json(LIVE_DIR / "sentiment.json", default={})
-    markets   = read_json(LIVE_DIR / "markets.json",   default={})
-    food      = read_json(LIVE_DIR / "food.json",      default={})
-    conflict  = read_json(LIVE_DIR / "conflict.json",  default={})
-    foodacc   = read_json(LIVE_DIR / "foodaccess.json",default={})
-    employ    = read_json(LIVE_DIR / "employment.json",default={})
-    gti       = read_json(DATA_DIR / "gti.json",       default=None)
+def compose(gti):
+    live = {name: lkg.read(name) for name in set(SECTIONS.values())}
+    planetary = live["planetary"][0]
+    sentiment = live["sentiment"][0]
+    markets   = live["markets"][0]
+    food      = live["food"][0]
+    conflict  = live["conflict"][0]
+    foodacc   = live["foodaccess"][0]
+    employ    = live["employment"][0]
+    sub = lambda d, k, f: (d.get(k) or {}).get(f) if isinstance(d.get(k), dict) else None  # fetch_markets nests per symbol
 
     now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
@@ -66,11 +84,11 @@ def main():
             "delta_30":   (conflict or {}).get("delta_30"),
         },
         "markets": {
-            "acwi_last":   (markets or {}).get("acwi_last"),
-            "acwi_ret30":  (markets or {}).get("acwi_ret30"),
-            "vix":         (markets or {}).get("vix"),
-            "brent_last":  (markets or {}).get("brent_last"),
-            "brent_vol30": (markets or {}).get("brent_vol30"),
+            "acwi_last":   sub(markets, "acwi", "last"),
+            "acwi_ret30":  sub(markets, "acwi", "ret30"),
+            "vix":         sub(markets, "vix", "last"),
+            "brent_last":  sub(markets, "brent", "last"),
+            "brent_vol30": sub(markets, "brent", "vol30"),
             "econ_score":  (markets or {}).get("econ_score"),
             "entropy_score": (markets or {}).get("entropy_score"),
         },
@@ -82,11 +100,140 @@ def main():
             "unemployment_rate": (employ or {}).get("unemployment_rate"),
             "delta_pct":         (employ or {}).get("delta_pct"),
         },
-        "note": "Status composed from live inputs; nulls indicate missing feed this run."
+        "note": "Status composed from last-known-good live inputs; stale sections carry their age."
     }
+    for section, name in SECTIONS.items():
+        meta = live[name][1]
+        status[section]["stale"] = meta["stale"]
+        status[section]["age_h"] = round(meta["age_s"] / 3600, 1) if meta["age_s"] is not None else None
+    status["stale_sources"] = sorted(s for s, n in SECTIONS.items() if live[n][1]["stale"])
+    try:
+        status["anomalies"] = anomaly.run()  # O(1) per new reading; full list in data/alerts.json
+    except Exception as e:
+        print("[warn] anomaly detection skipped:", e)
 
     STATUS.write_text(json.dumps(status, indent=2))
-    print("Wrote", STATUS)
+    print("Wrote", STATUS, "| stale:", ", ".join(status["stale_sources"]) or "none")
+    return status
+
+def finite(series):
+    return [r for r in series or [] if isinstance(r.get("gti"), (int, float)) and math.isfinite(r["gti"])]
+
+def sparkline(series, w=600, h=120, pad=4):
+    """Inline SVG polyline of the annual GTI (stroke follows the page accent via currentColor)."""
+    pts = [(r["year"], float(r["gti"])) for r in finite(series)]
+    if len(pts) < 2:
+        return None
+    (x0, _), (x1, _) = pts[0], pts[-1]
+    lo, hi = min(v for _, v in pts), max(v for _, v in pts)
+    span = (hi - lo) or 1.0
+    xy = " ".join(f"{(x - x0) / (x1 - x0) * w:.1f},{pad + (hi - v) / span * (h - 2 * pad):.1f}" for x, v in pts)
+    return (f'<svg class="spark" viewBox="0 0 {w} {h}" preserveAspectRatio="none" role="img" aria-label="GTI {x0}–{x1}">'
+            f'<polyline fill="none" stroke="currentColor" stroke-width="2" vector-effect="non-scaling-stroke" points="{xy}"/></svg>')
+
+def first_paint(gti, status):
+    """data/snapshot.json + the same values inlined into index.html, formatted as script.js does."""
+    series = finite((gti or {}).get("spark") or (gti or {}).get("series"))
+    last, prev = (series[-1] if series else {}), (series[-2] if len(series) > 1 else {})
+    g_last, g_avg = status.get("gti_last"), status.get("gti_30d_avg")
+    ok = lambda v: v is not None and math.isfinite(v)
+    snap = {
+        "updated_iso": status.get("updated_iso"),
+        "year": last.get("year"),
+        "gti": round(last["gti"], 2) if last else None,
+        "delta": round(last["gti"] - prev["gti"], 2) if prev else None,
+        "delta_30d_pct": round((g_last - g_avg) / g_avg * 100, 2) if ok(g_last) and ok(g_avg) and g_avg else None,
+        "svg": sparkline(series),
+    }
+    SNAPSHOT.write_text(json.dumps(snap, separators=(",", ":")))
+    if not INDEX.exists():
+        return snap
+    stamp = calendar.timegm(time.strptime(snap["updated_iso"], "%Y-%m-%dT%H:%M:%SZ"))
+    slots = {
+        "gti": str(round(snap["gti"])) if snap["gti"] is not None else "—",
+        "year": str(snap["year"]) if snap["year"] is not None else "—",
+        "delta": f'{snap["delta_30d_pct"]:.2f}% vs 30d' if snap["delta_30d_pct"] is not None else "—",
+        "updated": email.utils.formatdate(stamp, usegmt=True),
+    }
+    slots = {k: html.escape(v) for k, v in slots.items()}
+    if snap["svg"]:
+        slots["chart"] = snap["svg"] + '<div class="spark-note">Loading interactive chart…</div>'
+    page = old = INDEX.read_text()
+    for key, val in slots.items():
+        page = re.sub(rf"(<!-- snapshot:{key} -->).*?(<!-- /snapshot:{key} -->)", lambda m: m.group(1) + val + m.group(2), page, flags=re.S)
+    if page != old:
+        INDEX.write_text(page)
+    print(f"Wrote {SNAPSHOT} ({len(json.dumps(snap))} B) and the first-paint snapshot in {INDEX}")
+    return snap
+
+def stamp_shell():
+    """Point index.html and sw.js at a version derived from the shell's content, so a changed
+    script.js/styles.css installs a new service worker (new shell cache) for returning visitors."""
+    h = hashlib.sha1()
+    for p in SHELL:
+        if p.exists(): h.update(p.read_bytes())
+    version = h.hexdigest()[:10]
+    for path, pattern, repl in ((INDEX, r"(\./(?:styles\.css|script\.js)\?v=)[\w.-]+", rf"\g<1>{version}"),
+                                (SW, r"(const VERSION = ')[^']*(')", rf"\g<1>{version}\g<2>")):
+        if not path.exists(): continue
+        old = path.read_text()
+        new = re.sub(pattern, repl, old)
+        if new != old:
+            path.write_text(new)
+            print(f"Shell version {version} -> {path}")
+    return version
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    DATA_DIR.mkdir(exist_ok=True)
+    LIVE_DIR.mkdir(parents=True, exist_ok=True)
+    t0 = time.monotonic()
+    futs = lkg.refresh() if "--refresh" in argv else {}
+    if futs:
+        lkg.wait_for(futs, LATENCY_BUDGET)
+
+    # Only the summary sidecar is read (latest rows + sparkline); the backfill keeps it, the shards and
+    # the category files in step with gti.json, so this stays flat as the history grows
+    gti = read_json(SUMMARY, default=None)
+    legacy = None if gti else shards.load()
+    if legacy:  # gti.json from before the split: write the sidecar/category files once
+        shards.write(legacy)
+        gti = read_json(SUMMARY, default=None)
+
+    # Sub-annual GTI: annual category scores (ingested by the backfill) join the live series; if that
+    # ingest failed or predates the current summary (the backfill step may fail), redo it from the category files
+    try:
+        if legacy:
+            asof.record_annual(legacy.get("by_category"), legacy.get("updated"))
+        elif gti and gti.get("updated") and (asof.annual_updated() or "") < gti["updated"]:
+            asof.record_annual(shards.read_categories(), gti["updated"])
+        asof.compute_all()
+    except Exception as e:
+        print("[warn] sub-annual GTI skipped:", e)
+
+    status = compose(gti)
+
+    # Refreshes still in flight get until the deadline; if any lands, recompose once
+    pending = {n: f for n, f in futs.items() if not f.done()}
+    if pending and lkg.wait_for(pending, REFRESH_DEADLINE - (time.monotonic() - t0)):
+        status = compose(gti)
+    first_paint(gti, status)
+    stamp_shell()
+
+    # One bounded change-log line per run (head + month log; never rewrites history)
+    scores = (read_json(DATA_DIR / "categories.json", default={}) or {}).get("scores", {})
+    econ = status["markets"]["econ_score"] if status["markets"]["econ_score"] is not None else scores.get("Economic Wellbeing")
+    ent  = status["markets"]["entropy_score"] if status["markets"]["entropy_score"] is not None else scores.get("Entropy Index")
+    changelog.append(f"Daily update. Econ={econ}, Entropy={ent}.")
+    store.checkpoint()  # fold the WAL into data/readings.sqlite before the workflow caches it
+    try:
+        columnar.export(["live"])  # only the partitions with new readings are rewritten
+    except Exception as e:
+        print("[warn] columnar export skipped:", e)
+    try:
+        vintage.commit(label="update")  # this run's live inputs and outputs (only changed chunks are stored)
+    except Exception as e:
+        print("[warn] vintage skipped:", e)
 
 if __name__ == "__main__":
     main()
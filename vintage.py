@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Content-addressed vintage store: every run's inputs and outputs, deduplicated at chunk level.
+- Files are cut into content-defined chunks (windowed gear hash over the bytes, ~4 KB average,
+  MIN_CHUNK..MAX_CHUNK), so a revised value or an inserted row changes one or two chunks, not the file.
+- Chunks are zlib-compressed and appended to one pack per vintage (data/vintages/packs/<id>.pack);
+  a chunk already stored by any earlier vintage is never written again. A file's recipe (its chunk
+  ids) is itself a chunk, so an unchanged file costs nothing.
+- index.sqlite: chunks(id -> pack, offset, length), vintages, and files(path, vintage, recipe) holding
+  only the vintages where a path changed; a path as of vintage V is its newest row <= V (deleted = NULL).
+- checkout(V) reads the chunks of V's files; diff(A, B) compares recipes and reads only the chunks
+  that differ between A and B.
+commit() takes the tracked files under data/ (TRACK) plus raw source bytes passed in by the backfills
+(stored under raw/<host>/<path>, e.g. the OWID CSVs exactly as downloaded).
+DB: data/vintages/index.sqlite
+Usage: python vintage.py commit [label] | log | ls [V] | show V PATH | checkout V DEST [PATH...] | diff A B [PATH...]
+       (V = a vintage id or a date/time prefix: the newest vintage taken at or before it)
+"""
+import difflib, fnmatch, glob, hashlib, os, sys, time, zlib
+import numpy as np
+import http_client, store
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(ROOT, "data")
+VINTAGE_DIR = os.path.join(DATA_DIR, "vintages")
+PACK_DIR = os.path.join(VINTAGE_DIR, "packs")
+DB_PATH = os.path.join(VINTAGE_DIR, "index.sqlite")
+# inputs and outputs under data/ recorded by every commit (fetch caches, live values, scores, shards)
+TRACK = ["status.json", "gti.json", "gti/*.json", "gti/categories/*.json", "live/*.json", "categories.json",
+         "baseline.json", "normalize.json", "summaries.json", "events.json", "sources.json", "snapshot.json",
+         "gti_daily.json", "gti_monthly.json", "series/*.csv", "countries/*.json", "rollups/*.json", "alerts.json",
+         "cache/worldbank/*.json", "cache/worldbank/*/*.json"]
+MIN_CHUNK, MAX_CHUNK, CHUNK_BITS = 1 << 10, 1 << 15, 12   # average chunk ≈ MIN_CHUNK + 2**CHUNK_BITS
+WINDOW = 32
+LEVEL = 9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks(
+    id TEXT PRIMARY KEY, pack TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL, size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vintages(
+    id TEXT PRIMARY KEY, label TEXT, files INTEGER, changed INTEGER, new_chunks INTEGER, new_bytes INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS files(
+    path TEXT NOT NULL, vintage TEXT NOT NULL, recipe TEXT, size INTEGER,
+    PRIMARY KEY (path, vintage)
+) WITHOUT ROWID;
+"""
+
+_GEAR = np.random.default_rng(0x6745).integers(0, 2**63, 256, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+def connect(path=None):
+    return store.connect(path or DB_PATH, SCHEMA)
+
+def _cuts(data):
+    """Chunk end offsets: positions where the gear hash of the last WINDOW bytes hits the mask."""
+    n = len(data)
+    cand, step = [], 1 << 20
+    for lo in range(0, n, step):  # blocks keep the hash arrays small for multi-MB inputs
+        a = max(0, lo - WINDOW + 1)
+        g = _GEAR[np.frombuffer(data, dtype=np.uint8, count=min(n, lo + step) - a, offset=a)]
+        h = g.copy()
+        for i in range(1, WINDOW):
+            h[i:] += g[:-i] << np.uint64(i)
+        hit = np.flatnonzero((h[lo - a:] >> np.uint64(64 - CHUNK_BITS)) == 0) + lo + 1
+        cand.append(hit)
+    cuts, last = [], 0
+    for c in np.concatenate(cand).tolist() if cand else []:
+        if c - last < MIN_CHUNK: continue
+        while c - last > MAX_CHUNK:
+            last += MAX_CHUNK; cuts.append(last)
+        cuts.append(c); last = c
+    while n - last > MAX_CHUNK:
+        last += MAX_CHUNK; cuts.append(last)
+    if last < n: cuts.append(n)
+    return cuts
+
+def chunks(data):
+    start, out = 0, []
+    for end in _cuts(data):
+        out.append(data[start:end]); start = end
+    return out
+
+def _id(blob):
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+def raw_path(url):
+    """raw/<host>/<path>[@query] for a downloaded source file (a checkout's raw/ works as GTI_MIRROR)."""
+    return "raw/" + http_client.mirror_key(url)
+
+def tracked(data_dir=DATA_DIR):
+    """{relative path: bytes} of the TRACK files currently on disk."""
+    out = {}
+    for pattern in TRACK:
+        for p in sorted(glob.glob(os.path.join(data_dir, pattern))):
+            if os.path.isfile(p):
+                with open(p, "rb") as f: out[os.path.relpath(p, data_dir).replace(os.sep, "/")] = f.read()
+    return out
+
+def _as_of(conn, vintage, paths=None):
+    """{path: (recipe, size)} of the files present as of a vintage (newest row per path <= vintage)."""
+    rows = conn.execute("SELECT path, recipe, size, max(vintage) FROM files WHERE vintage <= ? GROUP BY path", (vintage,)).fetchall()
+    return {p: (r, s) for p, r, s, _ in rows if r is not None and (paths is None or any(fnmatch.fnmatch(p, x) for x in paths))}
+
+def commit(raw=None, label=None, data_dir=DATA_DIR, path=None, pack_dir=PACK_DIR):
+    """Record the tracked files plus raw {url or path: bytes} as a new vintage; returns its id (None if nothing changed)."""
+    t0 = time.perf_counter()
+    files = tracked(data_dir)
+    files.update({(raw_path(k) if "://" in k else k): v for k, v in (raw or {}).items()})
+    conn = connect(path)
+    vid = base = store.now_iso()
+    while conn.execute("SELECT 1 FROM vintages WHERE id = ?", (vid,)).fetchone():  # same-second runs
+        vid = f"{base}-{int(vid[len(base) + 1:] or 0) + 1}"
+    prev = _as_of(conn, vid)
+    recipes, pending = {}, {}
+    for name, blob in files.items():
+        parts = chunks(blob)
+        ids = [_id(c) for c in parts]
+        pending.update(zip(ids, parts))
+        recipe = "\n".join(ids).encode()
+        rid = _id(recipe)
+        pending[rid] = recipe
+        recipes[name] = (rid, len(blob))
+    changed = {n: r for n, r in recipes.items() if prev.get(n, (None,))[0] != r[0]}
+    gone = [n for n in prev if n not in recipes and not n.startswith("raw/")]  # raw inputs persist until refetched
+    if not changed and not gone:
+        print(f"vintage: no changes in {len(files)} file(s)")
+        return None
+    have, todo = set(), list(pending)
+    for i in range(0, len(todo), 500):
+        chunk = todo[i:i + 500]
+        have.update(r[0] for r in conn.execute(f"SELECT id FROM chunks WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+    os.makedirs(pack_dir, exist_ok=True)
+    pack = vid.replace(":", "").replace("-", "") + ".pack"
+    rows, offset = [], 0
+    new = [(cid, blob) for cid, blob in pending.items() if cid not in have]
+    if new:
+        with open(os.path.join(pack_dir, pack), "wb") as f:
+            for cid, blob in new:
+                z = zlib.compress(blob, LEVEL)
+                f.write(z)
+                rows.append((cid, pack, offset, len(z), len(blob))); offset += len(z)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("INSERT OR IGNORE INTO chunks VALUES (?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO files VALUES (?, ?, ?, ?)",
+                         [(n, vid, r, s) for n, (r, s) in changed.items()] + [(n, vid, None, None) for n in gone])
+        conn.execute("INSERT INTO vintages VALUES (?, ?, ?, ?, ?, ?)", (vid, label, len(files), len(changed) + len(gone), len(rows), offset))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    print(f"vintage {vid}: {len(changed) + len(gone)}/{len(files)} file(s) changed, {len(rows)} new chunk(s), "
+          f"{offset} B packed in {time.perf_counter() - t0:.2f}s")
+    return vid
+
+def resolve(v, path=None):
+    """A vintage id for an id or a date/time prefix (the newest vintage at or before it)."""
+    v = str(v)
+    conn = connect(path)
+    if conn.execute("SELECT 1 FROM vintages WHERE id = ?", (v,)).fetchone():
+        return v  # exact id: not also a prefix of same-second vintages ("<id>-1", ...)
+    row = conn.execute("SELECT max(id) FROM vintages WHERE id <= ?", (v + "￿",)).fetchone()
+    if not row or not row[0]:
+        raise KeyError(f"no vintage at or before {v}")
+    return row[0]
+
+class _Reader:
+    """Chunk reads by id with one open file per pack; counts what was read."""
+    def __init__(self, conn, pack_dir=PACK_DIR):
+        self.conn, self.pack_dir, self.files, self.read = conn, pack_dir, {}, 0
+    def __call__(self, cid):
+        pack, offset, length = self.conn.execute("SELECT pack, offset, length FROM chunks WHERE id = ?", (cid,)).fetchone()
+        f = self.files.get(pack) or self.files.setdefault(pack, open(os.path.join(self.pack_dir, pack), "rb"))
+        f.seek(offset)
+        self.read += length
+        return zlib.decompress(f.read(length))
+    def offset(self, ids):
+        """Byte offset after the given chunks (sizes come from the index; nothing is read)."""
+        return sum(self.conn.execute("SELECT size FROM chunks WHERE id = ?", (c,)).fetchone()[0] for c in ids)
+    def close(self):
+        for f in self.files.values(): f.close()
+
+def checkout(vintage, dest=None, paths=None, path=None, pack_dir=PACK_DIR):
+    """{path: bytes} of a vintage's files (optionally only those matching the glob patterns in paths);
+    written under dest when given."""
+    conn = connect(path)
+    vid = resolve(vintage, path)
+    read = _Reader(conn, pack_dir)
+    out = {}
+    try:
+        for name, (rid, _) in sorted(_as_of(conn, vid, paths).items()):
+            out[name] = b"".join(read(c) for c in read(rid).decode().split("\n") if c)
+    finally:
+        read.close()
+    for name, blob in out.items() if dest else ():
+        target = os.path.join(dest, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f: f.write(blob)
+    return out
+
+def diff(a, b, paths=None, context=2, path=None, pack_dir=PACK_DIR):
+    """Unified diff lines between two vintages; only the chunks that differ (plus recipes) are read.
+    Hunks are headed by the byte offset of the changed chunk run in each version."""
+    conn = connect(path)
+    va, vb = resolve(a, path), resolve(b, path)
+    fa, fb = _as_of(conn, va, paths), _as_of(conn, vb, paths)
+    read = _Reader(conn, pack_dir)
+    out = []
+    try:
+        for name in sorted(fa.keys() | fb.keys()):
+            ra, rb = fa.get(name, (None,))[0], fb.get(name, (None,))[0]
+            if ra == rb: continue
+            ca = read(ra).decode().split("\n") if ra else []
+            cb = read(rb).decode().split("\n") if rb else []
+            out += [f"--- {name}@{va}", f"+++ {name}@{vb}"]
+            for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, ca, cb, autojunk=False).get_opcodes():
+                if tag == "equal": continue
+                old = b"".join(read(c) for c in ca[i1:i2]).decode("utf-8", "replace").splitlines()
+                new = b"".join(read(c) for c in cb[j1:j2]).decode("utf-8", "replace").splitlines()
+                out.append(f"@@ byte -{read.offset(ca[:i1])} +{read.offset(cb[:j1])} @@")
+                out += [l for l in list(difflib.unified_diff(old, new, lineterm="", n=context))[2:] if not l.startswith("@@")]
+    finally:
+        read.close()
+    out.append(f"# read {read.read} compressed bytes")
+    return out
+
+def log(path=None):
+    return connect(path).execute("SELECT id, label, files, changed, new_chunks, new_bytes FROM vintages ORDER BY id").fetchall()
+
+if __name__ == "__main__":
+    a = sys.argv[1:]
+    cmd = a[0] if a else "log"
+    if cmd == "commit":
+        commit(label=a[1] if len(a) > 1 else None)
+    elif cmd == "log":
+        for r in log(): print(*r, sep="\t")
+    elif cmd == "ls":
+        conn = connect()
+        for name, (rid, size) in sorted(_as_of(conn, resolve(a[1]) if len(a) > 1 else "￿").items()): print(size, name, sep="\t")
+    elif cmd == "show":
+        sys.stdout.buffer.write(checkout(a[1], paths=[a[2]]).get(a[2], b""))
+    elif cmd == "checkout":
+        print(f"{len(checkout(a[1], a[2], a[3:] or None))} file(s) written to {a[2]}")
+    elif cmd == "diff":
+        print("\n".join(diff(a[1], a[2], a[3:] or None)))
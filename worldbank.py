@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+World Bank API client with a local history cache (no API key).
+- Fetches several WDI indicators for a country in one batched request
+  (indicator codes joined with ';'); extra pages are fetched concurrently.
+- Full histories are cached per country/indicator under data/cache/worldbank/
+  and only refetched when the WDI source's `lastupdated` date changes
+  (checked with a one-row probe).
+"""
+import json, os, sys, time
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache", "worldbank")
+
+API = "https://api.worldbank.org/v2/country/{country}/indicator/{codes}?source=2&format=json&per_page={per_page}&page={page}"
+PER_PAGE = 1000
+
+def _get(country, codes, page=1, per_page=PER_PAGE, extra=""):
+    url = API.format(country=country, codes=";".join(codes), per_page=per_page, page=page) + extra
+    data = json.loads(http_client.get(url, timeout=20))
+    if not isinstance(data, list) or len(data) < 2:
+        raise RuntimeError(f"World Bank API error for {codes}: {str(data)[:200]}")
+    return data[0], (data[1] or [])
+
+def _cache_path(country, code):
+    return os.path.join(CACHE_DIR, country, f"{code}.json")
+
+def _load(country, code):
+    try:
+        with open(_cache_path(country, code)) as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def _save(country, code, blob):
+    path = _cache_path(country, code)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(blob, f, indent=2)
+
+def lastupdated(country="WLD", code="SP.POP.TOTL"):
+    """Cheap freshness probe: WDI `lastupdated` stamp from a single-row response (None on failure)."""
+    try:
+        meta, _ = _get(country, [code], per_page=1, extra="&mrv=1")
+        return meta.get("lastupdated")
+    except Exception:
+        return None
+
+def fetch_batch(codes, country="WLD"):
+    """Fetch full histories for `codes` in one batched query; returns {code: (years, values)} sorted by year."""
+    meta, rows = _get(country, codes)
+    pages = int(meta.get("pages") or 1)
+    if pages > 1:
+        with ThreadPoolExecutor(max_workers=min(4, pages - 1)) as ex:
+            for _, more in ex.map(lambda p: _get(country, codes, page=p), range(2, pages + 1)):
+                rows.extend(more)
+    series = {c: {} for c in codes}
+    for row in rows:
+        code = (row.get("indicator") or {}).get("id"); v = row.get("value")
+        if code not in series or v is None: continue
+        try:
+            series[code][int(row.get("date", "0"))] = float(v)
+        except Exception:
+            pass
+    out = {}
+    for code, by_year in series.items():
+        years = sorted(by_year)
+        out[code] = (years, [by_year[y] for y in years])
+    return out, meta.get("lastupdated")
+
+def histories(codes, country="WLD"):
+    """Return {code: (years, values)} from cache, refreshing only codes whose source stamp changed."""
+    codes = list(codes)
+    cached = {c: _load(country, c) for c in codes}
+    stamp = lastupdated(country) if any(cached.values()) else None
+    stale = [c for c in codes if not cached[c] or (stamp is not None and cached[c].get("lastupdated") != stamp)]
+    if stale:
+        try:
+            fresh, stamp2 = fetch_batch(stale, country)
+            for c in stale:
+                years, vals = fresh[c]
+                if not years: continue
+                cached[c] = {"indicator": c, "country": country, "lastupdated": stamp2 or stamp,
+                             "fetched": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                             "years": years, "values": vals}
+                _save(country, c, cached[c])
+        except Exception as e:
+            print(f"[warn] World Bank refresh failed ({e}); using cache where available", file=sys.stderr)
+    return {c: ((cached[c]["years"], cached[c]["values"]) if cached[c] else ([], [])) for c in codes}
+
+COUNTRIES_API = "https://api.worldbank.org/v2/country?format=json&per_page=400"
+COUNTRIES_TTL = 30 * 86400
+
+def countries():
+    """{ISO3: {"name", "region", "income"}} for real economies (aggregates dropped); cached for COUNTRIES_TTL."""
+    path = os.path.join(CACHE_DIR, "countries.json")
+    try:
+        with open(path) as f: blob = json.load(f)
+    except Exception:
+        blob = None
+    if blob and time.time() - blob.get("fetched_epoch", 0) < COUNTRIES_TTL:
+        return blob["countries"]
+    try:
+        data = json.loads(http_client.get(COUNTRIES_API, timeout=20))
+        out = {}
+        for c in (data[1] if isinstance(data, list) and len(data) > 1 else []) or []:
+            region = (c.get("region") or {}).get("value", "").strip()
+            if not region or region == "Aggregates": continue
+            out[c["id"]] = {"name": c.get("name"), "region": region, "income": (c.get("incomeLevel") or {}).get("value")}
+        if not out:
+            raise RuntimeError("empty country list")
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"fetched_epoch": time.time(), "countries": out}, f, indent=1)
+        return out
+    except Exception as e:
+        print(f"[warn] World Bank country list unavailable ({e}); using cache where available", file=sys.stderr)
+        return (blob or {}).get("countries") or {}
+
+def latest(codes, country="WLD"):
+    """Return {code: most recent value or None}."""
+    return {c: (vals[-1] if vals else None) for c, (_, vals) in histories(codes, country).items()}
+
+if __name__ == "__main__":
+    codes = sys.argv[1:] or ["FP.CPI.TOTL.ZG", "SL.UEM.TOTL.ZS", "NY.GDP.PCAP.KD.ZG"]
+    for c, (years, vals) in histories(codes).items():
+        print(c, f"{len(years)} years", (years[-1], vals[-1]) if years else None)